@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+import random
+from typing import Dict, List
+
+# The number of lines of each generated module.
+CORPUS_SIZES = {
+    "tiny": 20,
+    "small": 500,
+    "medium": 5000,
+    "large": 50000,
+}
+DEFAULT_SEED = 6
+
+# Each block is dense in a node type that has checkers. Some of the blocks contain violations, so the error path is
+# measured as well.
+CALL_BLOCK = """
+def load_{index}(path, config):
+    data = open(path, encoding="utf-8").read()
+    raw = open(path, "rb").read()
+    text = open(path)
+    value = compute(data, raw, config.get("key_{index}"), int("{index}"), len(data))
+    return helper(value, text, sorted(data), str(value), repr(raw))
+"""
+CONSTANT_BLOCK = """
+TABLE_{index} = {{
+    "name": u"value_{index}",
+    "data": b"bytes_{index}",
+    "numbers": (1, 2.5, 3j, {index}, None, True, False),
+    "text": "plain_{index}",
+    "rest": ...,
+}}
+"""
+ATTRIBUTE_BLOCK = """
+def inspect_{index}(obj):
+    first = obj.parent.child.value
+    second = sys.exc_type or sys.exc_info()[0]
+    third = string.upper(obj.name) + os.path.join(obj.root, obj.path)
+    return first.attr, second.attr, third.attr, obj.meta.data.items()
+"""
+CLASSDEF_BLOCK = """
+class Model_{index}(object):
+    size = {index}
+
+    def __init__(self, value):
+        self.value = value
+
+    def __div__(self, other):
+        return Model_{index}(self.value / other.value)
+
+
+class Legacy_{index}:
+    def __coerce__(self, other):
+        return self, other
+"""
+MATCH_BLOCK = """
+def dispatch_{index}(command):
+    match command:
+        case ["go", direction]:
+            return direction
+        case {{"action": action, **rest}}:
+            return action
+        case Point(x=0, y=0) as origin:
+            return origin
+        case None | True:
+            return f"constant {index}"
+        case _:
+            return command
+"""
+BLOCKS = (CALL_BLOCK, CONSTANT_BLOCK, ATTRIBUTE_BLOCK, CLASSDEF_BLOCK, MATCH_BLOCK)
+MODULE_HEADER = "import os\nimport sys\nimport string\n"
+
+# A module whose imported names are rebound in class bodies, in conditional blocks and in functions, which only hide
+# the imports where python would. The SIX errors of its deprecated attribute accesses are listed by line.
+SCOPES_MODULE = """import sys, string
+
+
+class Config(object):
+    sys = None
+    string = u"x"
+
+    def method(self):
+        return sys.exc_type
+
+
+sys.exc_type
+string.upper(u"a")
+print(sys.exc_value)
+if False:
+    sys = None
+sys.exc_traceback
+
+
+def function():
+    if True:
+        sys = None
+    return sys.exc_type
+"""
+SCOPES_MODULE_ERRORS = [(9, "SIX016"), (12, "SIX016"), (13, "SIX013"), (14, "SIX016"), (17, "SIX016")]
+
+# A string heavy data module, like generated tables and translations. Most of its strings are prefixed, and some of
+# them are not, so the string prefix errors are measured as well.
+DATA_MODULE_HEADER = '''"""Generated data tables."""
+__all__ = ["TRANSLATIONS", "CODES"]
+
+TRANSLATIONS = {
+'''
+DATA_ENTRY = '''    "message_{index}": (u"text number {index}", b"raw_{index}", u"line " u"{index}", {index}),
+'''
+UNPREFIXED_DATA_ENTRY = '''    "message_{index}": ("text number {index}", r"raw_{index}", "line " "{index}", {index}),
+'''
+# One in this many entries has unprefixed strings.
+UNPREFIXED_DATA_ENTRY_INTERVAL = 20
+DATA_MODULE_FOOTER = "}\n"
+
+
+def generate_module(lines_count: int, seed: int = DEFAULT_SEED) -> str:
+    """
+    Generate a module with at least the given number of lines, out of randomly chosen blocks.
+
+    Args:
+        lines_count (int): The minimal number of lines in the module.
+        seed (int): The seed of the blocks choice, so the same corpus is generated on every run.
+
+    Returns:
+        str: The source of the module.
+    """
+    randomizer = random.Random(seed)
+    parts: List[str] = [MODULE_HEADER]
+    current_lines_count = MODULE_HEADER.count("\n")
+    index = 0
+    while current_lines_count < lines_count:
+        block = randomizer.choice(BLOCKS).format(index=index)
+        parts.append(block)
+        current_lines_count += block.count("\n")
+        index += 1
+    return "".join(parts)
+
+
+def generate_data_module(lines_count: int) -> str:
+    """
+    Generate a string heavy data module with the given number of lines.
+
+    Args:
+        lines_count (int): The number of lines in the module.
+
+    Returns:
+        str: The source of the module.
+    """
+    entries_count = max(lines_count - DATA_MODULE_HEADER.count("\n") - 1, 0)
+    entries = (
+        (UNPREFIXED_DATA_ENTRY if index % UNPREFIXED_DATA_ENTRY_INTERVAL == 0 else DATA_ENTRY).format(index=index)
+        for index in range(entries_count)
+    )
+    return DATA_MODULE_HEADER + "".join(entries) + DATA_MODULE_FOOTER
+
+
+def generate_corpus(seed: int = DEFAULT_SEED) -> Dict[str, str]:
+    """
+    Args:
+        seed (int): The seed of the generated modules.
+
+    Returns:
+        Dict[str, str]: A dictionary that maps between the size name and the source of the module.
+    """
+    return {
+        size_name: generate_module(lines_count, seed)
+        for size_name, lines_count in CORPUS_SIZES.items()
+    }
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+import argparse
+import ast
+import sys
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from benchmarks.corpus import SCOPES_MODULE, SCOPES_MODULE_ERRORS, generate_corpus
+from flake8_six_compatablity_plugin.flake8_plugin import ENGINES, SixCompatibilityPlugin
+
+REFERENCE_ENGINE = "visitor"
+# The full plugin run, including the pre-filter and the chosen engine.
+PLUGIN_ENGINE = "plugin"
+SCOPES_SOURCE_NAME = "scopes"
+
+ErrorRecord = Tuple[int, int, str, str]
+
+
+def _records(errors: Iterable) -> List[ErrorRecord]:
+    return [
+        (error.line_number, error.offset, error.msg, error.flake_cls.__name__)
+        for error in errors
+    ]
+
+
+def engine_errors(engine_name: str, source: str) -> List[ErrorRecord]:
+    """
+    Args:
+        engine_name (str): One of the plugin engines, or "plugin" for a full plugin run.
+        source (str): The source to check.
+
+    Returns:
+        List[ErrorRecord]: The errors the engine found, in the order it reported them.
+    """
+    tree = ast.parse(source)
+    if engine_name == PLUGIN_ENGINE:
+        return _records(SixCompatibilityPlugin(tree, source.splitlines(True)).run())
+
+    visitor = ENGINES[engine_name]()
+    visitor.visit(tree)
+    return _records(visitor.errors)
+
+
+def compare_engines(
+    sources: Dict[str, str], engine_names: Sequence[str]
+) -> List[str]:
+    """
+    Compare the errors of the given engines against the reference visitor.
+
+    Args:
+        sources (Dict[str, str]): A dictionary that maps between a source name and the source.
+        engine_names (Sequence[str]): The engines to compare.
+
+    Returns:
+        List[str]: A description of each mismatch. Empty if all the engines are identical to the reference.
+    """
+    mismatches = []
+    for source_name, source in sources.items():
+        reference = engine_errors(REFERENCE_ENGINE, source)
+        for engine_name in engine_names:
+            errors = engine_errors(engine_name, source)
+            if errors != reference:
+                mismatches.append(
+                    f"{source_name}: {engine_name} found {len(errors)} errors, "
+                    f"{REFERENCE_ENGINE} found {len(reference)} errors, "
+                    f"first difference: {_first_difference(reference, errors)}"
+                )
+    return mismatches
+
+
+def compare_expected(source_name: str, source: str, expected: List[Tuple[int, str]]) -> List[str]:
+    """
+    Compare the errors of the reference visitor against the errors the source is known to have.
+
+    Args:
+        source_name (str): The name of the source.
+        source (str): The source to check.
+        expected (List[Tuple[int, str]]): The line number and code of each error of the source, in order.
+
+    Returns:
+        List[str]: A description of the mismatch, if there is one.
+    """
+    errors = [
+        (line_number, message.split(" ", 1)[0])
+        for line_number, _, message, _ in engine_errors(REFERENCE_ENGINE, source)
+    ]
+    if errors == expected:
+        return []
+    return [f"{source_name}: {REFERENCE_ENGINE} found {errors}, expected {expected}"]
+
+
+def _first_difference(reference: List[ErrorRecord], errors: List[ErrorRecord]) -> str:
+    for reference_error, error in zip(reference, errors):
+        if reference_error != error:
+            return f"expected {reference_error}, got {error}"
+    return "one of the error lists is longer"
+
+
+def _read_sources(paths: Iterable[str]) -> Dict[str, str]:
+    sources = {}
+    for path in paths:
+        with open(path, encoding="utf-8") as source_file:
+            sources[path] = source_file.read()
+    return sources
+
+
+def main(argv: Sequence[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Check that all the engines find the same errors as the reference visitor."
+    )
+    parser.add_argument("paths", nargs="*", help="Extra files to compare on, besides the synthetic corpus.")
+    parser.add_argument(
+        "--engines",
+        nargs="+",
+        default=[name for name in ENGINES if name != REFERENCE_ENGINE] + [PLUGIN_ENGINE],
+        help="The engines to compare. (Default: all of them)",
+    )
+    arguments = parser.parse_args(argv)
+
+    sources = generate_corpus()
+    sources[SCOPES_SOURCE_NAME] = SCOPES_MODULE
+    sources.update(_read_sources(arguments.paths))
+    mismatches = compare_expected(SCOPES_SOURCE_NAME, SCOPES_MODULE, SCOPES_MODULE_ERRORS)
+    mismatches.extend(compare_engines(sources, arguments.engines))
+    for mismatch in mismatches:
+        print(mismatch)
+    print(f"compared {len(arguments.engines)} engines on {len(sources)} sources: {len(mismatches)} mismatches")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import sys
+import tempfile
+from typing import List, Sequence
+
+from flake8_six_compatablity_plugin.policy_file import load_policy_file
+
+ERROR_NUMBERS = frozenset((1, 9, 16))
+POLICY_FILE = """[vendor]
+select = []
+
+[services]
+ignore = ["SIX009"]
+"""
+# The files under the policy file, and the error numbers of the policy each of them must resolve to.
+EXPECTED_ERROR_NUMBERS = {
+    "top.py": ERROR_NUMBERS,
+    os.path.join("vendor", "v.py"): frozenset(),
+    os.path.join("services", "api", "s.py"): frozenset((1, 16)),
+}
+LINK_NAME = "link"
+REAL_DIRECTORY_NAME = "real"
+
+
+def check_policy_paths(directory: str) -> List[str]:
+    """
+    Resolve the files of a policy tree through a symlink to its directory, and through its real directory, with the
+    policy file loaded through either of them.
+
+    Args:
+        directory (str): An empty directory to create the policy tree in.
+
+    Returns:
+        List[str]: A description of each file that resolved to a wrong policy.
+    """
+    real_directory = os.path.join(directory, REAL_DIRECTORY_NAME)
+    link_directory = os.path.join(directory, LINK_NAME)
+    for relative_path in EXPECTED_ERROR_NUMBERS:
+        os.makedirs(os.path.dirname(os.path.join(real_directory, relative_path)), exist_ok=True)
+        with open(os.path.join(real_directory, relative_path), "w", encoding="utf-8") as source_file:
+            source_file.write('open(u"x")\n')
+    with open(os.path.join(real_directory, "policy.toml"), "w", encoding="utf-8") as policy_file:
+        policy_file.write(POLICY_FILE)
+    os.symlink(real_directory, link_directory, target_is_directory=True)
+
+    mismatches = []
+    for policy_directory in (real_directory, link_directory):
+        policy_trie = load_policy_file(os.path.join(policy_directory, "policy.toml"), ERROR_NUMBERS)
+        for files_directory in (real_directory, link_directory):
+            for relative_path, expected in EXPECTED_ERROR_NUMBERS.items():
+                path = os.path.join(files_directory, relative_path)
+                error_numbers = policy_trie.resolve(path).error_numbers
+                if error_numbers != expected:
+                    mismatches.append(
+                        f"{path} with the policy file of {policy_directory}: resolved to {sorted(error_numbers)}, "
+                        f"expected {sorted(expected)}"
+                    )
+    return mismatches
+
+
+def main(argv: Sequence[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Check that the files of a policy tree resolve to the same policies through a symlink."
+    )
+    parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        try:
+            mismatches = check_policy_paths(directory)
+        except (NotImplementedError, OSError) as error:
+            # Creating symlinks needs a privilege on windows.
+            print(f"symlinks could not be created, skipped: {error}")
+            return 0
+
+    for mismatch in mismatches:
+        print(mismatch)
+    print(f"resolved {len(EXPECTED_ERROR_NUMBERS)} files through symlinks: {len(mismatches)} mismatches")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
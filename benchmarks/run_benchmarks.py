@@ -0,0 +1,538 @@
+#!/usr/bin/env python3
+import argparse
+import ast
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tokenize
+import tracemalloc
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List, Sequence
+
+from benchmarks.corpus import CORPUS_SIZES, generate_corpus, generate_data_module
+from benchmarks.differential import PLUGIN_ENGINE, compare_engines
+from flake8_six_compatablity_plugin.checker_profiler import FileProfile, ProfiledChecker
+from flake8_six_compatablity_plugin.flake8_plugin import ENGINES, SixCompatibilityPlugin
+from flake8_six_compatablity_plugin.six_checkers.six_compatibility_dispatcher import all_checkers, node_checkers_for
+
+DEFAULT_REPEAT = 3
+# The modules whose import time is measured - the plugin alone, which loads the checkers and the modules of the
+# optional features lazily, and the plugin with all of the modules it imported eagerly before they were loaded lazily.
+IMPORT_TIME_MODULES = {
+    "plugin": "flake8_six_compatablity_plugin.flake8_plugin",
+    "eager": ", ".join(
+        (
+            "flake8_six_compatablity_plugin.flake8_plugin",
+            "flake8_six_compatablity_plugin.baseline",
+            "flake8_six_compatablity_plugin.checker_profiler",
+            "flake8_six_compatablity_plugin.incremental",
+            "flake8_six_compatablity_plugin.policy_file",
+            "flake8_six_compatablity_plugin.policy_profiles",
+            "flake8_six_compatablity_plugin.project_index",
+            "flake8_six_compatablity_plugin.result_cache",
+            "flake8_six_compatablity_plugin.six_checkers.six_compatibility_dispatcher",
+            "flake8_six_compatablity_plugin.six_checkers.six_compatibility_node_visitor",
+        )
+    ),
+}
+# The plugin alone may take at most this fraction of the time of importing it with all of the modules eagerly.
+MAX_PLUGIN_IMPORT_RATIO = 0.75
+# The string prefix check may add at most this fraction to the time of checking a string heavy data module.
+MAX_STRING_PREFIX_OVERHEAD = 0.05
+# The sizes of the rule files that are compared, and how much slower the larger one may check the corpus.
+RULE_FILE_SIZES = (5, 200)
+MAX_RULE_FILE_SLOWDOWN = 0.1
+RULE_KIND_NAMES = {
+    "call": "banned_call_{}",
+    "attribute": "banned_module_{}.attribute",
+    "import": "banned_package_{}.module",
+    "function": "banned_method_{}",
+}
+IMPORT_TIME_SCRIPT = "import time; start_time = time.perf_counter(); import {}; print(time.perf_counter() - start_time)"
+# A run regresses when it is slower than the baseline by more than this fraction.
+DEFAULT_THRESHOLD = 0.25
+# A run regresses when it takes more memory than the baseline by more than this fraction.
+DEFAULT_MEMORY_THRESHOLD = 0.1
+# A checker regresses only when it is slower, or takes more memory, than the baseline by more than these amounts as
+# well, since the measurements of the checkers that barely run are too small to compare by fractions.
+MIN_CHECKER_REGRESSION_SECONDS = 0.002
+MIN_MEMORY_REGRESSION_BYTES = 16 * 1024
+# The results the run is compared against by default, written by --write-baseline. It holds only the peak memory,
+# which does not depend on the machine, but does depend on the python version it was recorded on.
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def _run_engine(engine_name: str, tree: ast.AST, lines: List[str]) -> None:
+    if engine_name == PLUGIN_ENGINE:
+        list(SixCompatibilityPlugin(tree, lines).run())
+        return
+
+    visitor = ENGINES[engine_name]()
+    visitor.visit(tree)
+
+
+def _best_time(function: Callable[[], None], repeat: int) -> float:
+    best_time = float("inf")
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        function()
+        best_time = min(best_time, time.perf_counter() - start_time)
+    return best_time
+
+
+def _mean_time(function: Callable[[], None], number: int) -> float:
+    start_time = time.perf_counter()
+    for _ in range(number):
+        function()
+    return (time.perf_counter() - start_time) / number
+
+
+def _peak_memory(function: Callable[[], None]) -> int:
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+class MemoryProfiledChecker(ProfiledChecker):
+    """
+    A checker wrapper that records the peak memory a single call of the wrapped checker allocates, above the memory
+    that was allocated when it was called. tracemalloc must be tracing while it runs.
+    """
+
+    def __init__(self, checker):
+        super().__init__(checker)
+        self.peak_memory_bytes = 0
+
+    def check(self, node: ast.AST, errors) -> None:
+        start_memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        self.checker.check(node, errors)
+        self.peak_memory_bytes = max(self.peak_memory_bytes, tracemalloc.get_traced_memory()[1] - start_memory)
+        self.calls += 1
+
+
+class MemoryProfile(FileProfile):
+    profiled_checker_type = MemoryProfiledChecker
+
+
+def benchmark_engines(
+    corpus: Dict[str, str], engine_names: Sequence[str], repeat: int
+) -> Dict[str, Dict[str, dict]]:
+    """
+    Measure the throughput and peak memory of each engine on each module of the corpus.
+    The modules are parsed in advance, so only the walk and the checkers are measured.
+
+    Returns:
+        Dict[str, Dict[str, dict]]: The measurements of each engine on each module.
+    """
+    results = defaultdict(dict)
+    for size_name, source in corpus.items():
+        tree = ast.parse(source)
+        lines = source.splitlines(True)
+        nodes_count = sum(1 for _ in ast.walk(tree))
+        for engine_name in engine_names:
+            run = lambda: _run_engine(engine_name, tree, lines)  # noqa: E731
+            seconds = _best_time(run, repeat)
+            results[engine_name][size_name] = {
+                "seconds": seconds,
+                "lines_per_second": len(lines) / seconds,
+                "nodes_per_second": nodes_count / seconds,
+                "peak_memory_bytes": _peak_memory(run),
+            }
+    return dict(results)
+
+
+def benchmark_checkers(corpus: Dict[str, str]) -> Dict[str, dict]:
+    """
+    Measure the time spent in each checker, and in the checkers of each node type, over the whole corpus, and the
+    peak memory a single check of each of them allocates.
+    The memory is measured in a separate walk, since tracing the allocations slows down the checkers.
+
+    Returns:
+        Dict[str, dict]: The measurements per node type and per checker.
+    """
+    profile = FileProfile("corpus")
+    dispatcher = profile.create_dispatcher(all_checkers())
+
+    trees = [ast.parse(source) for source in corpus.values()]
+    nodes_counts = Counter()
+    for tree in trees:
+        nodes_counts.update(type(node).__name__ for node in ast.walk(tree))
+        dispatcher.visit(tree)
+
+    memory_profile = MemoryProfile("corpus")
+    memory_dispatcher = memory_profile.create_dispatcher(all_checkers())
+    tracemalloc.start()
+    try:
+        for tree in trees:
+            memory_dispatcher.visit(tree)
+    finally:
+        tracemalloc.stop()
+
+    node_types = defaultdict(lambda: {"nodes": 0, "checks": 0, "seconds": 0.0, "peak_memory_bytes": 0})
+    checkers = defaultdict(lambda: {"checks": 0, "seconds": 0.0, "peak_memory_bytes": 0})
+    for node_type_name, checker_name, calls, seconds, _ in profile.to_record()["checkers"]:
+        node_types[node_type_name]["seconds"] += seconds
+        node_types[node_type_name]["checks"] += calls
+        checkers[checker_name]["seconds"] += seconds
+        checkers[checker_name]["checks"] += calls
+    for node_type_name in node_types:
+        node_types[node_type_name]["nodes"] = nodes_counts[node_type_name]
+    for node_type_name, node_checkers in node_checkers_for(all_checkers()).items():
+        for checker in node_checkers:
+            peak_memory_bytes = memory_profile.profiled_checker(node_type_name, checker).peak_memory_bytes
+            if node_type_name in node_types:
+                node_type = node_types[node_type_name]
+                node_type["peak_memory_bytes"] = max(node_type["peak_memory_bytes"], peak_memory_bytes)
+            if checker.__name__ in checkers:
+                checker_measurement = checkers[checker.__name__]
+                checker_measurement["peak_memory_bytes"] = max(
+                    checker_measurement["peak_memory_bytes"], peak_memory_bytes
+                )
+
+    return {"node_types": dict(node_types), "checkers": dict(checkers)}
+
+
+def benchmark_import_time(repeat: int) -> Dict[str, float]:
+    """
+    Measure the import time of each of the IMPORT_TIME_MODULES, each in a new interpreter.
+
+    Returns:
+        Dict[str, float]: The best import time in seconds of each module.
+    """
+    import_times = {}
+    for name, module in IMPORT_TIME_MODULES.items():
+        import_times[name] = min(
+            float(
+                subprocess.run(
+                    [sys.executable, "-c", IMPORT_TIME_SCRIPT.format(module)],
+                    check=True,
+                    stdout=subprocess.PIPE,
+                    universal_newlines=True,
+                ).stdout
+            )
+            for _ in range(repeat)
+        )
+    return import_times
+
+
+def benchmark_string_prefix(size_names: Sequence[str], repeat: int) -> Dict[str, dict]:
+    """
+    Measure the time the token based string prefix check adds to the plugin, on string heavy data modules.
+
+    The tokens are generated in advance, like flake8 does for every file. The overhead is measured against the time
+    of checking the file with the plugin under flake8 - generating its tokens, parsing its tree, and running the
+    plugin without the string prefix check. The overhead against the plugin run alone is reported as well.
+
+    Returns:
+        Dict[str, dict]: The measurements on each data module.
+    """
+    results = {}
+    for size_name in size_names:
+        source = generate_data_module(CORPUS_SIZES[size_name])
+        lines = source.splitlines(True)
+        # Each run is repeated to take a measurable time, even on the small modules.
+        number = max(CORPUS_SIZES["medium"] // CORPUS_SIZES[size_name], 1)
+        tokens_seconds = min(
+            _mean_time(lambda: list(tokenize.generate_tokens(io.StringIO(source).readline)), number)
+            for _ in range(repeat)
+        )
+        parse_seconds = min(_mean_time(lambda: ast.parse(source), number) for _ in range(repeat))
+        tree = ast.parse(source)
+        file_tokens = list(tokenize.generate_tokens(io.StringIO(source).readline))
+
+        # Both plugin runs are timed alternately, so noise affects both alike.
+        plugin_seconds = string_prefix_seconds = float("inf")
+        for _ in range(repeat):
+            plugin_seconds = min(
+                plugin_seconds, _mean_time(lambda: list(SixCompatibilityPlugin(tree, lines).run()), number)
+            )
+            string_prefix_seconds = min(
+                string_prefix_seconds,
+                _mean_time(lambda: list(SixCompatibilityPlugin(tree, lines, size_name, file_tokens).run()), number),
+            )
+        added_seconds = max(string_prefix_seconds - plugin_seconds, 0.0)
+        results[size_name] = {
+            "tokens": len(file_tokens),
+            "file_seconds": tokens_seconds + parse_seconds + plugin_seconds,
+            "plugin_seconds": plugin_seconds,
+            "string_prefix_seconds": string_prefix_seconds,
+            "added_seconds": added_seconds,
+            "overhead": added_seconds / (tokens_seconds + parse_seconds + plugin_seconds),
+            "plugin_overhead": added_seconds / plugin_seconds,
+        }
+    return results
+
+
+def _write_rule_file(directory: str, rules_count: int) -> str:
+    """
+    Returns:
+        str: The path of a rule file with the given number of rules, of all of the kinds.
+    """
+    path = os.path.join(directory, f"rules_{rules_count}.toml")
+    kinds = list(RULE_KIND_NAMES.items())
+    with open(path, "w", encoding="utf-8") as rule_file:
+        for index in range(rules_count):
+            kind, name_format = kinds[index % len(kinds)]
+            rule_file.write(f'[SIX{100 + index}]\nkind = "{kind}"\n')
+            rule_file.write(f'name = "{name_format.format(index)}"\nmessage = "rule {index}"\n\n')
+    return path
+
+
+def benchmark_rule_files(corpus: Dict[str, str], repeat: int) -> Dict[str, float]:
+    """
+    Measure the time the plugin takes to check the corpus with rule files of each of the RULE_FILE_SIZES.
+
+    Returns:
+        Dict[str, float]: The seconds of checking the whole corpus, by the number of rules.
+    """
+    modules = [(ast.parse(source), source.splitlines(True)) for source in corpus.values()]
+
+    def check_corpus() -> None:
+        for tree, lines in modules:
+            list(SixCompatibilityPlugin(tree, lines).run())
+
+    results = {str(rules_count): float("inf") for rules_count in RULE_FILE_SIZES}
+    with tempfile.TemporaryDirectory() as directory:
+        paths = {str(rules_count): _write_rule_file(directory, rules_count) for rules_count in RULE_FILE_SIZES}
+        try:
+            # The rule files are timed alternately, so noise affects all of them alike.
+            for _ in range(repeat):
+                for rules_count, path in paths.items():
+                    SixCompatibilityPlugin.load_rule_file(path)
+                    results[rules_count] = min(results[rules_count], _best_time(check_corpus, 1))
+        finally:
+            SixCompatibilityPlugin.load_rule_file(None)
+    return results
+
+
+def total_string_prefix_overhead(measurements: Dict[str, dict]) -> float:
+    """
+    Args:
+        measurements (Dict[str, dict]): The string prefix measurements of each data module.
+
+    Returns:
+        float: The time the string prefix check adds to checking all of the data modules, as a fraction of it.
+    """
+    file_seconds = sum(measurement["file_seconds"] for measurement in measurements.values())
+    if not file_seconds:
+        return 0.0
+    return sum(measurement["added_seconds"] for measurement in measurements.values()) / file_seconds
+
+
+def _compare(
+    name: str, measurement: dict, baseline_measurement: dict, thresholds: Dict[str, float], minimums: Dict[str, float]
+) -> List[str]:
+    """
+    Returns:
+        List[str]: A description of each of the given measurements, like "seconds", that exceeds its baseline value
+            by more than its threshold fraction, and by more than its minimum.
+    """
+    regressions = []
+    for key, threshold in thresholds.items():
+        value = measurement.get(key)
+        baseline_value = baseline_measurement.get(key)
+        if value is None or baseline_value is None:
+            continue
+        if value > baseline_value * (1 + threshold) and value - baseline_value > minimums.get(key, 0):
+            value_format = "d" if isinstance(value, int) and isinstance(baseline_value, int) else ".4f"
+            regressions.append(f"{name}: {key} {value:{value_format}}, baseline {baseline_value:{value_format}}")
+    return regressions
+
+
+def memory_baseline(results: dict) -> dict:
+    """
+    Args:
+        results (dict): The results of a run.
+
+    Returns:
+        dict: The peak memory of each engine on each module, and of each checker, out of the results - which can be
+            compared on any machine with the same python version.
+    """
+    return {
+        "python": results["python"],
+        "engines": {
+            engine_name: {
+                size_name: {"peak_memory_bytes": measurement["peak_memory_bytes"]}
+                for size_name, measurement in sizes.items()
+            }
+            for engine_name, sizes in results["engines"].items()
+        },
+        "checkers": {
+            checker_name: {"peak_memory_bytes": measurement["peak_memory_bytes"]}
+            for checker_name, measurement in results["checkers"].items()
+        },
+    }
+
+
+def _python_minor_version(version: str) -> str:
+    return ".".join(version.split(".")[:2])
+
+
+def find_regressions(
+    results: dict, baseline: dict, threshold: float, memory_threshold: float = DEFAULT_MEMORY_THRESHOLD
+) -> List[str]:
+    """
+    Args:
+        results (dict): The results of the current run.
+        baseline (dict): The results of a previous run.
+        threshold (float): The fraction by which a measurement may be slower than the baseline.
+        memory_threshold (float): The fraction by which a measurement may take more memory than the baseline.
+
+    Returns:
+        List[str]: A description of each engine and module, and of each checker, that regressed.
+    """
+    thresholds = {"seconds": threshold, "peak_memory_bytes": memory_threshold}
+    regressions = []
+    for engine_name, sizes in baseline.get("engines", {}).items():
+        for size_name, baseline_measurement in sizes.items():
+            measurement = results["engines"].get(engine_name, {}).get(size_name)
+            if measurement is not None:
+                regressions += _compare(
+                    f"{engine_name} on {size_name}",
+                    measurement,
+                    baseline_measurement,
+                    thresholds,
+                    {"peak_memory_bytes": MIN_MEMORY_REGRESSION_BYTES},
+                )
+    for checker_name, baseline_measurement in baseline.get("checkers", {}).items():
+        measurement = results["checkers"].get(checker_name)
+        if measurement is not None:
+            regressions += _compare(
+                checker_name,
+                measurement,
+                baseline_measurement,
+                thresholds,
+                {"seconds": MIN_CHECKER_REGRESSION_SECONDS, "peak_memory_bytes": MIN_MEMORY_REGRESSION_BYTES},
+            )
+    return regressions
+
+
+def main(argv: Sequence[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the SIX checker engines.")
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        choices=tuple(CORPUS_SIZES),
+        default=list(CORPUS_SIZES),
+        help="The corpus modules to benchmark on. (Default: all of them)",
+    )
+    parser.add_argument(
+        "--engines",
+        nargs="+",
+        default=list(ENGINES) + [PLUGIN_ENGINE],
+        help="The engines to benchmark. (Default: all of them)",
+    )
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="(Default: %(default)s)")
+    parser.add_argument("--output", help="A JSON file to write the results to.")
+    parser.add_argument("--write-baseline", help="A JSON file to write the peak memory measurements to, as a baseline.")
+    parser.add_argument(
+        "--baseline",
+        default=BASELINE_PATH,
+        help="A JSON file of previous results to compare against, or an empty string to not compare. "
+        "(Default: the baseline of the repository)",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="The fraction by which a run may be slower than the baseline. (Default: %(default)s)",
+    )
+    parser.add_argument(
+        "--memory-threshold",
+        type=float,
+        default=DEFAULT_MEMORY_THRESHOLD,
+        help="The fraction by which a run may take more memory than the baseline. (Default: %(default)s)",
+    )
+    arguments = parser.parse_args(argv)
+
+    corpus = {size_name: source for size_name, source in generate_corpus().items() if size_name in arguments.sizes}
+
+    mismatches = compare_engines(corpus, [name for name in arguments.engines if name != "visitor"])
+    for mismatch in mismatches:
+        print(f"MISMATCH {mismatch}")
+
+    results = {
+        "python": platform.python_version(),
+        "engines": benchmark_engines(corpus, arguments.engines, arguments.repeat),
+        "import_seconds": benchmark_import_time(arguments.repeat),
+        "string_prefix": benchmark_string_prefix(arguments.sizes, arguments.repeat),
+        "rule_file_seconds": benchmark_rule_files(corpus, arguments.repeat),
+        **benchmark_checkers(corpus),
+    }
+
+    for engine_name, sizes in results["engines"].items():
+        for size_name, measurement in sizes.items():
+            print(
+                f"{engine_name:>12} {size_name:>8}: {measurement['seconds']:.4f}s "
+                f"{measurement['lines_per_second']:>12.0f} lines/s "
+                f"{measurement['peak_memory_bytes'] / 1024:>10.0f} KiB peak"
+            )
+
+    for name, seconds in results["import_seconds"].items():
+        print(f"{'import':>12} {name:>8}: {seconds:.4f}s")
+
+    for size_name, measurement in results["string_prefix"].items():
+        print(
+            f"{'prefix':>12} {size_name:>8}: {measurement['overhead']:.1%} of the file, "
+            f"{measurement['plugin_overhead']:.1%} of the plugin run"
+        )
+    # The overhead is checked on all of the data modules together, since the time of a single small module is too
+    # noisy to compare to a few percent.
+    regressions = []
+    plugin_import_seconds = results["import_seconds"]["plugin"]
+    eager_import_seconds = results["import_seconds"]["eager"]
+    if plugin_import_seconds > eager_import_seconds * MAX_PLUGIN_IMPORT_RATIO:
+        regressions.append(
+            f"import: the plugin takes {plugin_import_seconds:.4f}s, {plugin_import_seconds / eager_import_seconds:.0%} "
+            f"of importing all of its modules eagerly, allowed {MAX_PLUGIN_IMPORT_RATIO:.0%}"
+        )
+    string_prefix_overhead = total_string_prefix_overhead(results["string_prefix"])
+    print(f"{'prefix':>12} {'total':>8}: {string_prefix_overhead:.1%} of the files")
+    if string_prefix_overhead > MAX_STRING_PREFIX_OVERHEAD:
+        regressions.append(
+            f"string prefix check: {string_prefix_overhead:.1%} overhead, allowed {MAX_STRING_PREFIX_OVERHEAD:.0%}"
+        )
+
+    for rules_count, seconds in results["rule_file_seconds"].items():
+        print(f"{'rules':>12} {rules_count:>8}: {seconds:.4f}s")
+    smallest_seconds = results["rule_file_seconds"][str(RULE_FILE_SIZES[0])]
+    largest_seconds = results["rule_file_seconds"][str(RULE_FILE_SIZES[-1])]
+    if largest_seconds > smallest_seconds * (1 + MAX_RULE_FILE_SLOWDOWN):
+        regressions.append(
+            f"rule files: {RULE_FILE_SIZES[-1]} rules take {largest_seconds:.4f}s, {RULE_FILE_SIZES[0]} rules take "
+            f"{smallest_seconds:.4f}s"
+        )
+
+    if arguments.output:
+        with open(arguments.output, "w", encoding="utf-8") as output_file:
+            json.dump(results, output_file, indent=2, sort_keys=True)
+
+    if arguments.write_baseline:
+        with open(arguments.write_baseline, "w", encoding="utf-8") as baseline_file:
+            json.dump(memory_baseline(results), baseline_file, indent=2, sort_keys=True)
+            baseline_file.write("\n")
+
+    if arguments.baseline:
+        with open(arguments.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        if _python_minor_version(baseline["python"]) == _python_minor_version(results["python"]):
+            regressions += find_regressions(results, baseline, arguments.threshold, arguments.memory_threshold)
+        else:
+            print(f"{arguments.baseline} was recorded on python {baseline['python']}, and is not compared against")
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+
+    return 1 if mismatches or regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+import argparse
+import io
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List, Sequence
+
+from benchmarks.corpus import generate_data_module, generate_module
+from flake8_six_compatablity_plugin.cli import FileErrors, check_source
+from flake8_six_compatablity_plugin.flake8_plugin import ENGINES, SixCompatibilityPlugin
+from flake8_six_compatablity_plugin.six_checkers.rule_file import load_rule_file
+
+DEFAULT_THREADS = 16
+DEFAULT_ROUNDS = 3
+# The sizes of the generated modules - small enough for many rounds, and of different sizes so the threads interleave.
+MODULE_SIZES = (40, 120, 300, 700)
+MODULES_PER_SIZE = 8
+DATA_MODULE_SIZE = 200
+# Switch between the threads as often as possible, so builds with a GIL interleave the checks as well.
+SWITCH_INTERVAL = 1e-6
+RULES = {
+    "SIX101": ("call", "unicode", "unicode was removed in python3"),
+    "SIX102": ("attribute", "os.getcwdu", "os.getcwdu was removed in python3"),
+    "SIX103": ("import", "cPickle", "cPickle was removed in python3"),
+    "SIX104": ("function", "__nonzero__", "__nonzero__ was renamed to __bool__ in python3"),
+    "SIX105": ("call", "load_3", "load_3 is banned"),
+}
+
+
+def generate_stress_corpus() -> Dict[str, str]:
+    """
+    Returns:
+        Dict[str, str]: A dictionary that maps between a module name and the source of the module.
+    """
+    sources = {}
+    for size in MODULE_SIZES:
+        for seed in range(MODULES_PER_SIZE):
+            sources[f"module_{size}_{seed}.py"] = generate_module(size, seed)
+    sources["data.py"] = generate_data_module(DATA_MODULE_SIZE)
+    return sources
+
+
+def _write_rule_file(directory: str) -> str:
+    path = os.path.join(directory, "rules.ini")
+    with open(path, "w", encoding="utf-8") as rule_file:
+        for code, (kind, name, message) in RULES.items():
+            rule_file.write(f"[{code}]\nkind = {kind}\nname = {name}\nmessage = {message}\n\n")
+    return path
+
+
+def _run_threads(threads_count: int, target) -> None:
+    """
+    Run the given target in threads that start at once, and re-raise the first exception of any of them.
+
+    Args:
+        threads_count (int): The number of threads.
+        target: Called with the index of each thread.
+    """
+    barrier = threading.Barrier(threads_count)
+    exceptions = []
+
+    def run(index: int) -> None:
+        barrier.wait()
+        try:
+            target(index)
+        except BaseException as exception:
+            exceptions.append(exception)
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(threads_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if exceptions:
+        raise exceptions[0]
+
+
+def compile_rule_file_concurrently(path: str, threads_count: int) -> bool:
+    """
+    Args:
+        path (str): The path of a rule file that was not loaded yet.
+        threads_count (int): The number of threads that load it at once.
+
+    Returns:
+        bool: True if all of the threads got the same checkers, False otherwise.
+    """
+    rule_sets = [None] * threads_count
+
+    def load(index: int) -> None:
+        rule_sets[index] = load_rule_file(path)
+
+    _run_threads(threads_count, load)
+    return all(rule_set is rule_sets[0] for rule_set in rule_sets)
+
+
+def check_concurrently(sources: Dict[str, str], threads_count: int, rounds: int) -> List[Dict[str, FileErrors]]:
+    """
+    Check all of the sources in each of the given number of threads, each in its own random order.
+
+    Args:
+        sources (Dict[str, str]): A dictionary that maps between a module name and the source of the module.
+        threads_count (int): The number of threads.
+        rounds (int): The number of times each thread checks each source.
+
+    Returns:
+        List[Dict[str, FileErrors]]: The errors each thread found in each source, for each round.
+    """
+    results = [None] * (threads_count * rounds)
+
+    def check(index: int) -> None:
+        randomizer = random.Random(index)
+        for round_index in range(rounds):
+            names = list(sources)
+            randomizer.shuffle(names)
+            results[index * rounds + round_index] = {
+                name: check_source(name, io.StringIO(sources[name]).readlines()) for name in names
+            }
+
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(SWITCH_INTERVAL)
+    try:
+        _run_threads(threads_count, check)
+    finally:
+        sys.setswitchinterval(switch_interval)
+    return results
+
+
+def main(argv: Sequence[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Check that checking files in many threads at once finds the same errors as checking them serially."
+    )
+    parser.add_argument("paths", nargs="*", help="Extra files to check, besides the synthetic corpus.")
+    parser.add_argument(
+        "--threads", type=int, default=DEFAULT_THREADS, help="The number of threads. (Default: %(default)s)"
+    )
+    parser.add_argument(
+        "--rounds",
+        type=int,
+        default=DEFAULT_ROUNDS,
+        help="The number of times each thread checks each file. (Default: %(default)s)",
+    )
+    parser.add_argument(
+        "--engines",
+        nargs="+",
+        default=list(ENGINES),
+        help="The engines to check with. (Default: all of them)",
+    )
+    arguments = parser.parse_args(argv)
+
+    sources = generate_stress_corpus()
+    for path in arguments.paths:
+        with open(path, encoding="utf-8") as source_file:
+            sources[path] = source_file.read()
+
+    mismatches = []
+    with tempfile.TemporaryDirectory() as directory:
+        rule_file_path = _write_rule_file(directory)
+        if not compile_rule_file_concurrently(rule_file_path, arguments.threads):
+            mismatches.append("the threads that loaded the rule file at once got different checkers")
+        SixCompatibilityPlugin.load_rule_file(rule_file_path)
+
+        for engine_name in arguments.engines:
+            SixCompatibilityPlugin.engine = engine_name
+            # The threads run first, so they also race to import the checkers and to create the engine tables.
+            start_time = time.perf_counter()
+            thread_results = check_concurrently(sources, arguments.threads, arguments.rounds)
+            elapsed_time = time.perf_counter() - start_time
+            reference = {name: check_source(name, io.StringIO(source).readlines()) for name, source in sources.items()}
+            for result_index, result in enumerate(thread_results):
+                for name, errors in result.items():
+                    if errors != reference[name]:
+                        mismatches.append(
+                            f"{engine_name}: thread {result_index // arguments.rounds} round "
+                            f"{result_index % arguments.rounds} found {len(errors)} errors in {name}, "
+                            f"the serial check found {len(reference[name])}"
+                        )
+            print(
+                f"{engine_name}: {arguments.threads} threads checked {len(sources)} sources {arguments.rounds} times "
+                f"in {elapsed_time:.3f}s, {sum(map(len, reference.values()))} errors per round"
+            )
+
+    for mismatch in mismatches:
+        print(mismatch)
+    gil = "enabled" if getattr(sys, "_is_gil_enabled", lambda: True)() else "disabled"
+    print(f"{len(mismatches)} mismatches (the GIL is {gil})")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import tarfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from flake8_six_compatablity_plugin.cli import ERROR_FORMAT, FileErrors, check_content
+from flake8_six_compatablity_plugin.flake8_plugin import SixCompatibilityPlugin
+from flake8_six_compatablity_plugin.result_cache import atomic_write_json, checkers_signature
+
+PYTHON_MEMBER_SUFFIX = ".py"
+ZIP_SUFFIXES = (".whl", ".zip", ".egg")
+TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+# The name and version at the start of the file name of a wheel or an sdist, like six-1.16.0-py2.py3-none-any.whl.
+ARCHIVE_NAME_PATTERN = re.compile(r"(?P<name>.+?)-(?P<version>\d[^-]*?)(?:-|$)")
+AUDIT_ENTRY_SUFFIX = ".json"
+# Archives are hashed in blocks, so large archives are not read into memory at once.
+HASH_BLOCK_SIZE = 1024 * 1024
+# Errors of the audit itself, like an archive that can not be read, as opposed to SIX errors.
+AUDIT_ERROR_EXIT_CODE = 2
+
+# The errors of each python member of a distribution, as (member name, errors).
+MemberErrors = List[Tuple[str, FileErrors]]
+
+
+class AuditedDistribution(NamedTuple):
+    """
+    The errors of the python members of a single wheel, sdist or installed distribution.
+    """
+
+    target: str
+    name: str
+    version: str
+    members: MemberErrors
+    cached: bool
+
+
+def _zip_members(path: str) -> Iterator[Tuple[str, bytes]]:
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            if not info.is_dir() and info.filename.endswith(PYTHON_MEMBER_SUFFIX):
+                yield info.filename, archive.read(info)
+
+
+def _tar_members(path: str) -> Iterator[Tuple[str, bytes]]:
+    # The archive is read as a stream, so a compressed archive is decompressed once, from start to end.
+    with tarfile.open(path, "r|*") as archive:
+        for member in archive:
+            if member.isfile() and member.name.endswith(PYTHON_MEMBER_SUFFIX):
+                yield member.name, archive.extractfile(member).read()
+
+
+def archive_members(path: str) -> Iterator[Tuple[str, bytes]]:
+    """
+    Read the python members of the given archive in memory, without extracting it.
+
+    Args:
+        path (str): The path of a wheel, zip, egg or tar archive.
+
+    Yields:
+        Tuple[str, bytes]: The name and content of each python member, in the order of the archive.
+
+    Raises:
+        ValueError: If the archive is not of a known type.
+    """
+    if path.endswith(ZIP_SUFFIXES):
+        return _zip_members(path)
+    if path.endswith(TAR_SUFFIXES):
+        return _tar_members(path)
+    raise ValueError(f"Unknown archive type: {path}")
+
+
+def archive_name(path: str) -> Tuple[str, str]:
+    """
+    Args:
+        path (str): The path of a wheel or an sdist.
+
+    Returns:
+        Tuple[str, str]: The name and version of the distribution, from the file name of the archive. The version is
+            empty if the file name does not have one.
+    """
+    file_name = os.path.basename(path)
+    for suffix in ZIP_SUFFIXES + TAR_SUFFIXES:
+        if file_name.endswith(suffix):
+            file_name = file_name[: -len(suffix)]
+            break
+    match = ARCHIVE_NAME_PATTERN.match(file_name)
+    if match is None:
+        return file_name, ""
+    return match.group("name"), match.group("version")
+
+
+def _archive_hash(path: str) -> str:
+    archive_hash = hashlib.sha256()
+    with open(path, "rb") as archive:
+        for block in iter(lambda: archive.read(HASH_BLOCK_SIZE), b""):
+            archive_hash.update(block)
+    return archive_hash.hexdigest()
+
+
+def _installed_distribution(name: str):
+    # importlib.metadata is slow to import, and is needed only for installed distributions.
+    from importlib import metadata
+
+    return metadata.distribution(name)
+
+
+def _installed_members(distribution) -> Iterator[Tuple[str, bytes]]:
+    for file in distribution.files or ():
+        # Files outside of the distribution directory, like scripts, are listed with a relative path to them.
+        if file.suffix == PYTHON_MEMBER_SUFFIX and ".." not in file.parts:
+            yield str(distribution.locate_file(file)), file.read_binary()
+
+
+def _installed_hash(distribution) -> str:
+    """
+    Returns:
+        str: The hash of the RECORD of the distribution, which has the hash of each of its files, or of the content of
+            its python files if it has no RECORD.
+    """
+    installed_hash = hashlib.sha256()
+    record = distribution.read_text("RECORD")
+    if record is not None:
+        installed_hash.update(record.encode("utf-8", "surrogatepass"))
+        return installed_hash.hexdigest()
+    for member_name, content in _installed_members(distribution):
+        installed_hash.update(member_name.encode("utf-8", "surrogatepass") + b"\0" + content)
+    return installed_hash.hexdigest()
+
+
+class AuditCache:
+    """
+    A persistent cache of the errors of each audited distribution, keyed by its name, version and the hash of its
+    archive - or of its RECORD, for an installed distribution - salted with the plugin version and the checkers, so
+    auditing an unchanged distribution again does not read its members at all.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._salt = f"{SixCompatibilityPlugin.version}\0{checkers_signature(SixCompatibilityPlugin.rule_set)}"
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, name: str, version: str, content_hash: str) -> str:
+        key_hash = hashlib.sha256(f"{self._salt}\0{name}\0{version}\0{content_hash}".encode("utf-8", "surrogatepass"))
+        return key_hash.hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, key + AUDIT_ENTRY_SUFFIX)
+
+    def get(self, key: str) -> Optional[MemberErrors]:
+        """
+        Args:
+            key (str): The key of the entry.
+
+        Returns:
+            Optional[MemberErrors]: The cached errors of each member, or None if the key is not cached.
+        """
+        try:
+            with open(self._entry_path(key), encoding="utf-8") as entry:
+                members = json.load(entry)
+        except (OSError, ValueError):
+            return None
+        return [(member_name, [tuple(error) for error in errors]) for member_name, errors in members]
+
+    def set(self, key: str, members: MemberErrors) -> None:
+        atomic_write_json(self._entry_path(key), members)
+
+
+def audit(target: str, cache_directory: Optional[str] = None) -> AuditedDistribution:
+    """
+    Check the python members of the given archive or installed distribution, without extracting them.
+
+    Args:
+        target (str): The path of a wheel, sdist, zip or egg, or the name of an installed distribution.
+        cache_directory (Optional[str]): The directory to cache the errors of each distribution in.
+
+    Returns:
+        AuditedDistribution: The errors of each python member of the distribution.
+
+    Raises:
+        OSError, ValueError, zipfile.BadZipFile, tarfile.TarError: If the archive can not be read.
+        importlib.metadata.PackageNotFoundError: If the target is not an archive or an installed distribution.
+    """
+    if os.path.isfile(target):
+        name, version = archive_name(target)
+        members = archive_members(target)
+        content_hash = None if cache_directory is None else _archive_hash(target)
+    else:
+        distribution = _installed_distribution(target)
+        name, version = distribution.metadata["Name"], distribution.version
+        members = _installed_members(distribution)
+        content_hash = None if cache_directory is None else _installed_hash(distribution)
+
+    cache = key = None
+    if cache_directory is not None:
+        cache = AuditCache(cache_directory)
+        key = cache.key(name, version, content_hash)
+        cached_members = cache.get(key)
+        if cached_members is not None:
+            return AuditedDistribution(target, name, version, cached_members, True)
+
+    member_errors = [(member_name, check_content(member_name, content)) for member_name, content in members]
+    if cache is not None:
+        cache.set(key, member_errors)
+    return AuditedDistribution(target, name, version, member_errors, False)
+
+
+def _audit_or_error(target: str, cache_directory: Optional[str]) -> Union[AuditedDistribution, str]:
+    try:
+        return audit(target, cache_directory)
+    except (OSError, ValueError, EOFError, ImportError, zipfile.BadZipFile, tarfile.TarError) as error:
+        # The error is returned, so one unreadable target does not stop the audit of the others.
+        return f"{type(error).__name__}: {error}"
+
+
+def audit_targets(
+    targets: Sequence[str],
+    jobs: int = 1,
+    cache_directory: Optional[str] = None,
+    rules_file: Optional[str] = None,
+) -> Iterator[Tuple[str, Union[AuditedDistribution, str]]]:
+    """
+    Audit the given targets, in a process pool when more than one job is used. Each worker audits whole
+    distributions, since each of them has many members.
+
+    Args:
+        targets (Sequence[str]): The paths of archives and the names of installed distributions.
+        jobs (int): The number of worker processes.
+        cache_directory (Optional[str]): The directory to cache the errors of each distribution in.
+        rules_file (Optional[str]): A rule file to check along with the built-in checkers.
+
+    Yields:
+        Tuple[str, Union[AuditedDistribution, str]]: Each target, and its errors or the reason it could not be
+            audited, in the order of the given targets.
+    """
+    SixCompatibilityPlugin.load_rule_file(rules_file)
+    cache_directories = [cache_directory] * len(targets)
+    if jobs <= 1 or len(targets) <= 1:
+        yield from zip(targets, map(_audit_or_error, targets, cache_directories))
+        return
+
+    # Workers that are not forked compile the rule file themselves.
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=SixCompatibilityPlugin.load_rule_file, initargs=(rules_file,)
+    ) as executor:
+        yield from zip(targets, executor.map(_audit_or_error, targets, cache_directories))
+
+
+def _installed_distribution_names() -> List[str]:
+    from importlib import metadata
+
+    names = {distribution.metadata["Name"] for distribution in metadata.distributions()}
+    return sorted(name for name in names if name)
+
+
+def _member_path(audited: AuditedDistribution, member_name: str) -> str:
+    """
+    Returns:
+        str: The path the errors of the member are reported with - inside the archive, like zipimport paths, or the
+            path of the installed file.
+    """
+    if os.path.isfile(audited.target):
+        return f"{audited.target}/{member_name}"
+    return member_name
+
+
+def _parse_arguments(argv: Sequence[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="six-audit",
+        description="Check the python files of wheels, sdists and installed distributions, without extracting them.",
+    )
+    parser.add_argument(
+        "targets",
+        nargs="*",
+        help="Paths of wheels, sdists, zips or eggs, and names of installed distributions.",
+    )
+    parser.add_argument(
+        "--all-installed",
+        action="store_true",
+        help="Audit every distribution installed in the current environment.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="A directory to cache the errors of each distribution in, by its name, version and archive hash. "
+        "(Default: no cache)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="The number of worker processes, each auditing a whole distribution. (Default: the number of cpus)",
+    )
+    parser.add_argument(
+        "--rules-file",
+        default=None,
+        help="A TOML (.toml) or INI file of additional banned names, each with its own SIX code and message.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    The six-audit entry point.
+
+    Returns:
+        int: 2 if any target could not be audited, 1 if any error was found, 0 otherwise.
+    """
+    arguments = _parse_arguments(sys.argv[1:] if argv is None else argv)
+    targets = list(arguments.targets)
+    if arguments.all_installed:
+        targets.extend(_installed_distribution_names())
+
+    errors_count = 0
+    failed_targets_count = 0
+    for target, result in audit_targets(targets, arguments.jobs, arguments.cache_dir, arguments.rules_file):
+        if isinstance(result, str):
+            print(f"six-audit: {target}: {result}", file=sys.stderr)
+            failed_targets_count += 1
+            continue
+
+        distribution_errors_count = 0
+        for member_name, errors in result.members:
+            member_path = _member_path(result, member_name)
+            for line_number, column, msg in errors:
+                print(ERROR_FORMAT.format(path=member_path, line_number=line_number, column=column, msg=msg))
+            distribution_errors_count += len(errors)
+        errors_count += distribution_errors_count
+        cached = " (cached)" if result.cached else ""
+        print(
+            f"{result.name} {result.version}: {len(result.members)} files, {distribution_errors_count} errors{cached}",
+            file=sys.stderr,
+        )
+
+    if failed_targets_count:
+        return AUDIT_ERROR_EXIT_CODE
+    return 1 if errors_count else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
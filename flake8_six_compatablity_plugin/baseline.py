@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+import ast
+import glob
+import hashlib
+import mmap
+import os
+import shutil
+import sys
+import tempfile
+from array import array
+from typing import Iterable, List, Sequence, Tuple
+
+from flake8_six_compatablity_plugin.flake8_errors_info import SIXErrorInfo
+from flake8_six_compatablity_plugin.six_checkers.six_error_buffer import SixErrorBuffer
+
+BASELINE_MAGIC = b"SIXBASE1"
+# Each fingerprint is stored as a little endian unsigned 64 bit integer, right after the magic.
+FINGERPRINT_TYPECODE = "Q"
+FINGERPRINT_SIZE = 8
+# Each process appends the fingerprints of every file it checks to its own file in this directory, since flake8 -j
+# workers can exit without running any cleanup.
+BASELINE_PARTS_DIRECTORY_SUFFIX = ".parts"
+BASELINE_PART_FORMAT = "{}.bin"
+SCOPE_NODE_TYPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+def _line_scopes(tree: ast.AST, lines_count: int) -> List[str]:
+    """
+    Args:
+        tree (ast.AST): The tree of a file.
+        lines_count (int): The number of lines of the file.
+
+    Returns:
+        List[str]: The qualified name of the innermost function or class of each line number, or "" for the lines of
+            the module itself.
+    """
+    scopes = [""] * (lines_count + 2)
+    stack = [(tree, "")]
+    while stack:
+        node, qualname = stack.pop()
+        for child in ast.iter_child_nodes(node):
+            # Functions and classes are statements, so only the statements are walked into.
+            if isinstance(child, SCOPE_NODE_TYPES):
+                child_qualname = f"{qualname}.{child.name}" if qualname else child.name
+                # The scope is filled before the scopes nested in it, so the innermost scope of each line is kept.
+                end_lineno = min(child.end_lineno, lines_count + 1)
+                scopes[child.lineno : end_lineno + 1] = [child_qualname] * (end_lineno + 1 - child.lineno)
+                stack.append((child, child_qualname))
+            elif isinstance(child, (ast.stmt, ast.excepthandler, getattr(ast, "match_case", ast.stmt))):
+                stack.append((child, qualname))
+    return scopes
+
+
+def _normalized_path(filename: str) -> str:
+    return os.path.normpath(os.path.relpath(filename)).replace(os.sep, "/")
+
+
+def fingerprints(
+    filename: str, tree: ast.AST, lines: Sequence[str], records: Iterable[Tuple[int, int, int]]
+) -> List[int]:
+    """
+    Compute the fingerprint of each of the given errors.
+
+    A fingerprint is a 64 bit hash of the path of the file, the code of the error, the qualified name of the function
+    or class the error is in, and the source line of the error with its whitespace collapsed - so it stays the same
+    when lines are added or removed around the error, or when the error is reindented.
+
+    Args:
+        filename (str): The path of the file, relative to the current directory.
+        tree (ast.AST): The tree of the file.
+        lines (Sequence[str]): The physical lines of the file.
+        records (Iterable[Tuple[int, int, int]]): The (line_number, offset, error_number) of each error.
+
+    Returns:
+        List[int]: The fingerprint of each error, in the order of the errors.
+    """
+    records = list(records)
+    if not records:
+        return []
+
+    path = _normalized_path(filename)
+    scopes = _line_scopes(tree, len(lines))
+    result = []
+    for line_number, _, error_number in records:
+        line = " ".join(lines[line_number - 1].split()) if 0 < line_number <= len(lines) else ""
+        scope = scopes[line_number] if 0 < line_number < len(scopes) else ""
+        key = f"{path}\0{SIXErrorInfo.error_prefix}{error_number:03}\0{scope}\0{line}"
+        digest = hashlib.blake2b(key.encode("utf-8", "surrogatepass"), digest_size=FINGERPRINT_SIZE).digest()
+        result.append(int.from_bytes(digest, "little"))
+    return result
+
+
+class Baseline:
+    """
+    The fingerprints of the errors that existed when the baseline was written, which are not reported again.
+
+    The baseline file is a sorted array of fingerprints. It is memory mapped and searched in place, so each process
+    that checks files - like the flake8 -j workers - loads it without reading or parsing it, and the pages of the
+    file are shared between them.
+    Each fingerprint suppresses as many errors in a file as it appears in the baseline, so a copy of a baselined line
+    in the same function is still reported.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): The path of the baseline file.
+
+        Raises:
+            ValueError: If the file is not a baseline file.
+        """
+        with open(path, "rb") as baseline_file:
+            if baseline_file.read(len(BASELINE_MAGIC)) != BASELINE_MAGIC:
+                raise ValueError(f"{path} is not a SIX baseline file")
+            size = os.fstat(baseline_file.fileno()).st_size
+            if (size - len(BASELINE_MAGIC)) % FINGERPRINT_SIZE:
+                raise ValueError(f"The SIX baseline file {path} is truncated")
+            if size == len(BASELINE_MAGIC):
+                self._fingerprints: Sequence[int] = ()
+            elif sys.byteorder == "little":
+                self._mmap = mmap.mmap(baseline_file.fileno(), 0, access=mmap.ACCESS_READ)
+                self._fingerprints = memoryview(self._mmap)[len(BASELINE_MAGIC) :].cast(FINGERPRINT_TYPECODE)
+            else:
+                self._fingerprints = array(FINGERPRINT_TYPECODE, baseline_file.read())
+                self._fingerprints.byteswap()
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
+
+    def count(self, fingerprint: int) -> int:
+        """
+        Args:
+            fingerprint (int): The fingerprint of an error.
+
+        Returns:
+            int: The number of times the fingerprint appears in the baseline.
+        """
+        fingerprints = self._fingerprints
+        low, high = 0, len(fingerprints)
+        while low < high:
+            middle = (low + high) // 2
+            if fingerprints[middle] < fingerprint:
+                low = middle + 1
+            else:
+                high = middle
+        end = low
+        while end < len(fingerprints) and fingerprints[end] == fingerprint:
+            end += 1
+        return end - low
+
+    def filter(self, filename: str, tree: ast.AST, lines: Sequence[str], errors: SixErrorBuffer) -> SixErrorBuffer:
+        """
+        Args:
+            filename (str): The path of the checked file, relative to the current directory.
+            tree (ast.AST): The tree of the file.
+            lines (Sequence[str]): The physical lines of the file.
+            errors (SixErrorBuffer): The errors found in the file.
+
+        Returns:
+            SixErrorBuffer: The errors that are not in the baseline.
+        """
+        if not errors or not self._fingerprints:
+            return errors
+
+        records = list(errors.records())
+        new_errors = SixErrorBuffer()
+        remaining_counts = {}
+        for record, fingerprint in zip(records, fingerprints(filename, tree, lines, records)):
+            remaining_count = remaining_counts.get(fingerprint)
+            if remaining_count is None:
+                remaining_count = self.count(fingerprint)
+            if remaining_count:
+                remaining_counts[fingerprint] = remaining_count - 1
+            else:
+                remaining_counts[fingerprint] = 0
+                new_errors.add(*record)
+        return new_errors
+
+
+class BaselineWriter:
+    """
+    Collects the fingerprints of the errors of every process that checks files, and writes them into a baseline file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.parts_directory = path + BASELINE_PARTS_DIRECTORY_SUFFIX
+
+    def reset(self) -> None:
+        """
+        Remove the fingerprints of previous runs. Must be called only by the main process, before checking files.
+        """
+        shutil.rmtree(self.parts_directory, ignore_errors=True)
+        os.makedirs(self.parts_directory, exist_ok=True)
+
+    def record(self, filename: str, tree: ast.AST, lines: Sequence[str], errors: SixErrorBuffer) -> None:
+        """
+        Append the fingerprints of the given errors to the part of the current process.
+
+        Args:
+            filename (str): The path of the checked file, relative to the current directory.
+            tree (ast.AST): The tree of the file.
+            lines (Sequence[str]): The physical lines of the file.
+            errors (SixErrorBuffer): The errors found in the file.
+        """
+        if not errors:
+            return
+        part_path = os.path.join(self.parts_directory, BASELINE_PART_FORMAT.format(os.getpid()))
+        with open(part_path, "ab") as part:
+            array(FINGERPRINT_TYPECODE, fingerprints(filename, tree, lines, errors.records())).tofile(part)
+
+    def write(self) -> None:
+        """
+        Merge the fingerprints of all the processes into the sorted baseline file, and remove them.
+        """
+        all_fingerprints = array(FINGERPRINT_TYPECODE)
+        for part_path in glob.glob(os.path.join(self.parts_directory, BASELINE_PART_FORMAT.format("*"))):
+            with open(part_path, "rb") as part:
+                all_fingerprints.frombytes(part.read())
+        all_fingerprints = array(FINGERPRINT_TYPECODE, sorted(all_fingerprints))
+        if sys.byteorder != "little":
+            all_fingerprints.byteswap()
+
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)))
+        try:
+            with os.fdopen(file_descriptor, "wb") as temporary_file:
+                temporary_file.write(BASELINE_MAGIC)
+                all_fingerprints.tofile(temporary_file)
+            # mkstemp creates files that only their owner can read, while the baseline is usually committed.
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(temporary_path, 0o666 & ~umask)
+            os.replace(temporary_path, self.path)
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+        shutil.rmtree(self.parts_directory, ignore_errors=True)
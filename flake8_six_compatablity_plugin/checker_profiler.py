@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+import ast
+import glob
+import json
+import os
+import shutil
+import time
+from collections import defaultdict
+from typing import TYPE_CHECKING, Dict, FrozenSet, List, Optional, Tuple
+
+from flake8_six_compatablity_plugin.six_checkers.checker_loader import select_node_checkers
+from flake8_six_compatablity_plugin.six_checkers.rule_file import add_rule_checkers
+from flake8_six_compatablity_plugin.six_checkers.six_checker import SixChecker
+from flake8_six_compatablity_plugin.six_checkers.six_compatibility_dispatcher import (
+    SixCompatibilityDispatcher,
+    create_dispatch_table,
+    node_checkers_for,
+)
+from flake8_six_compatablity_plugin.six_checkers.six_error_buffer import SixErrorBuffer
+
+if TYPE_CHECKING:
+    from flake8_six_compatablity_plugin.six_checkers.six_compatibility_node_visitor import SixCompatibilityNodeVisitor
+
+# Each process appends the profile of every file it checks to its own file in this directory, since flake8 -j workers
+# can exit without running any cleanup.
+PROFILE_PARTS_DIRECTORY_SUFFIX = ".parts"
+PROFILE_PART_FORMAT = "{}.jsonl"
+
+
+class ProfiledChecker:
+    """
+    A checker wrapper that counts the calls, time and errors of the wrapped checker on a single node type.
+    The attributes the engines compile checkers by are those of the wrapped checker.
+    """
+
+    def __init__(self, checker: SixChecker):
+        self.checker = checker
+        self.uses_symbol_index = getattr(checker, "uses_symbol_index", False)
+        self.rule_key_of = getattr(checker, "rule_key_of", None)
+        self.rule_keys = getattr(checker, "rule_keys", None)
+        self.calls = 0
+        self.seconds = 0.0
+        self.errors = 0
+
+    def check(self, node: ast.AST, errors: SixErrorBuffer) -> None:
+        """
+        Run the wrapped checker on the given node, and record its statistics.
+
+        Args:
+            node (ast.AST): The ast node to check.
+            errors (SixErrorBuffer): The errors to be updated with found errors.
+        """
+        errors_count = len(errors)
+        start_time = time.perf_counter()
+        self.checker.check(node, errors)
+        self.seconds += time.perf_counter() - start_time
+        self.calls += 1
+        self.errors += len(errors) - errors_count
+
+
+class FileProfile:
+    """
+    The statistics of each checker on each node type, while checking a single file.
+    """
+
+    # The wrapper of the profiled checkers, which subclasses may replace to record other statistics.
+    profiled_checker_type = ProfiledChecker
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.seconds = 0.0
+        self._profiled_checkers: Dict[Tuple[str, SixChecker], ProfiledChecker] = {}
+
+    def profiled_checker(self, node_name: str, checker: SixChecker) -> ProfiledChecker:
+        """
+        Args:
+            node_name (str): The name of the node type the checker runs on.
+            checker (SixChecker): The checker to wrap.
+
+        Returns:
+            ProfiledChecker: The wrapper that records the checker statistics on the given node type.
+        """
+        key = (node_name, checker)
+        if key not in self._profiled_checkers:
+            self._profiled_checkers[key] = self.profiled_checker_type(checker)
+        return self._profiled_checkers[key]
+
+    def create_visitor(
+        self,
+        max_errors: int = 0,
+        rule_checkers: FrozenSet[SixChecker] = frozenset(),
+        enabled_error_numbers: Optional[FrozenSet[int]] = None,
+    ) -> "SixCompatibilityNodeVisitor":
+        """
+        Args:
+            max_errors (int): The number of errors after which the walk is stopped. 0 for no limit.
+            rule_checkers (FrozenSet[SixChecker]): The checkers of a rule file, to run along with all of the checkers.
+            enabled_error_numbers (Optional[FrozenSet[int]]): The error numbers of the enabled checkers, or None if
+                all of the checkers are enabled.
+
+        Returns:
+            SixCompatibilityNodeVisitor: A visitor whose visit methods run the profiled checkers.
+        """
+        from flake8_six_compatablity_plugin.six_checkers.six_compatibility_node_visitor import (
+            SixCompatibilityNodeVisitor,
+            create_visitor_class,
+        )
+
+        node_checkers = add_rule_checkers(SixCompatibilityNodeVisitor.node_checkers, rule_checkers)
+        node_checkers = {
+            node_name: tuple(self.profiled_checker(node_name, checker) for checker in checkers)
+            for node_name, checkers in select_node_checkers(node_checkers, enabled_error_numbers).items()
+        }
+        return create_visitor_class("ProfiledSixCompatibilityNodeVisitor", node_checkers)(max_errors)
+
+    def create_dispatcher(
+        self, checkers: FrozenSet[SixChecker], max_errors: int = 0
+    ) -> SixCompatibilityDispatcher:
+        """
+        Args:
+            checkers (FrozenSet[SixChecker]): The checkers to run.
+            max_errors (int): The number of errors after which the walk is stopped. 0 for no limit.
+
+        Returns:
+            SixCompatibilityDispatcher: A dispatcher that runs the profiled checkers.
+        """
+        node_checkers = {
+            node_name: tuple(self.profiled_checker(node_name, checker) for checker in node_checkers)
+            for node_name, node_checkers in node_checkers_for(checkers).items()
+        }
+        dispatch_table = create_dispatch_table(node_checkers)
+        return SixCompatibilityDispatcher(dispatch_table=dispatch_table, max_errors=max_errors)
+
+    def to_record(self) -> dict:
+        """
+        Returns:
+            dict: A json serializable record of the profile.
+        """
+        return {
+            "filename": self.filename,
+            "seconds": self.seconds,
+            "checkers": [
+                [node_name, checker.__name__, profiled.calls, profiled.seconds, profiled.errors]
+                for (node_name, checker), profiled in self._profiled_checkers.items()
+                if profiled.calls
+            ],
+        }
+
+
+def _new_statistics() -> dict:
+    return {"calls": 0, "seconds": 0.0, "errors": 0}
+
+
+def _add_statistics(statistics: dict, calls: int, seconds: float, errors: int) -> None:
+    statistics["calls"] += calls
+    statistics["seconds"] += seconds
+    statistics["errors"] += errors
+
+
+class CheckerProfiler:
+    """
+    Collects the file profiles of every process that checks files, and aggregates them into a single report.
+    """
+
+    def __init__(self, report_path: str):
+        self.report_path = report_path
+        self.parts_directory = report_path + PROFILE_PARTS_DIRECTORY_SUFFIX
+
+    def reset(self) -> None:
+        """
+        Remove the file profiles of previous runs. Must be called only by the main process, before checking files.
+        """
+        shutil.rmtree(self.parts_directory, ignore_errors=True)
+        os.makedirs(self.parts_directory, exist_ok=True)
+
+    def record(self, profile: FileProfile) -> None:
+        """
+        Append the given file profile to the part of the current process.
+
+        Args:
+            profile (FileProfile): The profile to record.
+        """
+        part_path = os.path.join(
+            self.parts_directory, PROFILE_PART_FORMAT.format(os.getpid())
+        )
+        with open(part_path, "a", encoding="utf-8") as part:
+            part.write(json.dumps(profile.to_record()) + "\n")
+
+    def _read_records(self) -> List[dict]:
+        records = []
+        for part_path in sorted(glob.glob(os.path.join(self.parts_directory, PROFILE_PART_FORMAT.format("*")))):
+            with open(part_path, encoding="utf-8") as part:
+                records.extend(json.loads(line) for line in part if line.strip())
+        return records
+
+    def write_report(self) -> None:
+        """
+        Aggregate the file profiles of all the processes into the report, and remove them.
+        """
+        checkers = defaultdict(lambda: {**_new_statistics(), "node_types": defaultdict(_new_statistics)})
+        node_types = defaultdict(_new_statistics)
+        files = {}
+
+        for record in self._read_records():
+            file_statistics = files[record["filename"]] = {**_new_statistics(), "seconds": record["seconds"]}
+            for node_name, checker_name, calls, seconds, errors in record["checkers"]:
+                _add_statistics(checkers[checker_name], calls, seconds, errors)
+                _add_statistics(checkers[checker_name]["node_types"][node_name], calls, seconds, errors)
+                _add_statistics(node_types[node_name], calls, seconds, errors)
+                file_statistics["calls"] += calls
+                file_statistics["errors"] += errors
+
+        report = {
+            "files_count": len(files),
+            "checkers": checkers,
+            "node_types": node_types,
+            "files": files,
+        }
+        with open(self.report_path, "w", encoding="utf-8") as report_file:
+            json.dump(report, report_file, indent=2, sort_keys=True)
+        shutil.rmtree(self.parts_directory, ignore_errors=True)
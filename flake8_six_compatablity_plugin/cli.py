@@ -0,0 +1,583 @@
+#!/usr/bin/env python3
+import argparse
+import ast
+import fnmatch
+import io
+import os
+import sys
+import tempfile
+import time
+import tokenize
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from flake8.defaults import NOQA_FILE, NOQA_INLINE_REGEXP
+from flake8.utils import parse_comma_separated_list
+
+from flake8_six_compatablity_plugin.fixer import fix_source
+from flake8_six_compatablity_plugin.flake8_plugin import SixCompatibilityPlugin
+from flake8_six_compatablity_plugin.reporters import (
+    DEFAULT_FORMAT,
+    ERROR_FORMAT,
+    REPORT_FORMATS,
+    create_report,
+    split_message,
+)
+from flake8_six_compatablity_plugin.sharding import Shard, ShardResultWriter, parse_shard, shard_paths
+
+# The same defaults flake8 uses for --exclude.
+DEFAULT_EXCLUDE = (".svn", "CVS", ".bzr", ".hg", ".git", "__pycache__", ".tox", ".nox", ".eggs", "*.egg")
+DEFAULT_FILENAME_PATTERN = "*.py"
+DEFAULT_CHUNK_SIZE = 32
+# The number of chunks sent to each worker ahead of the chunk it is checking, when the results are not ordered.
+PENDING_CHUNKS_PER_JOB = 2
+
+# The errors of a file, as tuples of (line_number, column, msg).
+FileErrors = List[Tuple[int, int, str]]
+
+
+def _is_excluded(path: str, exclude: Sequence[str]) -> bool:
+    name = os.path.basename(path)
+    return any(
+        fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(path, pattern)
+        for pattern in exclude
+    )
+
+
+def discover_files(
+    paths: Iterable[str],
+    exclude: Sequence[str] = DEFAULT_EXCLUDE,
+    filename_pattern: str = DEFAULT_FILENAME_PATTERN,
+) -> Iterator[str]:
+    """
+    Find the python files in the given paths.
+    Files that are given explicitly are always checked, like flake8 does.
+
+    Args:
+        paths (Iterable[str]): The files and directories to check.
+        exclude (Sequence[str]): Glob patterns of the files and directories to skip.
+        filename_pattern (str): Glob pattern of the files to check inside directories.
+
+    Yields:
+        str: The path of each file to check.
+    """
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+
+        for root, directories, files in os.walk(path):
+            directories[:] = sorted(
+                directory
+                for directory in directories
+                if not _is_excluded(os.path.join(root, directory), exclude)
+            )
+            for file_name in sorted(files):
+                file_path = os.path.join(root, file_name)
+                if fnmatch.fnmatch(file_name, filename_pattern) and not _is_excluded(
+                    file_path, exclude
+                ):
+                    yield file_path
+
+
+def _noqa_lines(lines: List[str]) -> Dict[int, str]:
+    """
+    Args:
+        lines (List[str]): The physical lines of the source.
+
+    Returns:
+        Dict[int, str]: The lines flake8 searches for the noqa comment of the errors on each line - all of the lines
+            of the statement, or of the multi line string, the line is in. Empty if the source can not be tokenized.
+    """
+    noqa_lines = {}
+    start_line = len(lines) + 2
+    end_line = -1
+    try:
+        for token_type, _, (token_start_line, _), (token_end_line, _), _ in tokenize.generate_tokens(
+            iter(lines).__next__
+        ):
+            if token_type in (tokenize.ENDMARKER, tokenize.DEDENT):
+                continue
+            start_line = min(start_line, token_start_line)
+            end_line = max(end_line, token_end_line)
+            if token_type in (tokenize.NL, tokenize.NEWLINE):
+                noqa_lines.update(dict.fromkeys(range(start_line, end_line + 1), "".join(lines[start_line - 1 : end_line])))
+                start_line = len(lines) + 2
+                end_line = -1
+    except (tokenize.TokenError, SyntaxError):
+        return {}
+    return noqa_lines
+
+
+def _is_noqa(msg: str, noqa_line: str) -> bool:
+    """
+    Args:
+        msg (str): The code and the message of an error.
+        noqa_line (str): The lines flake8 searches for the noqa comment of the error.
+
+    Returns:
+        bool: Whether the lines have a noqa comment that ignores the error, by flake8's rules.
+    """
+    noqa_match = NOQA_INLINE_REGEXP.search(noqa_line)
+    if noqa_match is None:
+        return False
+    codes = noqa_match.group("codes")
+    return codes is None or msg.split(" ", 1)[0].startswith(tuple(parse_comma_separated_list(codes)))
+
+
+def _filter_noqa(lines: List[str], errors: FileErrors) -> FileErrors:
+    """
+    Args:
+        lines (List[str]): The physical lines of the source.
+        errors (FileErrors): The errors found in the source.
+
+    Returns:
+        FileErrors: The errors that a "# noqa" comment does not ignore, like flake8 reports them.
+    """
+    if not errors or not any(NOQA_INLINE_REGEXP.search(line) for line in lines):
+        return errors
+    noqa_lines = _noqa_lines(lines)
+    return [
+        (line_number, column, msg)
+        for line_number, column, msg in errors
+        if not _is_noqa(
+            msg,
+            noqa_lines.get(line_number) or (lines[line_number - 1] if 0 < line_number <= len(lines) else ""),
+        )
+    ]
+
+
+def check_source(path: str, lines: List[str]) -> FileErrors:
+    """
+    Run the SIX rules on the given source.
+    A source that can not be parsed is reported with flake8's E999 code. Errors are ignored by "# noqa" comments, and
+    a source with a "# flake8: noqa" line is not checked at all, like flake8 does.
+
+    Args:
+        path (str): The path of the source, used for syntax errors.
+        lines (List[str]): The physical lines of the source.
+
+    Returns:
+        FileErrors: The errors found in the source, sorted by position.
+    """
+    if any(NOQA_FILE.match(line) for line in lines):
+        return []
+
+    try:
+        tree = ast.parse("".join(lines), path)
+    except (SyntaxError, ValueError) as error:
+        line_number = getattr(error, "lineno", None) or 1
+        offset = getattr(error, "offset", None) or 1
+        return _filter_noqa(lines, [(line_number, offset, f"E999 {type(error).__name__}: {error.args[0]}")])
+
+    # The tokens are generated lazily, only if a token checker is triggered.
+    file_tokens = tokenize.generate_tokens(iter(lines).__next__)
+    errors = [
+        (error.line_number, error.offset + 1, error.msg)
+        for error in SixCompatibilityPlugin(tree, lines, path, file_tokens).run()
+    ]
+    errors.sort(key=lambda error: (error[0], error[1]))
+    return _filter_noqa(lines, errors)
+
+
+def check_file(path: str) -> FileErrors:
+    """
+    Read the given file, honoring its encoding declaration, and run the SIX rules on it.
+    A file that can not be read is reported with flake8's E902 code.
+
+    Args:
+        path (str): The path of the file to check.
+
+    Returns:
+        FileErrors: The errors found in the file, sorted by position.
+    """
+    try:
+        with tokenize.open(path) as source_file:
+            lines = source_file.readlines()
+    except (OSError, SyntaxError, UnicodeDecodeError) as error:
+        return [(1, 1, f"E902 {type(error).__name__}: {error}")]
+
+    return check_source(path, lines)
+
+
+def check_content(path: str, content: bytes) -> FileErrors:
+    """
+    Decode the given content of a file, honoring its encoding declaration, and run the SIX rules on it.
+    Content that can not be decoded is reported with flake8's E902 code.
+
+    Args:
+        path (str): The path of the file, used for syntax errors.
+        content (bytes): The content of the file.
+
+    Returns:
+        FileErrors: The errors found in the content, sorted by position.
+    """
+    try:
+        encoding, _ = tokenize.detect_encoding(io.BytesIO(content).readline)
+        text = content.decode(encoding)
+    except (SyntaxError, UnicodeDecodeError) as error:
+        return [(1, 1, f"E902 {type(error).__name__}: {error}")]
+    # The lines are split like tokenize.open splits them when a file is checked.
+    return check_source(path, io.StringIO(text, newline=None).readlines())
+
+
+def _write_file(path: str, content: bytes) -> None:
+    """
+    Replace the content of the given file atomically, keeping its permissions.
+
+    Args:
+        path (str): The path of the file.
+        content (bytes): The new content of the file.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    file_descriptor, temporary_path = tempfile.mkstemp(dir=directory, prefix=".six-fix-")
+    try:
+        with os.fdopen(file_descriptor, "wb") as temporary_file:
+            temporary_file.write(content)
+        os.chmod(temporary_path, os.stat(path).st_mode & 0o7777)
+        os.replace(temporary_path, path)
+    except BaseException:
+        os.unlink(temporary_path)
+        raise
+
+
+def fix_file(path: str) -> Tuple[int, FileErrors]:
+    """
+    Fix the mechanically fixable SIX errors of the given file in place, and check the fixed file.
+    The file keeps its encoding and line breaks. A fix that leaves the file unparsable is not written, and the errors
+    of the original file are reported instead.
+
+    Args:
+        path (str): The path of the file to fix.
+
+    Returns:
+        Tuple[int, FileErrors]: The number of applied edits, and the errors that remain in the file.
+    """
+    try:
+        with open(path, "rb") as source_file:
+            content = source_file.read()
+        encoding, _ = tokenize.detect_encoding(io.BytesIO(content).readline)
+        text = content.decode(encoding)
+    except (OSError, SyntaxError, UnicodeDecodeError) as error:
+        return 0, [(1, 1, f"E902 {type(error).__name__}: {error}")]
+
+    try:
+        fixed_text, edits_count = fix_source(text, path)
+    except (SyntaxError, ValueError):
+        fixed_text, edits_count = text, 0
+
+    # The lines are split like tokenize.open splits them when the file is checked.
+    errors = check_source(path, io.StringIO(fixed_text, newline=None).readlines())
+    if not edits_count:
+        return 0, errors
+    if any(msg.startswith("E999") for _, _, msg in errors):
+        return 0, check_source(path, io.StringIO(text, newline=None).readlines())
+
+    try:
+        _write_file(path, fixed_text.encode(encoding))
+    except (OSError, UnicodeEncodeError) as error:
+        return 0, [(1, 1, f"E902 {type(error).__name__}: {error}")]
+    return edits_count, errors
+
+
+def _check_chunk(paths: List[str]) -> List[Tuple[str, FileErrors]]:
+    return [(path, check_file(path)) for path in paths]
+
+
+def _fix_chunk(paths: List[str]) -> List[Tuple[str, int, FileErrors]]:
+    return [(path, *fix_file(path)) for path in paths]
+
+
+def _chunks(items: Sequence[str], chunk_size: int) -> Iterator[List[str]]:
+    for index in range(0, len(items), chunk_size):
+        yield list(items[index : index + chunk_size])
+
+
+def _create_executor(jobs: int, rules_file: Optional[str], threads: bool) -> Executor:
+    """
+    Args:
+        jobs (int): The number of workers.
+        rules_file (Optional[str]): The rule file the workers check along with the built-in checkers.
+        threads (bool): Whether to create a pool of threads rather than of worker processes.
+
+    Returns:
+        Executor: The pool of workers.
+    """
+    if threads:
+        # The threads share the rule file of this process, which is read only once it is loaded.
+        return ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="six-check")
+    # Workers that are not forked compile the rule file themselves.
+    return ProcessPoolExecutor(
+        max_workers=jobs, initializer=SixCompatibilityPlugin.load_rule_file, initargs=(rules_file,)
+    )
+
+
+def _map_chunks(
+    executor: Executor, function: Callable[[List[str]], list], chunks: Iterable[List[str]], ordered: bool, jobs: int
+) -> Iterator[list]:
+    """
+    Args:
+        executor (Executor): The process pool.
+        function (Callable[[List[str]], list]): The function to run on each chunk.
+        chunks (Iterable[List[str]]): The chunks of paths.
+        ordered (bool): Whether to yield the results in the order of the chunks. Otherwise each result is yielded as
+            soon as it is ready, and only a few chunks are sent ahead, so the results that are not consumed yet do not
+            pile up.
+        jobs (int): The number of worker processes.
+
+    Yields:
+        list: The results of each chunk.
+    """
+    if ordered:
+        yield from executor.map(function, chunks)
+        return
+
+    pending = set()
+    for chunk in chunks:
+        if len(pending) >= jobs * PENDING_CHUNKS_PER_JOB:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+        pending.add(executor.submit(function, chunk))
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield future.result()
+
+
+def check_files(
+    paths: Sequence[str],
+    jobs: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    rules_file: Optional[str] = None,
+    ordered: bool = True,
+    threads: bool = False,
+) -> Iterator[Tuple[str, FileErrors]]:
+    """
+    Check the given files, in a process pool when more than one job is used.
+    The files are sent to the workers in chunks, to amortize the inter process communication.
+    With threads, the files are checked by a pool of threads of this process instead, which share the checkers, the
+    engine tables and the rule file - on free-threaded builds of python they check files in parallel, without
+    starting workers or pickling the errors.
+
+    Args:
+        paths (Sequence[str]): The files to check.
+        jobs (int): The number of worker processes.
+        chunk_size (int): The number of files in each work unit.
+        rules_file (Optional[str]): A rule file to check along with the built-in checkers.
+        ordered (bool): Whether to yield the files in the order of the given paths, rather than as soon as they are
+            checked.
+        threads (bool): Whether to check the files in threads rather than in worker processes.
+
+    Yields:
+        Tuple[str, FileErrors]: The path and errors of each file, in the order of the given paths if ordered.
+    """
+    SixCompatibilityPlugin.load_rule_file(rules_file)
+    if jobs <= 1 or len(paths) <= chunk_size:
+        for path in paths:
+            yield path, check_file(path)
+        return
+
+    with _create_executor(jobs, rules_file, threads) as executor:
+        for chunk_results in _map_chunks(executor, _check_chunk, _chunks(paths, chunk_size), ordered, jobs):
+            yield from chunk_results
+
+
+def fix_files(
+    paths: Sequence[str],
+    jobs: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    rules_file: Optional[str] = None,
+    ordered: bool = True,
+    threads: bool = False,
+) -> Iterator[Tuple[str, int, FileErrors]]:
+    """
+    Fix the given files in place, in a process pool when more than one job is used, like check_files.
+    Each file is fixed in a single pass, and checked again after it is fixed.
+
+    Args:
+        paths (Sequence[str]): The files to fix.
+        jobs (int): The number of worker processes.
+        chunk_size (int): The number of files in each work unit.
+        rules_file (Optional[str]): A rule file to check the fixed files with, along with the built-in checkers.
+        ordered (bool): Whether to yield the files in the order of the given paths, rather than as soon as they are
+            fixed.
+        threads (bool): Whether to fix the files in threads rather than in worker processes.
+
+    Yields:
+        Tuple[str, int, FileErrors]: The path, number of applied edits and remaining errors of each file, in the order
+            of the given paths if ordered.
+    """
+    SixCompatibilityPlugin.load_rule_file(rules_file)
+    if jobs <= 1 or len(paths) <= chunk_size:
+        for path in paths:
+            yield (path, *fix_file(path))
+        return
+
+    with _create_executor(jobs, rules_file, threads) as executor:
+        for chunk_results in _map_chunks(executor, _fix_chunk, _chunks(paths, chunk_size), ordered, jobs):
+            yield from chunk_results
+
+
+def _parse_arguments(argv: Sequence[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="six-check", description="Check that python code is six compatible."
+    )
+    parser.add_argument("paths", nargs="*", default=["."], help="Files and directories to check.")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="The number of worker processes. (Default: the number of cpus)",
+    )
+    parser.add_argument(
+        "--threads",
+        action="store_true",
+        help="Check and fix the files in -j threads instead of worker processes - faster on free-threaded python "
+        "builds.",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="The number of files sent to a worker at once. (Default: %(default)s)",
+    )
+    parser.add_argument(
+        "--exclude",
+        type=lambda value: [pattern.strip() for pattern in value.split(",") if pattern.strip()],
+        default=list(DEFAULT_EXCLUDE),
+        help="Comma separated glob patterns of files and directories to skip.",
+    )
+    parser.add_argument(
+        "--filename",
+        default=DEFAULT_FILENAME_PATTERN,
+        help="Glob pattern of the files to check inside directories. (Default: %(default)s)",
+    )
+    parser.add_argument(
+        "--rules-file",
+        default=None,
+        help="A TOML (.toml) or INI file of additional banned names, each with its own SIX code and message.",
+    )
+    parser.add_argument(
+        "--fix",
+        action="store_true",
+        help="Fix the mechanically fixable errors in place, and report the errors that remain.",
+    )
+    parser.add_argument(
+        "--format",
+        choices=(DEFAULT_FORMAT, *REPORT_FORMATS),
+        default=DEFAULT_FORMAT,
+        help="The output format - path:line:column: lines, a SARIF log, or a JSON object per error. The SARIF and "
+        "JSON errors are written as soon as each file is checked, in the order the files are checked in. "
+        "(Default: %(default)s)",
+    )
+    parser.add_argument(
+        "--output-file",
+        default=None,
+        help="Write the errors to the given file instead of stdout.",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        default=None,
+        help="Check only shard K of N (like 3/8) of the files, partitioned by the hash and size of each file, so "
+        "every runner that checks the same files checks a different part of them.",
+    )
+    parser.add_argument(
+        "--shard-output",
+        default=None,
+        help="Write the errors of the checked files to the given shard result file, to merge with six-merge.",
+    )
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="Print the number of checked files and files per second to stderr.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] = None) -> int:
+    """
+    The six-check entry point.
+
+    Returns:
+        int: 1 if any error was found - or remains after fixing - 0 otherwise.
+    """
+    arguments = _parse_arguments(sys.argv[1:] if argv is None else argv)
+
+    start_time = time.perf_counter()
+    all_paths = list(discover_files(arguments.paths, arguments.exclude, arguments.filename))
+    paths = shard_paths(all_paths, arguments.shard) if arguments.shard else all_paths
+    shard_writer = None
+    if arguments.shard_output:
+        shard_writer = ShardResultWriter(arguments.shard_output, arguments.shard or Shard(1, 1), all_paths)
+
+    # The reports do not depend on the order of the files, so they are written as soon as each file is checked. The
+    # shard result files are in the order of the paths.
+    ordered = arguments.format == DEFAULT_FORMAT or shard_writer is not None
+    if arguments.fix:
+        results = fix_files(
+            paths, arguments.jobs, arguments.chunk_size, arguments.rules_file, ordered, arguments.threads
+        )
+    else:
+        results = (
+            (path, 0, errors)
+            for path, errors in check_files(
+                paths, arguments.jobs, arguments.chunk_size, arguments.rules_file, ordered, arguments.threads
+            )
+        )
+
+    output_file = open(arguments.output_file, "w", encoding="utf-8") if arguments.output_file else sys.stdout
+    report = None
+    if not ordered:
+        SixCompatibilityPlugin.load_rule_file(arguments.rules_file)
+        report = create_report(
+            arguments.format, lambda line: output_file.write(line + "\n"), SixCompatibilityPlugin.rule_set.checkers
+        )
+        report.start()
+
+    errors_count = 0
+    edits_count = 0
+    fixed_files_count = 0
+    try:
+        for path, file_edits_count, errors in results:
+            for line_number, column, msg in errors:
+                if report is None:
+                    error_line = ERROR_FORMAT.format(path=path, line_number=line_number, column=column, msg=msg)
+                    print(error_line, file=output_file)
+                else:
+                    report.add(path, line_number, column, *split_message(msg))
+            if shard_writer is not None:
+                shard_writer.add(path, errors)
+            errors_count += len(errors)
+            edits_count += file_edits_count
+            fixed_files_count += 1 if file_edits_count else 0
+        if report is not None:
+            report.finish()
+        if shard_writer is not None:
+            shard_writer.close()
+            shard_writer = None
+    finally:
+        if output_file is not sys.stdout:
+            output_file.close()
+        if shard_writer is not None:
+            shard_writer.discard()
+
+    if arguments.fix:
+        print(f"{edits_count} edits applied to {fixed_files_count} files", file=sys.stderr)
+
+    if arguments.benchmark:
+        elapsed_time = time.perf_counter() - start_time
+        files_per_second = len(paths) / elapsed_time if elapsed_time else 0.0
+        print(
+            f"{len(paths)} files checked in {elapsed_time:.3f}s ({files_per_second:.1f} files/s), "
+            f"{errors_count} errors",
+            file=sys.stderr,
+        )
+
+    return 1 if errors_count else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+import argparse
+import io
+import json
+import math
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from flake8_six_compatablity_plugin.cli import ERROR_FORMAT, FileErrors, check_file, check_source, discover_files
+from flake8_six_compatablity_plugin.flake8_plugin import ENGINES, SixCompatibilityPlugin
+
+DEFAULT_POLL_INTERVAL = 1.0
+LATENCY_PERCENTILES = (50, 99)
+# The path the client reads the source from stdin for, like flake8.
+STDIN_PATH = "-"
+# Errors of the client itself, like a daemon that is not running, as opposed to SIX errors.
+CLIENT_ERROR_EXIT_CODE = 2
+
+
+def default_socket_path() -> str:
+    """
+    Returns:
+        str: The socket path of the daemon of the current user.
+    """
+    user_id = os.getuid() if hasattr(os, "getuid") else os.getpid()
+    return os.path.join(tempfile.gettempdir(), f"six-daemon-{user_id}.sock")
+
+
+class CheckedFile(NamedTuple):
+    """
+    The errors of a file, and the state of the file they were found in.
+    """
+
+    modification_time: int
+    size: int
+    errors: FileErrors
+
+
+class SixDaemon:
+    """
+    Checks files in a long running process, so the checker modules, the dispatch tables and the compiled rule file
+    are created once instead of once per check.
+
+    The errors of each checked file are kept with its modification time and size, and are reused until the file
+    changes. When watch paths are given, the files in them are polled and checked again as soon as they change, so
+    the errors of a saved file are usually ready before they are asked for.
+    The checkers and the engine tables are read only once they are created, so the requests and the watcher check
+    files in parallel.
+    """
+
+    def __init__(self, watch_paths: Sequence[str] = (), poll_interval: float = DEFAULT_POLL_INTERVAL):
+        """
+        Args:
+            watch_paths (Sequence[str]): The files and directories to check whenever their files change.
+            poll_interval (float): The number of seconds between polls of the watch paths.
+        """
+        self._watch_paths = [os.path.abspath(path) for path in watch_paths]
+        self._poll_interval = poll_interval
+        self._checked_files: Dict[str, CheckedFile] = {}
+        self._stopped = threading.Event()
+
+    @staticmethod
+    def warm_up() -> None:
+        """
+        Import all of the checker modules and create the tables of the engine for all of the checkers.
+        """
+        # The dispatcher and the visitor import all of the checker modules, so they are imported only when warming up.
+        from flake8_six_compatablity_plugin.six_checkers.six_compatibility_dispatcher import (
+            all_checkers,
+            dispatch_table_for,
+        )
+
+        checkers = all_checkers() | SixCompatibilityPlugin.rule_set.checkers
+        dispatch_table_for(checkers)
+        if SixCompatibilityPlugin.engine != "dispatcher":
+            ENGINES[SixCompatibilityPlugin.engine](0, SixCompatibilityPlugin.rule_set.checkers)
+
+    def check_path(self, path: str) -> FileErrors:
+        """
+        Args:
+            path (str): The absolute path of the file to check.
+
+        Returns:
+            FileErrors: The errors of the file, reused if the file did not change since it was last checked.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError as error:
+            self._checked_files.pop(path, None)
+            return [(1, 1, f"E902 {type(error).__name__}: {error}")]
+
+        checked_file = self._checked_files.get(path)
+        if checked_file is not None and (checked_file.modification_time, checked_file.size) == (
+            stat.st_mtime_ns,
+            stat.st_size,
+        ):
+            return checked_file.errors
+
+        errors = check_file(path)
+        # The file is stated before it is read, so a change made while it was read is checked on the next request.
+        self._checked_files[path] = CheckedFile(stat.st_mtime_ns, stat.st_size, errors)
+        return errors
+
+    def check_buffer(self, path: str, source: str) -> FileErrors:
+        """
+        Args:
+            path (str): The path the source is reported with.
+            source (str): The source, like the unsaved buffer of an editor.
+
+        Returns:
+            FileErrors: The errors of the source.
+        """
+        lines = io.StringIO(source, newline=None).readlines()
+        return check_source(path, lines)
+
+    def handle(self, request: dict) -> dict:
+        """
+        Handle a single request of the protocol:
+        - {"path": PATH} checks the file in the given absolute path.
+        - {"path": PATH, "source": SOURCE} checks the given source, as if it was the content of the file.
+        - {"command": "ping"} and {"command": "shutdown"}.
+
+        Args:
+            request (dict): The request.
+
+        Returns:
+            dict: {"errors": [[line_number, column, msg], ...]} for checks, {} for commands, or {"error": MESSAGE} for
+                invalid requests.
+        """
+        command = request.get("command")
+        if command is not None:
+            if command not in ("ping", "shutdown"):
+                return {"error": f"Unknown command: {command}"}
+            return {}
+
+        path = request.get("path")
+        if not isinstance(path, str):
+            return {"error": "Each request must have a path or a command"}
+        source = request.get("source")
+        if source is not None:
+            if not isinstance(source, str):
+                return {"error": "The source must be a string"}
+            return {"errors": self.check_buffer(path, source)}
+        if not os.path.isabs(path):
+            return {"error": f"The path must be absolute: {path}"}
+        return {"errors": self.check_path(path)}
+
+    def poll(self) -> None:
+        """
+        Check the files of the watch paths that changed, until the daemon stops.
+        """
+        while not self._stopped.is_set():
+            watched_paths = set(discover_files(self._watch_paths))
+            for path in watched_paths:
+                if self._stopped.is_set():
+                    return
+                self.check_path(path)
+
+            # The errors of deleted files are dropped, along with the memory they take.
+            for path in list(self._checked_files):
+                if path not in watched_paths and not os.path.exists(path):
+                    self._checked_files.pop(path, None)
+            self._stopped.wait(self._poll_interval)
+
+    def serve(self, socket_path: str) -> None:
+        """
+        Serve requests on the given unix socket until a shutdown request.
+
+        Args:
+            socket_path (str): The path of the socket.
+
+        Raises:
+            OSError: If another daemon already serves on the socket.
+        """
+        _remove_stale_socket(socket_path)
+        self.warm_up()
+        with _SixDaemonServer(socket_path, self) as server:
+            # Only the user that runs the daemon can connect to it.
+            os.chmod(socket_path, 0o600)
+            if self._watch_paths:
+                threading.Thread(target=self.poll, name="six-daemon-watcher", daemon=True).start()
+            try:
+                server.serve_forever()
+            finally:
+                self._stopped.set()
+                os.unlink(socket_path)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """
+    Handles the requests of a single connection - each request and each response is a single line of JSON.
+    """
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("Each request must be a JSON object")
+            except ValueError as error:
+                request, response = {}, {"error": f"Invalid request: {error}"}
+            else:
+                response = self.server.daemon.handle(request)
+
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+            if request.get("command") == "shutdown":
+                # shutdown waits for serve_forever to return, so it must not block the handler.
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+
+
+class _SixDaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, daemon: SixDaemon):
+        self.daemon = daemon
+        super().__init__(socket_path, _RequestHandler)
+
+
+def _remove_stale_socket(socket_path: str) -> None:
+    """
+    Remove the socket left behind by a daemon that did not shut down.
+
+    Args:
+        socket_path (str): The path of the socket.
+
+    Raises:
+        OSError: If a running daemon serves on the socket.
+    """
+    if not os.path.exists(socket_path):
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        try:
+            connection.connect(socket_path)
+        except OSError:
+            os.unlink(socket_path)
+            return
+    raise OSError(f"A six-daemon already serves on {socket_path}")
+
+
+def send_requests(socket_path: str, requests: Iterable[dict]) -> Iterator[Tuple[dict, float]]:
+    """
+    Send the given requests to the daemon over a single connection, one at a time.
+
+    Args:
+        socket_path (str): The path of the socket of the daemon.
+        requests (Iterable[dict]): The requests.
+
+    Yields:
+        Tuple[dict, float]: The response to each request, and the number of seconds it took.
+
+    Raises:
+        OSError: If the daemon does not serve on the socket.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path)
+        with connection.makefile("rwb") as stream:
+            for request in requests:
+                start_time = time.perf_counter()
+                stream.write(json.dumps(request).encode("utf-8") + b"\n")
+                stream.flush()
+                line = stream.readline()
+                if not line:
+                    raise ConnectionError("The six-daemon closed the connection")
+                yield json.loads(line), time.perf_counter() - start_time
+
+
+def percentile(values: Sequence[float], percent: float) -> float:
+    """
+    Args:
+        values (Sequence[float]): Sorted values.
+        percent (float): The percentile, between 0 and 100.
+
+    Returns:
+        float: The nearest rank percentile of the values.
+    """
+    if not values:
+        return 0.0
+    return values[max(math.ceil(percent / 100 * len(values)) - 1, 0)]
+
+
+def _check_requests(paths: Sequence[str], stdin_display_name: str) -> Iterator[Tuple[str, dict]]:
+    for path in paths:
+        if path == STDIN_PATH:
+            yield stdin_display_name, {"path": stdin_display_name, "source": sys.stdin.read()}
+        else:
+            yield path, {"path": os.path.abspath(path)}
+
+
+def _check(arguments: argparse.Namespace) -> int:
+    paths = [
+        path
+        for argument in arguments.paths
+        for path in ([argument] if argument == STDIN_PATH else discover_files([argument]))
+    ]
+    display_paths: List[str] = []
+    requests = []
+    for display_path, request in _check_requests(paths, arguments.stdin_display_name):
+        display_paths.append(display_path)
+        requests.append(request)
+
+    errors_count = 0
+    latencies = []
+    try:
+        for display_path, (response, latency) in zip(display_paths, send_requests(arguments.socket, requests)):
+            latencies.append(latency)
+            if "error" in response:
+                print(f"six-daemon: {response['error']}", file=sys.stderr)
+                return CLIENT_ERROR_EXIT_CODE
+            for line_number, column, msg in response["errors"]:
+                print(ERROR_FORMAT.format(path=display_path, line_number=line_number, column=column, msg=msg))
+            errors_count += len(response["errors"])
+    except OSError as error:
+        print(f"six-daemon: can not check with the daemon on {arguments.socket}: {error}", file=sys.stderr)
+        return CLIENT_ERROR_EXIT_CODE
+
+    if arguments.latency:
+        latencies.sort()
+        report = ", ".join(
+            f"p{percent} {percentile(latencies, percent) * 1000:.2f}ms" for percent in LATENCY_PERCENTILES
+        )
+        print(f"{len(latencies)} requests: {report}", file=sys.stderr)
+    return 1 if errors_count else 0
+
+
+def _command(arguments: argparse.Namespace) -> int:
+    try:
+        for response, _ in send_requests(arguments.socket, [{"command": arguments.action}]):
+            if "error" in response:
+                print(f"six-daemon: {response['error']}", file=sys.stderr)
+                return CLIENT_ERROR_EXIT_CODE
+    except OSError as error:
+        print(f"six-daemon: no daemon on {arguments.socket}: {error}", file=sys.stderr)
+        return CLIENT_ERROR_EXIT_CODE
+    return 0
+
+
+def _serve(arguments: argparse.Namespace) -> int:
+    SixCompatibilityPlugin.engine = arguments.engine
+    SixCompatibilityPlugin.load_rule_file(arguments.rules_file)
+    try:
+        SixDaemon(arguments.watch, arguments.poll_interval).serve(arguments.socket)
+    except OSError as error:
+        print(f"six-daemon: {error}", file=sys.stderr)
+        return CLIENT_ERROR_EXIT_CODE
+    return 0
+
+
+def _parse_arguments(argv: Sequence[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="six-daemon", description="Check that python code is six compatible, with a long running daemon."
+    )
+    parser.add_argument(
+        "--socket",
+        default=default_socket_path(),
+        help="The unix socket of the daemon. (Default: %(default)s)",
+    )
+    subparsers = parser.add_subparsers(dest="action", required=True)
+
+    serve_parser = subparsers.add_parser("serve", help="Run the daemon in the foreground.")
+    serve_parser.add_argument(
+        "--watch",
+        action="append",
+        default=[],
+        help="A file or directory whose files are checked again as soon as they change. Can be repeated.",
+    )
+    serve_parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=DEFAULT_POLL_INTERVAL,
+        help="The number of seconds between polls of the watched files. (Default: %(default)s)",
+    )
+    serve_parser.add_argument(
+        "--engine",
+        default=SixCompatibilityPlugin.engine,
+        choices=tuple(ENGINES),
+        help="The engine used to walk the tree and run the SIX checkers. (Default: %(default)s)",
+    )
+    serve_parser.add_argument(
+        "--rules-file",
+        default=None,
+        help="A TOML (.toml) or INI file of additional banned names, each with its own SIX code and message.",
+    )
+
+    check_parser = subparsers.add_parser("check", help="Check files with the daemon, and print the errors.")
+    check_parser.add_argument(
+        "paths", nargs="*", default=["."], help=f"Files and directories to check, or {STDIN_PATH} for stdin."
+    )
+    check_parser.add_argument(
+        "--stdin-display-name",
+        default="stdin",
+        help="The name the source read from stdin is checked and reported as. (Default: %(default)s)",
+    )
+    check_parser.add_argument(
+        "--latency",
+        action="store_true",
+        help="Print the p50 and p99 latency of the requests to stderr.",
+    )
+
+    subparsers.add_parser("ping", help="Check that the daemon is running.")
+    subparsers.add_parser("shutdown", help="Stop the daemon.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    The six-daemon entry point.
+
+    Returns:
+        int: For check, 1 if any error was found and 0 otherwise, like flake8. 2 if the daemon could not be reached.
+    """
+    arguments = _parse_arguments(sys.argv[1:] if argv is None else argv)
+    if arguments.action == "serve":
+        return _serve(arguments)
+    if arguments.action == "check":
+        return _check(arguments)
+    return _command(arguments)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+import ast
+import functools
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+from flake8_six_compatablity_plugin.six_checkers.six_checker import SixChecker
+from flake8_six_compatablity_plugin.six_checkers.six_compatibility_dispatcher import (
+    all_checkers,
+    node_checkers_for,
+)
+from flake8_six_compatablity_plugin.six_checkers.six_error_buffer import SixErrorBuffer
+from flake8_six_compatablity_plugin.six_checkers.source_edits import FixSource, SourceEdit
+from flake8_six_compatablity_plugin.six_checkers.trigger_scanner import TriggerScanner
+
+
+@functools.lru_cache(maxsize=1)
+def fixable_checkers() -> FrozenSet[SixChecker]:
+    """
+    Returns:
+        FrozenSet[SixChecker]: The checkers of the manifest whose errors have a mechanical fix.
+    """
+    return frozenset(checker for checker in all_checkers() if checker.fixable)
+
+
+@functools.lru_cache(maxsize=1)
+def _fix_table() -> Dict[type, Tuple[SixChecker, ...]]:
+    """
+    Returns:
+        Dict[type, Tuple[SixChecker, ...]]: The fixable checkers of each node type, in the order they run.
+    """
+    return {
+        getattr(ast, node_name): checkers
+        for node_name, checkers in node_checkers_for(fixable_checkers()).items()
+        if hasattr(ast, node_name)
+    }
+
+
+@functools.lru_cache(maxsize=1)
+def _fix_trigger_scanner() -> TriggerScanner:
+    return TriggerScanner(fixable_checkers())
+
+
+def fix_edits(source: FixSource) -> List[SourceEdit]:
+    """
+    Run the fixable checkers on the tree of the given source, and collect the fixes of the nodes they found errors in.
+
+    Args:
+        source (FixSource): The source to fix.
+
+    Returns:
+        List[SourceEdit]: The edits that fix the errors.
+    """
+    fix_table = _fix_table()
+    errors = SixErrorBuffer()
+    edits = []
+    for node in ast.walk(source.tree):
+        for checker in fix_table.get(type(node), ()):
+            errors_count = len(errors)
+            checker.check(node, errors)
+            if len(errors) > errors_count:
+                edits.extend(checker.fix(node, source))
+    return edits
+
+
+def apply_edits(text: str, edits: Iterable[SourceEdit]) -> Tuple[str, int]:
+    """
+    Apply the given edits to the text in a single pass.
+    Identical edits - like the import that the fix of each call to a moved function adds - are applied once, and an
+    edit that overlaps an edit before it is skipped.
+
+    Args:
+        text (str): The text to edit.
+        edits (Iterable[SourceEdit]): The edits, with offsets in the given text.
+
+    Returns:
+        Tuple[str, int]: The edited text, and the number of applied edits.
+    """
+    pieces = []
+    position = 0
+    applied_edits = 0
+    for edit in sorted(dict.fromkeys(edits), key=lambda edit: (edit.start, edit.end)):
+        if edit.start < position:
+            continue
+        pieces.append(text[position : edit.start])
+        pieces.append(edit.text)
+        position = edit.end
+        applied_edits += 1
+    pieces.append(text[position:])
+    return "".join(pieces), applied_edits
+
+
+def fix_source(text: str, filename: str = "<unknown>") -> Tuple[str, int]:
+    """
+    Fix the mechanically fixable SIX errors of the given source.
+    Only the fixed text changes - the rest of the source, including its line breaks, is kept as is.
+
+    Args:
+        text (str): The text of the source.
+        filename (str): The name of the source, used for syntax errors.
+
+    Returns:
+        Tuple[str, int]: The fixed text, and the number of applied edits.
+
+    Raises:
+        SyntaxError: If the source can not be parsed.
+    """
+    if not _fix_trigger_scanner().triggered_checkers((text,)):
+        return text, 0
+    source = FixSource(text, ast.parse(text, filename))
+    return apply_edits(text, fix_edits(source))
@@ -1,18 +1,656 @@
 #!/usr/bin/env python3
 import ast
+import atexit
+import itertools
+import os
+import sys
+import time
+import tokenize
+from typing import TYPE_CHECKING, AbstractSet, FrozenSet, Iterable, List, NoReturn, Optional, Sequence, Tuple
 
-from flake8_six_compatablity_plugin.six_checkers.six_compatibility_node_visitor import SixCompatibilityNodeVisitor
+from flake8_six_compatablity_plugin.flake8_errors_info import SIXErrorInfo
+from flake8_six_compatablity_plugin.six_checkers.checker_loader import (
+    MANIFEST_ENTRIES,
+    MANIFEST_TOKEN_CHECKERS,
+    load_checker,
+    load_checkers,
+)
+from flake8_six_compatablity_plugin.six_checkers.rule_file import EMPTY_RULE_SET, RuleSet, load_rule_file
+from flake8_six_compatablity_plugin.six_checkers.six_checker import SixChecker
+from flake8_six_compatablity_plugin.six_checkers.six_error_buffer import SixErrorBuffer, SixErrorLimitReached
+from flake8_six_compatablity_plugin.six_checkers.trigger_scanner import TriggerScanner
+
+# The modules of the optional features are imported only when their options are set, since flake8 imports the plugin
+# on every run.
+if TYPE_CHECKING:
+    from flake8_six_compatablity_plugin.baseline import Baseline, BaselineWriter
+    from flake8_six_compatablity_plugin.checker_profiler import CheckerProfiler, FileProfile
+    from flake8_six_compatablity_plugin.incremental import IncrementalChecker
+    from flake8_six_compatablity_plugin.policy_file import PolicyNode, PolicyTrie
+    from flake8_six_compatablity_plugin.policy_profiles import PolicyProfile, ProfileRoutes
+    from flake8_six_compatablity_plugin.project_index import ProjectIndex
+    from flake8_six_compatablity_plugin.result_cache import SixResultCache
+
+
+def _create_visitor(
+    max_errors: int = 0,
+    rule_checkers: FrozenSet[SixChecker] = frozenset(),
+    enabled_error_numbers: Optional[FrozenSet[int]] = None,
+):
+    # The visitor imports all of the checker modules, so it is imported only when it is used.
+    from flake8_six_compatablity_plugin.six_checkers.six_compatibility_node_visitor import visitor_class_for
+
+    return visitor_class_for(rule_checkers, enabled_error_numbers)(max_errors)
+
+
+def _create_dispatcher(checkers: Optional[FrozenSet[SixChecker]] = None, *args, **kwargs):
+    from flake8_six_compatablity_plugin.six_checkers.six_compatibility_dispatcher import SixCompatibilityDispatcher
+
+    return SixCompatibilityDispatcher(checkers, *args, **kwargs)
+
+
+ENGINES = {
+    "visitor": _create_visitor,
+    "dispatcher": _create_dispatcher,
+}
+# The environment variable --six-profile defaults to.
+PROFILE_ENVIRONMENT_VARIABLE = "SIX_PROFILE"
+# The flake8 options that decide which codes are enabled, and the plugin options that change the reported errors.
+CACHE_KEY_OPTIONS = (
+    "select",
+    "extend_select",
+    "ignore",
+    "extend_ignore",
+    "six_max_errors_per_file",
+    "six_string_prefix_exemptions",
+    "six_policy_profiles",
+)
+# The name the token checkers are profiled under, instead of a node type.
+TOKENS_PROFILE_NAME = "tokens"
+# The triggers are scanned on the manifest entries, so only the modules of the triggered checkers are imported.
+TRIGGER_SCANNER = TriggerScanner(MANIFEST_ENTRIES.values())
+
+
+def _enabled_error_numbers(options, error_numbers: Iterable[int]) -> Optional[FrozenSet[int]]:
+    """
+    Args:
+        options: The parsed flake8 options.
+        error_numbers (Iterable[int]): The error numbers of all of the checkers.
+
+    Returns:
+        Optional[FrozenSet[int]]: The error numbers whose codes flake8 reports, by its --select, --ignore and their
+            extended variants, or None if all of them are reported.
+    """
+    # flake8's style guide is imported only when the plugin runs under flake8.
+    from flake8.style_guide import Decision, DecisionEngine
+
+    decision_engine = DecisionEngine(options)
+    error_numbers = frozenset(error_numbers)
+    enabled_error_numbers = frozenset(
+        error_number
+        for error_number in error_numbers
+        if decision_engine.decision_for(f"{SIXErrorInfo.error_prefix}{error_number:03}") is Decision.Selected
+    )
+    return None if enabled_error_numbers == error_numbers else enabled_error_numbers
+
+
+def _profile_routes(options, profiles: Sequence["PolicyProfile"], error_numbers: Iterable[int]) -> "ProfileRoutes":
+    """
+    Args:
+        options: The parsed flake8 options.
+        profiles (Sequence[PolicyProfile]): The policy profiles.
+        error_numbers (Iterable[int]): The error numbers of all of the checkers.
+
+    Returns:
+        ProfileRoutes: The prefixes of the profiles that enable each error number, and whose code of it flake8
+            reports. Error numbers that no profile reports are left out.
+    """
+    from flake8.style_guide import Decision, DecisionEngine
+
+    decision_engine = DecisionEngine(options)
+    routes = {}
+    for error_number in error_numbers:
+        prefixes = tuple(
+            profile.prefix
+            for profile in profiles
+            if profile.enables(error_number)
+            and decision_engine.decision_for(profile.code(error_number)) is Decision.Selected
+        )
+        if prefixes:
+            routes[error_number] = prefixes
+    return routes
+
+
+def _option_error(option_name: str, error: Exception) -> NoReturn:
+    """
+    Stop flake8 with a single line that describes the invalid option, like argparse does, instead of a traceback.
+
+    Args:
+        option_name (str): The name of the invalid option, like --six-rules-file.
+        error (Exception): The error of its value, like the OSError of a missing file.
+    """
+    print(f"flake8: error: {option_name}: {error}", file=sys.stderr)
+    raise SystemExit(2)
+
+
+def _cache_key_options(options) -> List[str]:
+    """
+    Args:
+        options: The parsed flake8 options.
+
+    Returns:
+        List[str]: The values of the options that change the reported errors, prefixed with the option name.
+    """
+    cache_key_options = []
+    for option_name in CACHE_KEY_OPTIONS:
+        values = getattr(options, option_name, None) or ()
+        if not isinstance(values, (list, tuple)):
+            values = (values,)
+        cache_key_options.extend(f"{option_name}={value}" for value in values)
+    return cache_key_options
 
 
 class SixCompatibilityPlugin:
     name = "six_compatibility_plugin"
     version = "1.0.0"
 
-    def __init__(self, tree: ast.AST):
+    engine = "dispatcher"
+    max_errors_per_file = 0
+    result_cache: "SixResultCache" = None
+    profiler: "CheckerProfiler" = None
+    incremental_checker: "IncrementalChecker" = None
+    rule_set: RuleSet = EMPTY_RULE_SET
+    # The error numbers of the checkers whose codes are reported, or None if all of them are.
+    enabled_error_numbers: Optional[FrozenSet[int]] = None
+    trigger_scanner: TriggerScanner = TRIGGER_SCANNER
+    baseline: "Baseline" = None
+    baseline_writer: "BaselineWriter" = None
+    project_index: "ProjectIndex" = None
+    # The strings SIX009 allows without a prefix, or None for its defaults.
+    string_prefix_exemptions: Optional[FrozenSet[str]] = None
+    policy_profiles: Tuple["PolicyProfile", ...] = ()
+    # The prefixes of the profiles that report each error number, or None to report the SIX codes as they are.
+    profile_routes: Optional["ProfileRoutes"] = None
+    # The checkers that run on each directory, or None to run the same checkers on every file.
+    policy_trie: "PolicyTrie" = None
+
+    def __init__(
+        self,
+        tree: ast.AST,
+        lines: List[str],
+        filename: str = "stdin",
+        file_tokens: Optional[Iterable[tokenize.TokenInfo]] = None,
+    ):
+        """
+        Args:
+            tree (ast.AST): The tree of the file.
+            lines (List[str]): The physical lines of the file.
+            filename (str): The name of the file.
+            file_tokens (Optional[Iterable[tokenize.TokenInfo]]): The tokens flake8 produced for the file. An
+                iterator is consumed only if a token checker is triggered. The token checkers are skipped without it.
+        """
         self._tree = tree
+        self._lines = lines
+        self._filename = filename
+        self._file_tokens = file_tokens
+        self._policy: Optional["PolicyNode"] = None
+
+    @classmethod
+    def add_options(cls, option_manager) -> None:
+        option_manager.add_option(
+            "--six-engine",
+            default=cls.engine,
+            choices=tuple(ENGINES),
+            parse_from_config=True,
+            help="The engine used to walk the tree and run the SIX checkers. (Default: %(default)s)",
+        )
+        option_manager.add_option(
+            "--six-cache-dir",
+            default=None,
+            parse_from_config=True,
+            help="A directory to cache the SIX errors of each source in. It can be shared between processes. "
+            "(Default: no cache)",
+        )
+        option_manager.add_option(
+            "--six-cache-max-size",
+            type=int,
+            default=None,
+            parse_from_config=True,
+            help="The size in bytes above which the least recently used cache entries are evicted. "
+            "(Default: 256 MiB)",
+        )
+        option_manager.add_option(
+            "--six-cache-statistics",
+            action="store_true",
+            parse_from_config=True,
+            help="Print the hits and misses of the SIX result cache, of all of the -j workers, when flake8 exits.",
+        )
+        option_manager.add_option(
+            "--six-max-errors-per-file",
+            type=int,
+            default=cls.max_errors_per_file,
+            parse_from_config=True,
+            help="Stop checking a file after this number of SIX errors were found in it. 0 for no limit. "
+            "(Default: %(default)s)",
+        )
+        option_manager.add_option(
+            "--six-incremental-dir",
+            default=None,
+            parse_from_config=True,
+            help="A directory to store the SIX errors of each function and class body of each file in, so only the "
+            "parts of a file that changed since its last check are checked again. (Default: check whole files)",
+        )
+        option_manager.add_option(
+            "--six-profile",
+            default=os.environ.get(PROFILE_ENVIRONMENT_VARIABLE),
+            parse_from_config=True,
+            help="Write a report of the calls, time and errors of each SIX checker, per node type and per file, to "
+            f"the given JSON file. (Default: the {PROFILE_ENVIRONMENT_VARIABLE} environment variable, or no report)",
+        )
+
+        option_manager.add_option(
+            "--six-baseline",
+            default=None,
+            parse_from_config=True,
+            help="A baseline file written by --six-write-baseline. The SIX errors that existed when it was written are "
+            "not reported. (Default: report all errors)",
+        )
+        option_manager.add_option(
+            "--six-write-baseline",
+            default=None,
+            help="Write the fingerprints of all of the reported SIX errors to the given baseline file.",
+        )
+
+        option_manager.add_option(
+            "--six-project-index-dir",
+            default=None,
+            parse_from_config=True,
+            help="Index the classes of every python file under the current directory, storing the summary of each "
+            "file in the given directory by its hash, so the class hierarchy rules account for the classes inherited "
+            "from other files. (Default: check each file on its own)",
+        )
+
+        option_manager.add_option(
+            "--six-rules-file",
+            default=None,
+            parse_from_config=True,
+            help="A TOML (.toml) or INI file of additional banned calls, module attributes, imports and function "
+            "names, each with its own SIX code and message. (Default: no rule file)",
+        )
+
+        from flake8_six_compatablity_plugin.six_checkers.constant_checkers import STRING_PREFIX_EXEMPTIONS
+
+        option_manager.add_option(
+            "--six-string-prefix-exemptions",
+            default=",".join(STRING_PREFIX_EXEMPTIONS),
+            comma_separated_list=True,
+            parse_from_config=True,
+            help="The strings that are allowed without a b or u prefix, out of "
+            f"{', '.join(STRING_PREFIX_EXEMPTIONS)}. (Default: %(default)s)",
+        )
+
+        option_manager.add_option(
+            "--six-policy-file",
+            default=None,
+            parse_from_config=True,
+            help="A TOML (.toml) or INI file that maps directories, relative to its own directory, to the SIX codes "
+            "whose checkers run on the files under them. (Default: run the same checkers on every file)",
+        )
+        option_manager.add_option(
+            "--six-policy-profiles",
+            default=None,
+            parse_from_config=True,
+            help="Named subsets of the SIX checkers, each reported with its own code prefix, like "
+            '"strict=SIX: SIX; relaxed=SXR: SIX001 SIX015 SIX016" - one per line in the config file. The checkers of '
+            "all of the profiles run in a single walk, and each error is reported once for every profile that "
+            "enables it. (Default: report the SIX codes)",
+        )
+
+    @classmethod
+    def parse_options(cls, options) -> None:
+        from flake8_six_compatablity_plugin.six_checkers.constant_checkers import STRING_PREFIX_EXEMPTIONS
+
+        unknown_exemptions = set(options.six_string_prefix_exemptions) - set(STRING_PREFIX_EXEMPTIONS)
+        if unknown_exemptions:
+            _option_error(
+                "--six-string-prefix-exemptions",
+                ValueError(
+                    f"unknown exemptions {', '.join(sorted(unknown_exemptions))} - "
+                    f"the exemptions are {', '.join(STRING_PREFIX_EXEMPTIONS)}"
+                ),
+            )
+        cls.string_prefix_exemptions = frozenset(options.six_string_prefix_exemptions)
+
+        cls.engine = options.six_engine
+        cls.max_errors_per_file = options.six_max_errors_per_file
+        try:
+            cls.load_rule_file(options.six_rules_file)
+        except (OSError, ValueError) as error:
+            _option_error("--six-rules-file", error)
+        error_numbers = frozenset(
+            itertools.chain(MANIFEST_ENTRIES, (checker.error_number for checker in cls.rule_set.checkers))
+        )
+        if options.six_policy_profiles:
+            from flake8_six_compatablity_plugin.policy_profiles import parse_policy_profiles
+
+            try:
+                cls.policy_profiles = parse_policy_profiles(options.six_policy_profiles)
+            except ValueError as error:
+                _option_error("--six-policy-profiles", error)
+        else:
+            cls.policy_profiles = ()
+        if cls.policy_profiles:
+            # The codes of the profiles are reported by default, like the codes of the plugin itself.
+            options.extended_default_select = [
+                *options.extended_default_select,
+                *(profile.prefix for profile in cls.policy_profiles),
+            ]
+            cls.profile_routes = _profile_routes(options, cls.policy_profiles, error_numbers)
+            enabled_error_numbers = frozenset(cls.profile_routes)
+            # Only the checkers of the reported codes run, so flake8 has no errors to discard.
+            cls.select_error_numbers(None if enabled_error_numbers == error_numbers else enabled_error_numbers)
+        else:
+            cls.profile_routes = None
+            cls.select_error_numbers(_enabled_error_numbers(options, error_numbers))
+        if options.six_policy_file:
+            from flake8_six_compatablity_plugin.policy_file import load_policy_file
+
+            # The policies choose out of the enabled checkers, so a file runs only the checkers of reported codes.
+            try:
+                cls.policy_trie = load_policy_file(
+                    options.six_policy_file,
+                    error_numbers if cls.enabled_error_numbers is None else cls.enabled_error_numbers,
+                )
+            except (OSError, ValueError) as error:
+                _option_error("--six-policy-file", error)
+        else:
+            cls.policy_trie = None
+        if options.six_cache_dir:
+            from flake8_six_compatablity_plugin.result_cache import DEFAULT_CACHE_MAX_SIZE, SixResultCache
+
+            cls.result_cache = SixResultCache(
+                options.six_cache_dir,
+                cls.version,
+                _cache_key_options(options),
+                DEFAULT_CACHE_MAX_SIZE if options.six_cache_max_size is None else options.six_cache_max_size,
+                cls.rule_set,
+            )
+            if options.six_cache_statistics:
+                import multiprocessing
+
+                parent_process = multiprocessing.parent_process()
+                if parent_process is None:
+                    cls.result_cache.enable_statistics(os.getpid())
+                    cls.result_cache.reset_statistics()
+                    atexit.register(cls.result_cache.write_statistics)
+                else:
+                    cls.result_cache.enable_statistics(parent_process.pid)
+        else:
+            cls.result_cache = None
+
+        if options.six_incremental_dir:
+            from flake8_six_compatablity_plugin.incremental import IncrementalChecker
+
+            cls.incremental_checker = IncrementalChecker(options.six_incremental_dir, cls.version, cls.rule_set)
+        else:
+            cls.incremental_checker = None
+
+        if options.six_baseline and options.six_write_baseline:
+            _option_error("--six-write-baseline", ValueError("can not be used together with --six-baseline"))
+        if options.six_baseline:
+            from flake8_six_compatablity_plugin.baseline import Baseline
+
+            try:
+                cls.baseline = Baseline(options.six_baseline)
+            except (OSError, ValueError) as error:
+                _option_error("--six-baseline", error)
+        else:
+            cls.baseline = None
+        if options.six_write_baseline:
+            import multiprocessing
+
+            from flake8_six_compatablity_plugin.baseline import BaselineWriter
+
+            cls.baseline_writer = BaselineWriter(options.six_write_baseline)
+            if multiprocessing.parent_process() is None:
+                cls.baseline_writer.reset()
+                atexit.register(cls.baseline_writer.write)
+        else:
+            cls.baseline_writer = None
+
+        if options.six_project_index_dir:
+            cls.load_project_index(options)
+        else:
+            cls.project_index = None
+
+        if options.six_profile:
+            # multiprocessing is slow to import, and is needed only for profiling, cache statistics and writing
+            # baselines.
+            import multiprocessing
+
+            from flake8_six_compatablity_plugin.checker_profiler import CheckerProfiler
+
+            cls.profiler = CheckerProfiler(options.six_profile)
+            # flake8 -j workers parse the options as well, but only the main process outlives them.
+            if multiprocessing.parent_process() is None:
+                cls.profiler.reset()
+                atexit.register(cls.profiler.write_report)
+        else:
+            cls.profiler = None
+
+    @classmethod
+    def load_rule_file(cls, rules_file: Optional[str]) -> None:
+        """
+        Check the rules of the given rule file along with the built-in checkers.
+
+        Args:
+            rules_file (Optional[str]): The path of the rule file, or None to check only the built-in checkers.
+        """
+        cls.rule_set = load_rule_file(rules_file) if rules_file else EMPTY_RULE_SET
+        cls._update_trigger_scanner()
+
+    @classmethod
+    def load_project_index(cls, options) -> None:
+        """
+        Index the python files under the current directory that flake8 does not exclude. The flake8 -j workers that
+        are not forked load the index the main process built.
+
+        Args:
+            options: The parsed flake8 options.
+        """
+        import multiprocessing
+
+        from flake8_six_compatablity_plugin.project_index import ProjectIndex
+
+        if multiprocessing.parent_process() is not None:
+            cls.project_index = ProjectIndex.load(options.six_project_index_dir)
+            return
+
+        # The command line tool imports the plugin, so it is imported only when it is used.
+        from flake8_six_compatablity_plugin.cli import discover_files
+
+        paths = list(discover_files((os.curdir,), list(options.exclude) + list(options.extend_exclude)))
+        jobs = (os.cpu_count() or 1) if options.jobs.is_auto else options.jobs.n_jobs
+        cls.project_index = ProjectIndex.build(os.curdir, options.six_project_index_dir, paths, jobs)
+
+    @classmethod
+    def select_error_numbers(cls, enabled_error_numbers: Optional[FrozenSet[int]]) -> None:
+        """
+        Run only the checkers of the given error numbers.
+
+        Args:
+            enabled_error_numbers (Optional[FrozenSet[int]]): The error numbers of the checkers to run, or None to run
+                all of the checkers.
+        """
+        cls.enabled_error_numbers = enabled_error_numbers
+        cls._update_trigger_scanner()
+
+    @classmethod
+    def _update_trigger_scanner(cls) -> None:
+        # The disabled checkers are never triggered, so they are not imported, and their nodes are not walked into.
+        if not cls.rule_set.checkers and cls.enabled_error_numbers is None:
+            cls.trigger_scanner = TRIGGER_SCANNER
+            return
+        entries = itertools.chain(MANIFEST_ENTRIES.values(), cls.rule_set.checkers)
+        if cls.enabled_error_numbers is not None:
+            entries = (entry for entry in entries if entry.error_number in cls.enabled_error_numbers)
+        cls.trigger_scanner = TriggerScanner(entries)
+
+    def _create_engine(
+        self,
+        checkers: FrozenSet[SixChecker],
+        profile: "FileProfile" = None,
+        max_errors: int = 0,
+        enabled_error_numbers: Optional[FrozenSet[int]] = None,
+    ):
+        if self.engine == "dispatcher":
+            if profile is not None:
+                engine = profile.create_dispatcher(checkers, max_errors)
+            else:
+                engine = _create_dispatcher(checkers, max_errors=max_errors)
+        # The visitor always runs all of the enabled checkers, so only the whole walk can be skipped.
+        elif profile is not None:
+            engine = profile.create_visitor(max_errors, self.rule_set.checkers, enabled_error_numbers)
+        else:
+            engine = ENGINES[self.engine](max_errors, self.rule_set.checkers, enabled_error_numbers)
+
+        engine.errors.class_hierarchy = self._class_hierarchy()
+        return engine
+
+    def _class_hierarchy(self) -> Optional[dict]:
+        if self.project_index is None:
+            return None
+        return self.project_index.hierarchy(self._filename)
+
+    def _class_hierarchy_context(self) -> str:
+        """
+        Returns:
+            str: The classes the file inherits from in project mode, which its errors depend on, or an empty string.
+        """
+        class_hierarchy = self._class_hierarchy()
+        return repr(sorted(class_hierarchy.items())) if class_hierarchy else ""
+
+    def _walk(self, visitor) -> SixErrorBuffer:
+        try:
+            visitor.visit(self._tree)
+        except SixErrorLimitReached:
+            pass
+        return visitor.errors
+
+    def _check_tokens(
+        self, triggered_entries: AbstractSet, errors: SixErrorBuffer, profile: "FileProfile" = None
+    ) -> None:
+        if self._file_tokens is None:
+            return
+        if self.max_errors_per_file and len(errors) >= self.max_errors_per_file:
+            return
+
+        token_checkers = [
+            load_checker(error_number)
+            for error_number in MANIFEST_TOKEN_CHECKERS
+            if MANIFEST_ENTRIES[error_number] in triggered_entries
+        ]
+        # An iterator of the tokens can be consumed only once.
+        tokens = self._file_tokens if len(token_checkers) == 1 else tuple(self._file_tokens)
+        errors.string_prefix_exemptions = self.string_prefix_exemptions
+        try:
+            for checker in token_checkers:
+                if profile is not None:
+                    checker = profile.profiled_checker(TOKENS_PROFILE_NAME, checker)
+                checker.check(tokens, errors)
+        except SixErrorLimitReached:
+            pass
+
+    def _check(self) -> SixErrorBuffer:
+        enabled_error_numbers = self.enabled_error_numbers
+        if self._policy is not None:
+            # The policy of the file is a subset of the enabled checkers.
+            enabled_error_numbers = self._policy.error_numbers
+            if not enabled_error_numbers:
+                return SixErrorBuffer()
+
+        triggered_entries = self.trigger_scanner.triggered_checkers(self._lines)
+        if self._policy is not None:
+            triggered_entries = frozenset(
+                entry for entry in triggered_entries if entry.error_number in enabled_error_numbers
+            )
+        if not triggered_entries:
+            return SixErrorBuffer()
+
+        if self.incremental_checker is not None:
+            # The stored errors of each unit must not depend on the triggers found in the rest of the file, nor on
+            # the errors limit or the enabled codes - they are applied when the errors are reported.
+            from flake8_six_compatablity_plugin.six_checkers.six_compatibility_dispatcher import all_checkers
+
+            checkers = all_checkers() | self.rule_set.checkers
+            errors = self.incremental_checker.check(
+                self._filename,
+                self._tree,
+                self._lines,
+                checkers,
+                self._create_engine(checkers),
+                self._class_hierarchy_context(),
+            )
+            if self._policy is not None:
+                # The codes that flake8 does not report are filtered by flake8, but the policy of the file is not.
+                policy_errors = SixErrorBuffer()
+                for record in errors.records():
+                    if record[2] in enabled_error_numbers:
+                        policy_errors.add(*record)
+                errors = policy_errors
+            self._check_tokens(triggered_entries, errors)
+            return errors
+
+        # The checkers of the rule file are registered, so they are found by their error numbers as well.
+        checkers = load_checkers(entry.error_number for entry in triggered_entries)
+        if self.profiler is None:
+            engine = self._create_engine(
+                checkers, max_errors=self.max_errors_per_file, enabled_error_numbers=enabled_error_numbers
+            )
+            errors = self._walk(engine)
+            self._check_tokens(triggered_entries, errors)
+            return errors
+
+        from flake8_six_compatablity_plugin.checker_profiler import FileProfile
+
+        profile = FileProfile(self._filename)
+        visitor = self._create_engine(checkers, profile, self.max_errors_per_file, enabled_error_numbers)
+        start_time = time.perf_counter()
+        errors = self._walk(visitor)
+        self._check_tokens(triggered_entries, errors, profile)
+        profile.seconds = time.perf_counter() - start_time
+        self.profiler.record(profile)
+        return errors
 
     def run(self):
-        visitor = SixCompatibilityNodeVisitor()
-        visitor.visit(self._tree)
+        if self.policy_trie is not None:
+            self._policy = self.policy_trie.resolve(self._filename)
+
+        if self.result_cache is None:
+            errors = self._check()
+        else:
+            # In project mode, the errors of a file depend on the classes it inherits from as well, and with a policy
+            # file on the checkers of its directory.
+            context = self._class_hierarchy_context()
+            if self._policy is not None:
+                context += self._policy.signature
+            key = self.result_cache.key("".join(self._lines), context)
+            errors = self.result_cache.get(key)
+            if errors is None:
+                errors = self._check()
+                self.result_cache.set(key, errors)
+
+        # The baseline is matched after the cache, so the cached errors do not depend on it.
+        if self.baseline_writer is not None:
+            self.baseline_writer.record(self._filename, self._tree, self._lines, errors)
+        elif self.baseline is not None:
+            errors = self.baseline.filter(self._filename, self._tree, self._lines, errors)
+
+        # The errors are created from their packed records only as they are reported.
+        if self.max_errors_per_file:
+            errors = itertools.islice(errors, self.max_errors_per_file)
+        if self.profile_routes is not None:
+            from flake8_six_compatablity_plugin.policy_profiles import route_errors
 
-        yield from visitor.errors
+            errors = route_errors(errors, self.profile_routes)
+        yield from errors
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+import ast
+import hashlib
+import json
+import os
+from typing import Dict, FrozenSet, List, Optional, Union
+
+from flake8_six_compatablity_plugin.result_cache import atomic_write_json, checkers_signature
+from flake8_six_compatablity_plugin.six_checkers.rule_file import EMPTY_RULE_SET, RuleSet
+from flake8_six_compatablity_plugin.six_checkers.six_checker import SixChecker
+from flake8_six_compatablity_plugin.six_checkers.six_compatibility_dispatcher import dispatch_table_for
+from flake8_six_compatablity_plugin.six_checkers.six_error_buffer import SixErrorBuffer
+from flake8_six_compatablity_plugin.six_checkers.symbol_index import Scope, node_scope
+
+UNITS_FILE_SUFFIX = ".json"
+# Changed whenever the format of the stored units changes, so units stored in an older format are not read.
+UNITS_FORMAT_VERSION = 3
+# The body statements of these nodes are separate units. The checks of the node itself, and of its other fields,
+# run on every check, since they may depend on the whole body (like DivisionSpecialMethodsChecker).
+SPLIT_NODE_TYPES = (ast.Module, ast.ClassDef)
+SPLIT_FIELD = "body"
+
+# The errors of a unit, as lists of (line number relative to the unit start, offset, error_number).
+UnitErrors = List[List[int]]
+# The symbol index changes of a unit, with the line numbers of their scopes relative to the unit start.
+UnitSymbolChanges = List[list]
+# The stored scope of the changes in the body of the class that the unit is in, which starts before the unit, and may
+# end anywhere after it.
+CLASS_BODY_SCOPE = "class"
+# The errors and the symbol index changes of a unit.
+Unit = List[list]
+
+
+def _unit_start_line(node: ast.stmt) -> int:
+    """
+    Args:
+        node (ast.stmt): The unit statement.
+
+    Returns:
+        int: The first line of the unit, including its decorators.
+    """
+    return min(
+        [node.lineno]
+        + [decorator.lineno for decorator in getattr(node, "decorator_list", ())]
+    )
+
+
+def unit_fingerprint(node: ast.stmt, lines: List[str]) -> str:
+    """
+    Fingerprint the given statement by its source lines and its position in them.
+    A statement with the same source lines, that starts and ends at the same columns, parses to the same subtree up
+    to its line numbers, so its errors are the same up to a line shift.
+
+    Args:
+        node (ast.stmt): The unit statement.
+        lines (List[str]): The physical lines of the source.
+
+    Returns:
+        str: The fingerprint of the statement.
+    """
+    fingerprint = hashlib.sha1(
+        f"{type(node).__name__}:{node.col_offset}:{node.end_col_offset}\n".encode()
+    )
+    for line in lines[_unit_start_line(node) - 1 : node.end_lineno]:
+        fingerprint.update(line.encode("utf-8", "surrogatepass"))
+    return fingerprint.hexdigest()
+
+
+class IncrementalChecker:
+    """
+    Checks sources one unit at a time - each top level statement, and each statement in a class body - and reuses
+    the errors of the units that did not change since the previous check of the same file. Function bodies are not
+    split, so each top level function and each method is a single unit.
+
+    The errors of each unit are stored with line numbers relative to the unit start, so a unit that only moved is
+    reused as well. The units of each file are stored in a single file in the given directory.
+
+    When the checkers use the symbol index, the names a unit resolves depend on the statements before it, so the
+    index state - and the bindings of the class body the unit is in - is part of the unit fingerprint, and the index
+    changes of each unit are replayed when it is reused.
+    """
+
+    def __init__(self, directory: str, version: str, rule_set: RuleSet = EMPTY_RULE_SET):
+        self.directory = directory
+        self.reused_units = 0
+        self.checked_units = 0
+        self._salt = f"{UNITS_FORMAT_VERSION}\0{version}\0{checkers_signature(rule_set)}"
+
+        os.makedirs(directory, exist_ok=True)
+
+    def _units_path(self, filename: str) -> str:
+        filename_hash = hashlib.sha256(os.path.abspath(filename).encode("utf-8", "surrogatepass"))
+        return os.path.join(self.directory, filename_hash.hexdigest() + UNITS_FILE_SUFFIX)
+
+    def _load_units(self, filename: str, salt: str) -> Dict[str, Unit]:
+        try:
+            with open(self._units_path(filename), encoding="utf-8") as units_file:
+                data = json.load(units_file)
+        except (OSError, ValueError):
+            return {}
+
+        if not isinstance(data, dict) or data.get("salt") != salt:
+            return {}
+        return data["units"]
+
+    def check(
+        self,
+        filename: str,
+        tree: ast.Module,
+        lines: List[str],
+        checkers: FrozenSet[SixChecker],
+        engine,
+        context: str = "",
+    ) -> SixErrorBuffer:
+        """
+        Check the given tree, reusing the errors of the units that did not change since the last check of the file.
+        The errors are identical, in value and order, to the errors of walking the whole tree with the engine.
+
+        Args:
+            filename (str): The name of the checked file.
+            tree (ast.Module): The tree of the file.
+            lines (List[str]): The physical lines of the file.
+            checkers (FrozenSet[SixChecker]): The checkers the engine runs.
+            engine: A new SixCompatibilityNodeVisitor or SixCompatibilityDispatcher.
+            context (str): Anything else the errors of the file depend on, like the classes it inherits from in
+                project mode. The units of the file are reused only with the same context.
+
+        Returns:
+            SixErrorBuffer: The errors found in the tree.
+        """
+        salt = self._salt
+        if context:
+            salt += "\0" + hashlib.sha1(context.encode("utf-8", "surrogatepass")).hexdigest()
+        check = _UnitsCheck(
+            lines,
+            engine,
+            dispatch_table_for(checkers),
+            self._load_units(filename, salt),
+            any(checker.uses_symbol_index for checker in checkers),
+        )
+        check.check_split_node(tree)
+        self.reused_units += check.reused_units
+        self.checked_units += check.checked_units
+
+        atomic_write_json(
+            self._units_path(filename), {"salt": salt, "units": check.units}
+        )
+        return engine.errors
+
+
+class _UnitsCheck:
+    """
+    The state of a single incremental check.
+    """
+
+    def __init__(
+        self, lines, engine, dispatch_table, previous_units: Dict[str, Unit], uses_symbol_index: bool
+    ):
+        self.units: Dict[str, Unit] = {}
+        self.reused_units = 0
+        self.checked_units = 0
+        self._lines = lines
+        self._engine = engine
+        self._dispatch_table = dispatch_table
+        self._previous_units = previous_units
+        self._uses_symbol_index = uses_symbol_index
+        self._symbols_state = None
+        self._symbols_state_digest = ""
+        # The scope of the class whose body is checked, or None for the module.
+        self._class_scope: Scope = None
+
+    def _symbols_digest(self) -> str:
+        """
+        Returns:
+            str: The digest of the current symbol index state, or an empty string if the checkers do not use it.
+        """
+        if not self._uses_symbol_index:
+            return ""
+        symbols = self._engine.errors.symbols
+        state = symbols.state()
+        if state is not self._symbols_state:
+            self._symbols_state = state
+            self._symbols_state_digest = hashlib.sha1(repr(state).encode("utf-8", "surrogatepass")).hexdigest()
+        if self._class_scope is None:
+            return self._symbols_state_digest
+        class_state = repr(symbols.scope_state(self._class_scope))
+        return self._symbols_state_digest + hashlib.sha1(class_state.encode("utf-8", "surrogatepass")).hexdigest()
+
+    def check_split_node(self, node: ast.AST) -> None:
+        """
+        Run the checks of the node itself, and check its fields in the order the engine walks them, where each
+        statement of its body is a separate unit.
+        """
+        errors = self._engine.errors
+        for check in self._dispatch_table.get(type(node), ()):
+            check(node, errors)
+
+        for field in node._fields:
+            value = getattr(node, field, None)
+            if field == SPLIT_FIELD:
+                outer_class_scope = self._class_scope
+                if isinstance(node, ast.ClassDef):
+                    self._class_scope = node_scope(node)
+                for statement in value:
+                    self._check_unit(statement)
+                self._class_scope = outer_class_scope
+            elif isinstance(value, list):
+                for item in value:
+                    if isinstance(item, ast.AST):
+                        self._engine.visit(item)
+            elif isinstance(value, ast.AST):
+                self._engine.visit(value)
+
+    def _check_unit(self, node: ast.stmt) -> None:
+        if isinstance(node, SPLIT_NODE_TYPES):
+            self.check_split_node(node)
+            return
+
+        fingerprint = unit_fingerprint(node, self._lines) + self._symbols_digest()
+        start_line = _unit_start_line(node)
+        errors = self._engine.errors
+        symbols = errors.symbols if self._uses_symbol_index else None
+
+        unit = self.units.get(fingerprint)
+        if unit is None:
+            unit = self._previous_units.get(fingerprint)
+
+        if unit is not None:
+            self.reused_units += 1
+            unit_errors, unit_symbol_changes = unit
+            for relative_line_number, offset, error_number in unit_errors:
+                errors.add(start_line + relative_line_number, offset, error_number)
+            if symbols is not None:
+                for name, qualified_name, scope in unit_symbol_changes:
+                    symbols.bind(name, qualified_name, _absolute_scope(scope, start_line, self._class_scope))
+        else:
+            self.checked_units += 1
+            first_error_index = len(errors)
+            first_change_index = len(symbols.changes) if symbols is not None else 0
+            self._engine.visit(node)
+            unit_errors = [
+                [line_number - start_line, offset, error_number]
+                for line_number, offset, error_number in errors.records(first_error_index)
+            ]
+            unit_symbol_changes = []
+            if symbols is not None:
+                unit_symbol_changes = [
+                    [name, qualified_name, _relative_scope(scope, start_line, self._class_scope)]
+                    for name, qualified_name, scope in symbols.changes[first_change_index:]
+                ]
+            unit = [unit_errors, unit_symbol_changes]
+
+        self.units[fingerprint] = unit
+
+
+def _relative_scope(scope: Scope, start_line: int, class_scope: Scope) -> Optional[Union[list, str]]:
+    """
+    Args:
+        scope (Scope): A scope of the symbol index.
+        start_line (int): The first line of the unit the scope is in.
+        class_scope (Scope): The scope of the class whose body the unit is in, or None for the module.
+
+    Returns:
+        Optional[Union[list, str]]: The scope, with line numbers relative to the unit start, or CLASS_BODY_SCOPE for
+            the scope of the class.
+    """
+    if scope is None:
+        return None
+    if scope == class_scope:
+        return CLASS_BODY_SCOPE
+    start_line_number, start_offset, end_line_number, end_offset, kind = scope
+    return [start_line_number - start_line, start_offset, end_line_number - start_line, end_offset, kind]
+
+
+def _absolute_scope(scope: Optional[Union[list, str]], start_line: int, class_scope: Scope) -> Scope:
+    """
+    Args:
+        scope (Optional[Union[list, str]]): A scope stored by _relative_scope.
+        start_line (int): The first line of the unit the scope is in.
+        class_scope (Scope): The scope of the class whose body the unit is in, or None for the module.
+
+    Returns:
+        Scope: The scope of the symbol index.
+    """
+    if scope is None:
+        return None
+    if scope == CLASS_BODY_SCOPE:
+        return class_scope
+    start_line_number, start_offset, end_line_number, end_offset, kind = scope
+    return (start_line_number + start_line, start_offset, end_line_number + start_line, end_offset, kind)
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+import functools
+import hashlib
+import os
+import re
+import threading
+from typing import Dict, FrozenSet, Sequence, Tuple
+
+from flake8_six_compatablity_plugin.flake8_errors_info import SIXErrorInfo
+from flake8_six_compatablity_plugin.policy_profiles import SIX_CODE_PATTERN
+from flake8_six_compatablity_plugin.six_checkers.rule_file import read_tables
+
+POLICY_FIELDS = ("select", "ignore")
+CODES_SEPARATOR_PATTERN = re.compile(r"[,\s]+")
+POLICY_FILES_CACHE_SIZE = 16
+# Threads that load the same policy file at once compile it once.
+POLICY_FILES_LOCK = threading.Lock()
+
+
+class PolicyNode:
+    """
+    A directory or file of the policy trie, with the error numbers of the checkers that run on the files under it.
+    """
+
+    __slots__ = ("children", "error_numbers", "signature")
+
+    def __init__(self, error_numbers: FrozenSet[int]):
+        """
+        Args:
+            error_numbers (FrozenSet[int]): The error numbers of the checkers that run on the files under the node.
+        """
+        self.children: Dict[str, "PolicyNode"] = {}
+        self.error_numbers = error_numbers
+        # The errors of a file depend on the checkers its policy runs, so the result cache is keyed by them as well.
+        self.signature = hashlib.blake2b(
+            ",".join(map(str, sorted(error_numbers))).encode("ascii"), digest_size=8
+        ).hexdigest()
+
+
+class PolicyTrie:
+    """
+    The policies of a policy file, compiled into a trie of the directories and files they apply to.
+
+    Each node holds the error numbers of its policy, already resolved against the policies of its ancestors, so the
+    policy of a file is found with a single walk down its path - without matching the file against every policy.
+    """
+
+    def __init__(self, root_directory: str, root: PolicyNode, signature: str):
+        """
+        Args:
+            root_directory (str): The directory the paths of the policies are relative to.
+            root (PolicyNode): The node of the root directory.
+            signature (str): The digest of the policy file.
+        """
+        self.root_directory = root_directory
+        self.root = root
+        self.signature = signature
+
+    def resolve(self, filename: str) -> PolicyNode:
+        """
+        Args:
+            filename (str): The path of a checked file.
+
+        Returns:
+            PolicyNode: The deepest node on the path of the file. Files outside of the root directory get the policy of
+                the root directory.
+        """
+        # The root directory is the real directory of the policy file, so the file is resolved through its symlinks
+        # as well.
+        path = os.path.relpath(os.path.realpath(filename), self.root_directory)
+        node = self.root
+        if path == os.pardir or path.startswith(os.pardir + os.sep):
+            return node
+        for part in path.split(os.sep):
+            child = node.children.get(part)
+            if child is None:
+                break
+            node = child
+        return node
+
+
+def _policy_parts(path: str, name: str) -> Tuple[str, ...]:
+    """
+    Returns:
+        Tuple[str, ...]: The parts of the relative path of the given policy, or no parts for the root directory.
+
+    Raises:
+        ValueError: If the path of the policy is absolute, or leaves the directory of the policy file.
+    """
+    parts = tuple(part for part in name.replace("\\", "/").split("/") if part not in ("", "."))
+    if name.startswith(("/", "\\")) or os.path.isabs(name) or os.pardir in parts:
+        raise ValueError(f"Invalid policy {name} in {path}: policies must be relative paths under the policy file")
+    return parts
+
+
+def _policy_codes(path: str, name: str, field: str, value) -> Tuple[str, ...]:
+    """
+    Returns:
+        Tuple[str, ...]: The SIX codes, or prefixes of them, of the given field of a policy.
+
+    Raises:
+        ValueError: If the field is not a list of SIX codes.
+    """
+    if isinstance(value, str):
+        codes = tuple(code for code in CODES_SEPARATOR_PATTERN.split(value) if code)
+    elif isinstance(value, list) and all(isinstance(code, str) for code in value):
+        codes = tuple(value)
+    else:
+        codes = None
+    if codes is None or not all(SIX_CODE_PATTERN.fullmatch(code) for code in codes):
+        raise ValueError(
+            f"Invalid {field} of policy {name} in {path}: {field} must be a list of "
+            f"{SIXErrorInfo.error_prefix} codes, or prefixes of them"
+        )
+    return codes
+
+
+def _matching_error_numbers(error_numbers: FrozenSet[int], codes: Sequence[str]) -> FrozenSet[int]:
+    codes = tuple(codes)
+    return frozenset(
+        error_number
+        for error_number in error_numbers
+        if f"{SIXErrorInfo.error_prefix}{error_number:03}".startswith(codes)
+    )
+
+
+@functools.lru_cache(maxsize=POLICY_FILES_CACHE_SIZE)
+def _compile_policy_file(path: str, modification_time: int, size: int, error_numbers: FrozenSet[int]) -> PolicyTrie:
+    with open(path, "rb") as policy_file:
+        content = policy_file.read()
+
+    policies = []
+    for name, fields in read_tables(path, content.decode("utf-8"), "policy file", "policy").items():
+        unknown_fields = set(fields) - set(POLICY_FIELDS)
+        if unknown_fields:
+            raise ValueError(
+                f"Invalid policy {name} in {path}: each policy has only the fields {', '.join(POLICY_FIELDS)}"
+            )
+        codes = {field: _policy_codes(path, name, field, fields[field]) for field in POLICY_FIELDS if field in fields}
+        policies.append((_policy_parts(path, name), name, codes))
+
+    root = PolicyNode(error_numbers)
+    seen_parts = {}
+    # The policies of the ancestors of a directory are resolved before its own policy, which starts from theirs.
+    for parts, name, codes in sorted(policies, key=lambda policy: len(policy[0])):
+        if parts in seen_parts:
+            raise ValueError(f"Policies {seen_parts[parts]} and {name} in {path} are of the same path")
+        seen_parts[parts] = name
+        parent = root
+        for part in parts[:-1]:
+            child = parent.children.get(part)
+            if child is None:
+                child = parent.children[part] = PolicyNode(parent.error_numbers)
+            parent = child
+
+        node_error_numbers = parent.error_numbers
+        if "select" in codes:
+            node_error_numbers = _matching_error_numbers(error_numbers, codes["select"])
+        if "ignore" in codes:
+            node_error_numbers -= _matching_error_numbers(error_numbers, codes["ignore"])
+        # The deeper policies are compiled later, so the node of a policy has no children yet.
+        if parts:
+            parent.children[parts[-1]] = PolicyNode(node_error_numbers)
+        else:
+            root = PolicyNode(node_error_numbers)
+    return PolicyTrie(os.path.dirname(path), root, hashlib.sha256(content).hexdigest())
+
+
+def load_policy_file(path: str, error_numbers: FrozenSet[int]) -> PolicyTrie:
+    """
+    Compile the policies of the given file into a trie.
+
+    Each policy is a TOML table or an INI section named by a directory or file, relative to the directory of the
+    policy file ("." for that directory itself), with the optional fields:
+    - select: the SIX codes, or prefixes of them, of the checkers that run on the files under it - instead of the
+      checkers of the policy of its parent directory.
+    - ignore: the SIX codes, or prefixes of them, of the checkers that do not run on the files under it.
+    The file is compiled once for each modification, so repeated loads - like those of flake8 -j workers - reuse it.
+
+    Args:
+        path (str): The path of the policy file.
+        error_numbers (FrozenSet[int]): The error numbers of the checkers that the policies choose from.
+
+    Returns:
+        PolicyTrie: The compiled policies.
+
+    Raises:
+        ValueError: If the file has an invalid policy.
+    """
+    path = os.path.realpath(path)
+    stat = os.stat(path)
+    with POLICY_FILES_LOCK:
+        return _compile_policy_file(path, stat.st_mtime_ns, stat.st_size, frozenset(error_numbers))
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+import re
+from typing import Dict, Iterable, Iterator, NamedTuple, Tuple
+
+from flake8_six_compatablity_plugin.flake8_errors_info import Flake8ASTErrorInfo, SIXErrorInfo
+
+# A profile like "relaxed=SXR: SIX001, SIX015". Profiles are separated by new lines or semicolons.
+PROFILE_PATTERN = re.compile(r"(?P<name>[A-Za-z_][\w-]*)\s*=\s*(?P<prefix>[A-Z]+)\s*:(?P<codes>.*)", re.DOTALL)
+PROFILE_SEPARATOR_PATTERN = re.compile(r"[;\n]")
+CODES_SEPARATOR_PATTERN = re.compile(r"[,\s]+")
+# flake8 selects and ignores only codes that start with one to three letters.
+PREFIX_PATTERN = re.compile(r"[A-Z]{1,3}")
+SIX_CODE_PATTERN = re.compile(rf"{SIXErrorInfo.error_prefix}\d*")
+
+# The prefixes of the profiles that report each error number.
+ProfileRoutes = Dict[int, Tuple[str, ...]]
+
+
+class PolicyProfile(NamedTuple):
+    """
+    A named subset of the SIX checkers, whose errors are reported with a code prefix of its own.
+    """
+
+    name: str
+    prefix: str
+    # The SIX codes of the checkers the profile enables, or prefixes of them like SIX01.
+    codes: Tuple[str, ...]
+
+    def enables(self, error_number: int) -> bool:
+        return f"{SIXErrorInfo.error_prefix}{error_number:03}".startswith(self.codes)
+
+    def code(self, error_number: int) -> str:
+        """
+        Returns:
+            str: The code the profile reports the errors of the given error number with, like SXR001.
+        """
+        return f"{self.prefix}{error_number:03}"
+
+
+def parse_policy_profiles(value: str) -> Tuple[PolicyProfile, ...]:
+    """
+    Args:
+        value (str): Profiles like "strict=SIX: SIX; relaxed=SXR: SIX001, SIX015, SIX016", separated by new lines or
+            semicolons.
+
+    Returns:
+        Tuple[PolicyProfile, ...]: The profiles, in the given order.
+
+    Raises:
+        ValueError: If a profile is invalid, or two profiles have the same name or prefix.
+    """
+    profiles = []
+    for item in PROFILE_SEPARATOR_PATTERN.split(value or ""):
+        if not item.strip():
+            continue
+        match = PROFILE_PATTERN.fullmatch(item.strip())
+        if match is None:
+            raise ValueError(f"Invalid policy profile {item.strip()!r}: profiles must look like NAME=PREFIX: CODES")
+        name, prefix = match.group("name"), match.group("prefix")
+        codes = tuple(code for code in CODES_SEPARATOR_PATTERN.split(match.group("codes")) if code)
+        if not PREFIX_PATTERN.fullmatch(prefix):
+            raise ValueError(f"Invalid prefix {prefix} of policy profile {name}: prefixes must be 1 to 3 letters")
+        invalid_codes = [code for code in codes if not SIX_CODE_PATTERN.fullmatch(code)]
+        if not codes or invalid_codes:
+            raise ValueError(
+                f"Invalid codes of policy profile {name}: {', '.join(invalid_codes) or 'no codes'} - each profile "
+                f"enables {SIXErrorInfo.error_prefix} codes, or prefixes of them"
+            )
+        for profile in profiles:
+            if name == profile.name or prefix == profile.prefix:
+                raise ValueError(f"Policy profiles {profile.name} and {name} have the same name or prefix")
+        profiles.append(PolicyProfile(name, prefix, codes))
+    return tuple(profiles)
+
+
+def route_errors(errors: Iterable[SIXErrorInfo], routes: ProfileRoutes) -> Iterator[Flake8ASTErrorInfo]:
+    """
+    Report each error once for every profile that enables it, with the code prefix of the profile.
+
+    Args:
+        errors (Iterable[SIXErrorInfo]): The errors of a single walk over the checkers of all of the profiles.
+        routes (ProfileRoutes): The prefixes of the profiles that report each error number.
+
+    Yields:
+        Flake8ASTErrorInfo: The errors of each profile.
+    """
+    prefix_length = len(SIXErrorInfo.error_prefix)
+    for error in errors:
+        for prefix in routes.get(error.flake_cls.error_number, ()):
+            yield Flake8ASTErrorInfo(error.line_number, error.offset, prefix + error.msg[prefix_length:], error.flake_cls)
@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+import ast
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from flake8_six_compatablity_plugin.result_cache import atomic_write_json
+
+SUMMARY_FILE_SUFFIX = ".json"
+# Changed whenever the format of the summaries changes, so summaries stored in an older format are not read.
+SUMMARY_FORMAT_VERSION = 1
+# The summaries of all of the modules of the last build, read by the flake8 -j workers that are not forked.
+INDEX_FILE_NAME = "index.json"
+PACKAGE_FILE_NAME = "__init__.py"
+METACLASS_NAME = "__metaclass__"
+# The number of files each worker summarizes at once, and below which the files are summarized without workers.
+SUMMARY_CHUNK_SIZE = 64
+# The statements whose bodies are still at the level of the statement they are in, like a module level try.
+NESTED_BODY_TYPES = tuple(
+    getattr(ast, type_name) for type_name in ("If", "Try", "TryStar", "With", "AsyncWith") if hasattr(ast, type_name)
+)
+NESTED_BODY_FIELDS = ("body", "orelse", "finalbody", "handlers")
+
+# The summary of a module: the names bound by its imports, as [level, module, attribute], and a record of each class.
+ModuleSummary = dict
+# A class record: [qualified name, line number, offset, bases, special names, has a metaclass keyword]. Each base is
+# its dotted name, or None for a base that is not a name, like a call.
+ClassRecord = list
+# The position of a class in its file: (line number, offset).
+ClassPosition = Tuple[int, int]
+
+
+class ClassFacts(NamedTuple):
+    """
+    The facts of a class that depend on the classes it inherits from.
+    """
+
+    # True if the class is an old-style class in python2 - all of its bases are old-style classes of the project.
+    old_style: bool
+    # The special names - like __div__ - that the class inherits from the classes of the project, sorted.
+    inherited_names: Tuple[str, ...]
+
+
+def _level_statements(body: Sequence[ast.stmt]) -> Iterator[ast.stmt]:
+    """
+    Args:
+        body (Sequence[ast.stmt]): The statements of a module or class body.
+
+    Yields:
+        ast.stmt: The statements of the body, including the statements nested in its if, try and with statements.
+    """
+    for statement in body:
+        if isinstance(statement, NESTED_BODY_TYPES) or isinstance(statement, ast.ExceptHandler):
+            for field in NESTED_BODY_FIELDS:
+                yield from _level_statements(getattr(statement, field, ()))
+        else:
+            yield statement
+
+
+def _dotted_name(node: ast.expr) -> Optional[str]:
+    attributes = []
+    while isinstance(node, ast.Attribute):
+        attributes.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    attributes.append(node.id)
+    return ".".join(reversed(attributes))
+
+
+def _special_names(body: Sequence[ast.stmt]) -> List[str]:
+    """
+    Args:
+        body (Sequence[ast.stmt]): The statements of a class body.
+
+    Returns:
+        List[str]: The special names - like __div__ or __metaclass__ - that the class body defines or assigns.
+    """
+    names = set()
+    for statement in _level_statements(body):
+        if isinstance(statement, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            names.add(statement.name)
+        elif isinstance(statement, ast.Assign):
+            names.update(target.id for target in statement.targets if isinstance(target, ast.Name))
+        elif isinstance(statement, ast.AnnAssign) and isinstance(statement.target, ast.Name):
+            names.add(statement.target.id)
+    return sorted(name for name in names if name.startswith("__") and name.endswith("__"))
+
+
+def module_summary(tree: ast.Module) -> ModuleSummary:
+    """
+    Summarize the module level imports and the classes of the given tree. Only the classes defined at the module
+    level, or in the body of such a class, are summarized.
+
+    Args:
+        tree (ast.Module): The tree of a module.
+
+    Returns:
+        ModuleSummary: The json serializable summary of the module.
+    """
+    imports = {}
+    classes = []
+    for statement in _level_statements(tree.body):
+        if isinstance(statement, ast.Import):
+            for alias in statement.names:
+                if alias.asname is None:
+                    name = alias.name.partition(".")[0]
+                    imports[name] = [0, name, None]
+                else:
+                    imports[alias.asname] = [0, alias.name, None]
+        elif isinstance(statement, ast.ImportFrom):
+            for alias in statement.names:
+                if alias.name != "*":
+                    imports[alias.asname or alias.name] = [statement.level, statement.module or "", alias.name]
+
+    class_definitions = [
+        (statement, statement.name)
+        for statement in _level_statements(tree.body)
+        if isinstance(statement, ast.ClassDef)
+    ]
+    while class_definitions:
+        statement, qualified_name = class_definitions.pop()
+        classes.append(
+            [
+                qualified_name,
+                statement.lineno,
+                statement.col_offset,
+                [_dotted_name(base) for base in statement.bases],
+                _special_names(statement.body),
+                any(keyword.arg == "metaclass" for keyword in statement.keywords),
+            ]
+        )
+        class_definitions.extend(
+            (child, f"{qualified_name}.{child.name}")
+            for child in _level_statements(statement.body)
+            if isinstance(child, ast.ClassDef)
+        )
+
+    return {
+        "imports": imports,
+        "classes": classes,
+        "metaclass": METACLASS_NAME in _special_names(tree.body),
+    }
+
+
+def summarize_source(source: bytes) -> ModuleSummary:
+    """
+    Args:
+        source (bytes): The source of a module.
+
+    Returns:
+        ModuleSummary: The summary of the module. A module that can not be parsed has no imports and classes.
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return {"imports": {}, "classes": [], "metaclass": False}
+    return module_summary(tree)
+
+
+def _summarize_chunk(paths: List[str]) -> List[ModuleSummary]:
+    summaries = []
+    for path in paths:
+        with open(path, "rb") as source_file:
+            summaries.append(summarize_source(source_file.read()))
+    return summaries
+
+
+def summarize_files(paths: Sequence[str], jobs: int = 1) -> Iterator[ModuleSummary]:
+    """
+    Summarize the given files, in a process pool when more than one job is used.
+
+    Args:
+        paths (Sequence[str]): The python files to summarize.
+        jobs (int): The number of worker processes.
+
+    Yields:
+        ModuleSummary: The summary of each file, in the order of the given paths.
+    """
+    chunks = [paths[index : index + SUMMARY_CHUNK_SIZE] for index in range(0, len(paths), SUMMARY_CHUNK_SIZE)]
+    if jobs <= 1 or len(chunks) <= 1:
+        for chunk in chunks:
+            yield from _summarize_chunk(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        for summaries in executor.map(_summarize_chunk, chunks):
+            yield from summaries
+
+
+def module_name(root: str, path: str) -> str:
+    """
+    Args:
+        root (str): The root directory of the project.
+        path (str): The path of a python file in the project.
+
+    Returns:
+        str: The name the module of the file is imported by, from the root.
+    """
+    relative_path = os.path.splitext(os.path.relpath(path, root))[0]
+    parts = relative_path.split(os.sep)
+    if parts[-1] == os.path.splitext(PACKAGE_FILE_NAME)[0]:
+        parts.pop()
+    return ".".join(parts)
+
+
+class ProjectIndex:
+    """
+    The summaries of the classes of every module of a project, and the hierarchies resolved from them.
+
+    The summary of each file - its module level imports, and the bases and special names of each of its classes - is
+    stored in the index directory by the hash of the file, so building the index again only summarizes the files that
+    changed since. The base names are resolved through the imports of the module they are in, and through the imports
+    of the modules they are imported from, so a class that a package re-exports is resolved as well.
+    A base that is not a class of the project - like object, a class of another package, or a call - is assumed to be
+    a new-style class with no special names, so only what is known about the project is reported.
+    """
+
+    def __init__(self, root: str, modules: Dict[str, Tuple[str, ModuleSummary]]):
+        """
+        Args:
+            root (str): The root directory of the project.
+            modules (Dict[str, Tuple[str, ModuleSummary]]): The path and summary of each module, by its name.
+        """
+        self.root = root
+        self._modules = modules
+        self._module_names = {os.path.normcase(path): name for name, (path, _) in modules.items()}
+        self._classes: Dict[Tuple[str, str], ClassRecord] = {
+            (name, record[0]): record for name, (_, summary) in modules.items() for record in summary["classes"]
+        }
+        self._hierarchies: Dict[str, Dict[ClassPosition, ClassFacts]] = {}
+
+    @classmethod
+    def build(cls, root: str, directory: str, paths: Sequence[str], jobs: int = 1) -> "ProjectIndex":
+        """
+        Summarize the given files, in a process pool when more than one job is used, and store the index.
+
+        Args:
+            root (str): The root directory of the project.
+            directory (str): The directory the summaries are stored in.
+            paths (Sequence[str]): The python files of the project.
+            jobs (int): The number of worker processes.
+
+        Returns:
+            ProjectIndex: The index of the given files.
+        """
+        os.makedirs(directory, exist_ok=True)
+        root = os.path.abspath(root)
+        summaries: Dict[str, ModuleSummary] = {}
+        summary_paths: Dict[str, str] = {}
+        missing_paths: List[str] = []
+        for path in paths:
+            path = os.path.abspath(path)
+            try:
+                with open(path, "rb") as source_file:
+                    source_hash = hashlib.sha256(f"{SUMMARY_FORMAT_VERSION}\0".encode())
+                    source_hash.update(source_file.read())
+            except OSError:
+                continue
+            summary_path = os.path.join(directory, source_hash.hexdigest() + SUMMARY_FILE_SUFFIX)
+            summary_paths[path] = summary_path
+            try:
+                with open(summary_path, encoding="utf-8") as summary_file:
+                    summaries[path] = json.load(summary_file)
+            except (OSError, ValueError):
+                missing_paths.append(path)
+
+        for path, summary in zip(missing_paths, summarize_files(missing_paths, jobs)):
+            summaries[path] = summary
+            atomic_write_json(summary_paths[path], summary)
+
+        modules = {module_name(root, path): (path, summary) for path, summary in summaries.items()}
+        atomic_write_json(os.path.join(directory, INDEX_FILE_NAME), {"root": root, "modules": modules})
+        return cls(root, modules)
+
+    @classmethod
+    def load(cls, directory: str) -> "ProjectIndex":
+        """
+        Args:
+            directory (str): The directory of an index that was built.
+
+        Returns:
+            ProjectIndex: The index of the last build in the directory.
+        """
+        with open(os.path.join(directory, INDEX_FILE_NAME), encoding="utf-8") as index_file:
+            data = json.load(index_file)
+        return cls(data["root"], {name: tuple(module) for name, module in data["modules"].items()})
+
+    def _qualified_name(self, module: str, dotted_name: str) -> Optional[str]:
+        """
+        Args:
+            module (str): The name of the module the dotted name is used in.
+            dotted_name (str): A module level dotted name, like a base of a class.
+
+        Returns:
+            Optional[str]: The qualified name the dotted name refers to, or None if it is not defined or imported by
+                the module, like a builtin.
+        """
+        name, _, attributes = dotted_name.partition(".")
+        path, summary = self._modules[module]
+        if (module, name) in self._classes:
+            return f"{module}.{dotted_name}"
+        imported = summary["imports"].get(name)
+        if imported is None:
+            return None
+
+        level, imported_module, imported_attribute = imported
+        if level:
+            package_parts = module.split(".") if os.path.basename(path) == PACKAGE_FILE_NAME else module.split(".")[:-1]
+            package_parts = package_parts[: len(package_parts) - (level - 1)]
+            imported_module = ".".join(package_parts + ([imported_module] if imported_module else []))
+        return ".".join(part for part in (imported_module, imported_attribute, attributes) if part)
+
+    def _find_class(self, qualified_name: str, seen: Set[str]) -> Optional[Tuple[str, ClassRecord]]:
+        """
+        Args:
+            qualified_name (str): The qualified name of a class, like package.module.Class.
+            seen (Set[str]): The qualified names that were already looked up, to stop import cycles.
+
+        Returns:
+            Optional[Tuple[str, ClassRecord]]: The module and record of the class, or None if it is not a class of
+                the project.
+        """
+        if qualified_name in seen:
+            return None
+        seen.add(qualified_name)
+
+        parts = qualified_name.split(".")
+        for index in range(len(parts) - 1, 0, -1):
+            module = ".".join(parts[:index])
+            if module not in self._modules:
+                continue
+            class_name = ".".join(parts[index:])
+            record = self._classes.get((module, class_name))
+            if record is not None:
+                return module, record
+            # The class may be imported by the module, like a class a package re-exports.
+            re_exported_name = self._qualified_name(module, class_name)
+            if re_exported_name is None:
+                return None
+            return self._find_class(re_exported_name, seen)
+        return None
+
+    def _base_classes(self, module: str, record: ClassRecord) -> List[Optional[Tuple[str, ClassRecord]]]:
+        """
+        Returns:
+            List[Optional[Tuple[str, ClassRecord]]]: The module and record of each base of the class, or None for a
+                base that is not a class of the project.
+        """
+        base_classes = []
+        for base in record[3]:
+            qualified_name = None if base is None else self._qualified_name(module, base)
+            base_classes.append(None if qualified_name is None else self._find_class(qualified_name, set()))
+        return base_classes
+
+    def _is_old_style(self, module: str, record: ClassRecord, seen: Set[Tuple[str, str]]) -> bool:
+        key = (module, record[0])
+        if key in seen:
+            return False
+        seen.add(key)
+
+        if record[5] or METACLASS_NAME in record[4] or self._modules[module][1]["metaclass"]:
+            return False
+        return all(
+            base_class is not None and self._is_old_style(*base_class, seen)
+            for base_class in self._base_classes(module, record)
+        )
+
+    def _inherited_names(self, module: str, record: ClassRecord) -> Tuple[str, ...]:
+        names = set()
+        seen = {(module, record[0])}
+        base_classes = self._base_classes(module, record)
+        while base_classes:
+            base_class = base_classes.pop()
+            if base_class is None or (base_class[0], base_class[1][0]) in seen:
+                continue
+            seen.add((base_class[0], base_class[1][0]))
+            names.update(base_class[1][4])
+            base_classes.extend(self._base_classes(*base_class))
+        return tuple(sorted(names))
+
+    def hierarchy(self, filename: str) -> Optional[Dict[ClassPosition, ClassFacts]]:
+        """
+        Args:
+            filename (str): The path of a checked file.
+
+        Returns:
+            Optional[Dict[ClassPosition, ClassFacts]]: The facts of each class of the file that is summarized by the
+                index, by its position, or None if the file is not a part of the project.
+        """
+        module = self._module_names.get(os.path.normcase(os.path.abspath(filename)))
+        if module is None:
+            return None
+        hierarchy = self._hierarchies.get(module)
+        if hierarchy is None:
+            hierarchy = self._hierarchies[module] = {
+                (record[1], record[2]): ClassFacts(
+                    self._is_old_style(module, record, set()) and bool(record[3]),
+                    self._inherited_names(module, record),
+                )
+                for record in self._modules[module][1]["classes"]
+            }
+        return hierarchy
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+import inspect
+import json
+import os
+import pathlib
+import re
+import urllib.parse
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+from flake8.formatting.base import BaseFormatter
+from flake8.violation import Violation
+
+from flake8_six_compatablity_plugin.flake8_errors_info import SIXErrorInfo
+from flake8_six_compatablity_plugin.flake8_plugin import SixCompatibilityPlugin
+from flake8_six_compatablity_plugin.policy_profiles import PolicyProfile
+from flake8_six_compatablity_plugin.six_checkers.checker_loader import ALL_ERROR_NUMBERS, load_checkers
+from flake8_six_compatablity_plugin.six_checkers.six_checker import SixChecker
+
+SARIF_VERSION = "2.1.0"
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+TOOL_INFORMATION_URI = "https://github.com/ShakedAp/flake8_six_plugin"
+# The level of every result - flake8 has no severities.
+SARIF_LEVEL = "error"
+# Splits a message like "SIX001 all open calls must ..." into its code and text.
+MESSAGE_PATTERN = re.compile(r"([A-Z]+[0-9]+) ?(.*)", re.DOTALL)
+
+# flake8 reports the errors with a one based column.
+ERROR_FORMAT = "{path}:{line_number}:{column}: {msg}"
+# The format of the path:line:column: lines, rather than a report.
+DEFAULT_FORMAT = "default"
+
+# Writes a single line of the report, without its line break.
+WriteLine = Callable[[str], None]
+
+
+def split_message(msg: str) -> Tuple[str, str]:
+    """
+    Args:
+        msg (str): A reported message, starting with its code.
+
+    Returns:
+        Tuple[str, str]: The code and the text of the message.
+    """
+    match = MESSAGE_PATTERN.fullmatch(msg)
+    return (match.group(1), match.group(2)) if match else ("", msg)
+
+
+def _artifact_uri(path: str) -> str:
+    """
+    Args:
+        path (str): The path of a checked file.
+
+    Returns:
+        str: A relative URI of the path, or a file URI if the path is absolute.
+    """
+    if os.path.isabs(path):
+        return pathlib.Path(path).as_uri()
+    return urllib.parse.quote(os.path.normpath(path).replace(os.sep, "/"))
+
+
+def _rule_descriptor(checker: SixChecker, profile: Optional[PolicyProfile] = None) -> dict:
+    code = f"{SIXErrorInfo.error_prefix}{checker.error_number:03}" if profile is None else profile.code(
+        checker.error_number
+    )
+    # The checkers of rule files have no docstring of their own, only the one of their checker family.
+    docstring = checker.__dict__.get("__doc__")
+    properties = {"errorNumber": checker.error_number}
+    if profile is not None:
+        properties["policyProfile"] = profile.name
+    return {
+        "id": code,
+        "name": checker.__name__,
+        "shortDescription": {"text": checker.error_message},
+        "fullDescription": {"text": inspect.cleandoc(docstring) if docstring else checker.error_message},
+        "defaultConfiguration": {"level": SARIF_LEVEL},
+        "properties": properties,
+    }
+
+
+def sarif_rules(rule_checkers: Iterable[SixChecker] = (), profiles: Sequence[PolicyProfile] = ()) -> List[dict]:
+    """
+    Args:
+        rule_checkers (Iterable[SixChecker]): The checkers of a rule file, to describe along with all of the checkers.
+        profiles (Sequence[PolicyProfile]): The policy profiles the errors are reported with, if any.
+
+    Returns:
+        List[dict]: The SARIF reporting descriptor of each checker, sorted by error number - or of each checker of
+            each profile, under the code of the profile.
+    """
+    checkers = load_checkers(ALL_ERROR_NUMBERS) | frozenset(rule_checkers)
+    checkers = sorted(checkers, key=lambda checker: checker.error_number)
+    if not profiles:
+        return [_rule_descriptor(checker) for checker in checkers]
+    return [
+        _rule_descriptor(checker, profile)
+        for profile in profiles
+        for checker in checkers
+        if profile.enables(checker.error_number)
+    ]
+
+
+class JsonLinesReport:
+    """
+    Writes each error as a JSON object on its own line, as soon as it is reported.
+    """
+
+    def __init__(self, write_line: WriteLine):
+        """
+        Args:
+            write_line (WriteLine): Writes a single line of the report.
+        """
+        self._write_line = write_line
+
+    def start(self) -> None:
+        pass
+
+    def add(self, path: str, line_number: int, column: int, code: str, text: str) -> None:
+        """
+        Args:
+            path (str): The path of the file.
+            line_number (int): The line number of the error.
+            column (int): The one based column of the error.
+            code (str): The code of the error.
+            text (str): The message of the error, without its code.
+        """
+        self._write_line(
+            json.dumps({"path": path, "line": line_number, "column": column, "code": code, "message": text})
+        )
+
+    def finish(self) -> None:
+        pass
+
+
+class SarifReport:
+    """
+    Writes a SARIF log of a single run, with a result for each error.
+
+    The rule table is written first, so each result is written as soon as it is reported, and only the position in
+    the results array is kept - the memory does not grow with the number of errors, and the results can be reported
+    in any order, like the files checked by parallel workers.
+    """
+
+    def __init__(
+        self,
+        write_line: WriteLine,
+        rule_checkers: Iterable[SixChecker] = (),
+        profiles: Sequence[PolicyProfile] = (),
+    ):
+        """
+        Args:
+            write_line (WriteLine): Writes a single line of the report.
+            rule_checkers (Iterable[SixChecker]): The checkers of a rule file, to describe along with all of the
+                checkers.
+            profiles (Sequence[PolicyProfile]): The policy profiles the errors are reported with, if any.
+        """
+        self._write_line = write_line
+        self._rules = sarif_rules(rule_checkers, profiles)
+        self._rule_indexes = {rule["id"]: index for index, rule in enumerate(self._rules)}
+        self._results_count = 0
+
+    def start(self) -> None:
+        driver = {
+            "name": SixCompatibilityPlugin.name,
+            "version": SixCompatibilityPlugin.version,
+            "informationUri": TOOL_INFORMATION_URI,
+            "rules": self._rules,
+        }
+        header = json.dumps({"$schema": SARIF_SCHEMA, "version": SARIF_VERSION})
+        run = json.dumps({"tool": {"driver": driver}})
+        # The results array is left open, and closed by finish.
+        self._write_line(f'{header[:-1]}, "runs": [{run[:-1]}, "results": [')
+
+    def add(self, path: str, line_number: int, column: int, code: str, text: str) -> None:
+        """
+        Args:
+            path (str): The path of the file.
+            line_number (int): The line number of the error.
+            column (int): The one based column of the error.
+            code (str): The code of the error.
+            text (str): The message of the error, without its code.
+        """
+        result = {"ruleId": code}
+        rule_index = self._rule_indexes.get(code)
+        if rule_index is not None:
+            result["ruleIndex"] = rule_index
+        result.update(
+            level=SARIF_LEVEL,
+            message={"text": text},
+            locations=[
+                {
+                    "physicalLocation": {
+                        "artifactLocation": {"uri": _artifact_uri(path)},
+                        "region": {"startLine": max(line_number, 1), "startColumn": max(column, 1)},
+                    }
+                }
+            ],
+        )
+        self._write_line(("," if self._results_count else "") + json.dumps(result))
+        self._results_count += 1
+
+    def finish(self) -> None:
+        self._write_line("]}]}")
+
+
+REPORT_FORMATS = ("sarif", "jsonl")
+
+
+def create_report(
+    name: str,
+    write_line: WriteLine,
+    rule_checkers: Iterable[SixChecker] = (),
+    profiles: Sequence[PolicyProfile] = (),
+):
+    """
+    Args:
+        name (str): The name of the report format, out of REPORT_FORMATS.
+        write_line (WriteLine): Writes a single line of the report.
+        rule_checkers (Iterable[SixChecker]): The checkers of a rule file, to describe along with all of the checkers.
+        profiles (Sequence[PolicyProfile]): The policy profiles the errors are reported with, if any.
+
+    Returns:
+        The report, which is started before the first error is added, and finished after the last one.
+    """
+    if name == "sarif":
+        return SarifReport(write_line, rule_checkers, profiles)
+    return JsonLinesReport(write_line)
+
+
+class _StreamingFormatter(BaseFormatter):
+    """
+    A flake8 formatter that writes each error to the report as flake8 reports it, instead of formatting it as a line.
+    """
+
+    report_name: str = None
+
+    def after_init(self) -> None:
+        self._report = None
+
+    def start(self) -> None:
+        super().start()
+        # The options of the plugin - like its rule file - are parsed before the formatter is started.
+        self._report = create_report(
+            self.report_name,
+            self._write,
+            SixCompatibilityPlugin.rule_set.checkers,
+            SixCompatibilityPlugin.policy_profiles,
+        )
+        self._report.start()
+
+    def handle(self, error: Violation) -> None:
+        code, text = error.code, error.text
+        if not code:
+            code, text = split_message(text)
+        self._report.add(error.filename, error.line_number, error.column_number, code, text)
+
+    def format(self, error: Violation) -> Optional[str]:
+        return None
+
+    def show_statistics(self, statistics) -> None:
+        # The statistics and benchmarks would not be valid lines of the report.
+        pass
+
+    def show_benchmarks(self, benchmarks) -> None:
+        pass
+
+    def stop(self) -> None:
+        if self._report is not None:
+            self._report.finish()
+            self._report = None
+        super().stop()
+
+
+class SarifFormatter(_StreamingFormatter):
+    """
+    flake8 --format=six-sarif - a SARIF log with the rule table of the SIX checkers.
+    """
+
+    report_name = "sarif"
+
+
+class JsonLinesFormatter(_StreamingFormatter):
+    """
+    flake8 --format=six-jsonl - a JSON object for each error, on its own line.
+    """
+
+    report_name = "jsonl"
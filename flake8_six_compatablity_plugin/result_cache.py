@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+import glob
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+from typing import Iterable, Optional
+
+from flake8_six_compatablity_plugin.six_checkers.checker_loader import MANIFEST_ENTRIES
+from flake8_six_compatablity_plugin.six_checkers.rule_file import EMPTY_RULE_SET, RuleSet
+from flake8_six_compatablity_plugin.six_checkers.six_error_buffer import SixErrorBuffer
+
+CACHE_ENTRY_SUFFIX = ".json"
+DEFAULT_CACHE_MAX_SIZE = 256 * 1024 * 1024
+# The cache size is only measured every few writes, since it requires listing the whole cache directory.
+EVICTION_CHECK_INTERVAL = 64
+# When the cache is too big, evict entries until it is under this fraction of the max size.
+EVICTION_TARGET_RATIO = 0.9
+# The hits and misses of each process of a run are written to its own file, in a directory of the cache directory that
+# is named by the main process of the run, since flake8 -j workers can exit without running any cleanup.
+STATISTICS_DIRECTORY_FORMAT = "statistics-{}"
+STATISTICS_PART_FORMAT = "{}.json"
+
+
+def checkers_signature(rule_set: RuleSet = EMPTY_RULE_SET) -> str:
+    """
+    Args:
+        rule_set (RuleSet): The checkers of the rule file, if one is used.
+
+    Returns:
+        str: A signature of the error number each checker was assigned, and the error message it reports, followed
+            by the signature of the rule file.
+    """
+    signatures = [
+        f"{error_number}:{entry.class_name}:{entry.error_message}"
+        for error_number, entry in sorted(MANIFEST_ENTRIES.items())
+    ]
+    if rule_set.signature:
+        signatures.append(rule_set.signature)
+    return ";".join(signatures)
+
+
+def atomic_write_json(path: str, data) -> bool:
+    """
+    Write the given data as json to the given path, through a temporary file in the same directory that is renamed
+    over the path, so readers in other processes never see a partially written file.
+
+    Args:
+        path (str): The path to write to.
+        data: The json serializable data to write.
+
+    Returns:
+        bool: True if the data was written, False otherwise.
+    """
+    file_descriptor, temporary_path = tempfile.mkstemp(
+        dir=os.path.dirname(path), suffix=".tmp"
+    )
+    try:
+        with os.fdopen(file_descriptor, "w", encoding="utf-8") as temporary_file:
+            json.dump(data, temporary_file, separators=(",", ":"))
+        os.replace(temporary_path, path)
+    except OSError:
+        try:
+            os.unlink(temporary_path)
+        except OSError:
+            pass
+        return False
+    return True
+
+
+class SixResultCache:
+    """
+    A persistent, content addressed cache of the errors found in each source.
+
+    Each entry is keyed by the hash of the source, salted with the plugin version, the error numbers assigned to the
+    checkers, the rule file and the enabled codes - so a change to any of them never replays stale errors.
+    Entries are written atomically (written to a temporary file and then renamed), so several processes can share
+    the same cache directory. Reading an entry updates its modification time, which is used to evict the least
+    recently used entries when the cache grows beyond max_size bytes.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        version: str,
+        enabled_codes: Iterable[str] = (),
+        max_size: int = DEFAULT_CACHE_MAX_SIZE,
+        rule_set: RuleSet = EMPTY_RULE_SET,
+    ):
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.statistics_directory: Optional[str] = None
+        self._writes = 0
+        self._error_numbers = frozenset(MANIFEST_ENTRIES).union(
+            checker.error_number for checker in rule_set.checkers
+        )
+        self._salt = "\0".join(
+            (version, checkers_signature(rule_set), ",".join(sorted(enabled_codes)))
+        ).encode()
+
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, source: str, context: str = "") -> str:
+        """
+        Args:
+            source (str): The source to get the key of.
+            context (str): Anything else the errors of the source depend on, like the classes it inherits from.
+
+        Returns:
+            str: The key of the cache entry of the given source.
+        """
+        source_hash = hashlib.sha256(self._salt)
+        source_hash.update(source.encode("utf-8", "surrogatepass"))
+        if context:
+            source_hash.update(b"\0" + context.encode("utf-8", "surrogatepass"))
+        return source_hash.hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, key + CACHE_ENTRY_SUFFIX)
+
+    def get(self, key: str) -> Optional[SixErrorBuffer]:
+        """
+        Get the errors cached under the given key, and mark the entry as recently used.
+
+        Args:
+            key (str): The key of the entry.
+
+        Returns:
+            Optional[SixErrorBuffer]: The cached errors, or None if the key is not cached.
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, encoding="utf-8") as entry:
+                records = json.load(entry)
+            os.utime(path)
+        except (OSError, ValueError):
+            # A missing, evicted or corrupted entry is just a miss.
+            self._count(hit=False)
+            return None
+
+        errors = SixErrorBuffer()
+        for line_number, offset, error_number in records:
+            if error_number not in self._error_numbers:
+                self._count(hit=False)
+                return None
+            errors.add(line_number, offset, error_number)
+
+        self._count(hit=True)
+        return errors
+
+    def _count(self, hit: bool) -> None:
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        if self.statistics_directory is not None:
+            part_path = os.path.join(self.statistics_directory, STATISTICS_PART_FORMAT.format(os.getpid()))
+            with open(part_path, "w", encoding="utf-8") as part:
+                json.dump([self.hits, self.misses], part)
+
+    def enable_statistics(self, main_process_id: int) -> None:
+        """
+        Record the hits and misses of the current process, for the summary of the run of the given main process.
+
+        Args:
+            main_process_id (int): The id of the main process of the run - the current process, or the flake8
+                process of a -j worker.
+        """
+        self.statistics_directory = os.path.join(self.directory, STATISTICS_DIRECTORY_FORMAT.format(main_process_id))
+
+    def reset_statistics(self) -> None:
+        """
+        Remove the statistics of a previous run of the same process id. Must be called only by the main process,
+        after enable_statistics and before checking files.
+        """
+        shutil.rmtree(self.statistics_directory, ignore_errors=True)
+        os.makedirs(self.statistics_directory, exist_ok=True)
+
+    def write_statistics(self) -> None:
+        """
+        Print the hits and misses of all the processes of the run to stderr, and remove their statistics.
+        """
+        hits = misses = 0
+        for part_path in glob.glob(os.path.join(self.statistics_directory, STATISTICS_PART_FORMAT.format("*"))):
+            try:
+                with open(part_path, encoding="utf-8") as part:
+                    part_hits, part_misses = json.load(part)
+            except (OSError, ValueError):
+                continue
+            hits += part_hits
+            misses += part_misses
+        shutil.rmtree(self.statistics_directory, ignore_errors=True)
+
+        lookups = hits + misses
+        hit_rate = hits / lookups if lookups else 0.0
+        print(f"SIX result cache: {hits} hits, {misses} misses ({hit_rate:.1%} hit rate)", file=sys.stderr)
+
+    def set(self, key: str, errors: SixErrorBuffer) -> None:
+        """
+        Atomically store the given errors under the given key.
+
+        Args:
+            key (str): The key of the entry.
+            errors (SixErrorBuffer): The errors to store.
+        """
+        if not atomic_write_json(self._entry_path(key), list(errors.records())):
+            return
+
+        self._writes += 1
+        if self._writes % EVICTION_CHECK_INTERVAL == 0:
+            self.evict()
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used entries until the cache is smaller than max_size.
+        """
+        entries = []
+        total_size = 0
+        with os.scandir(self.directory) as directory_entries:
+            for directory_entry in directory_entries:
+                if not directory_entry.name.endswith(CACHE_ENTRY_SUFFIX):
+                    continue
+                try:
+                    stat = directory_entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, directory_entry.path))
+                total_size += stat.st_size
+
+        if total_size <= self.max_size:
+            return
+
+        target_size = self.max_size * EVICTION_TARGET_RATIO
+        for _, size, path in sorted(entries):
+            if total_size <= target_size:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                # Another process already evicted it.
+                pass
+            total_size -= size
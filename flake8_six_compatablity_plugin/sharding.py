@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+import argparse
+import collections
+import hashlib
+import heapq
+import json
+import os
+import re
+import sys
+import tempfile
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from flake8_six_compatablity_plugin.reporters import (
+    DEFAULT_FORMAT,
+    ERROR_FORMAT,
+    REPORT_FORMATS,
+    create_report,
+    split_message,
+)
+from flake8_six_compatablity_plugin.six_checkers.rule_file import EMPTY_RULE_SET, load_rule_file
+
+if TYPE_CHECKING:
+    from flake8_six_compatablity_plugin.cli import FileErrors
+
+SHARD_FILE_VERSION = 2
+SHARD_PATTERN = re.compile(r"(\d+)/(\d+)")
+MERGE_ERROR_EXIT_CODE = 2
+
+
+class Shard(NamedTuple):
+    """
+    Shard index (one based) of count shards.
+    """
+
+    index: int
+    count: int
+
+
+class ShardHeader(NamedTuple):
+    """
+    The first line of a shard result file - which shard it is, and which set of files it is a shard of.
+    """
+
+    shard: Shard
+    files_digest: str
+    files_count: int
+
+
+def parse_shard(value: str) -> Shard:
+    """
+    Args:
+        value (str): A shard like "3/8".
+
+    Returns:
+        Shard: The parsed shard.
+
+    Raises:
+        argparse.ArgumentTypeError: If the value is not a valid shard.
+    """
+    match = SHARD_PATTERN.fullmatch(value.strip())
+    if not match or not 1 <= int(match.group(1)) <= int(match.group(2)):
+        raise argparse.ArgumentTypeError(f"invalid shard {value!r} - expected K/N, with 1 <= K <= N")
+    return Shard(int(match.group(1)), int(match.group(2)))
+
+
+def path_key(path: str) -> str:
+    """
+    Args:
+        path (str): The path of a file.
+
+    Returns:
+        str: The path relative to the current directory with forward slashes, so it is the same on every runner.
+            It only partitions, orders and verifies the files - they are reported by their paths as given.
+    """
+    return os.path.normpath(os.path.relpath(path)).replace(os.sep, "/")
+
+
+def _path_hash(key: str) -> bytes:
+    return hashlib.blake2b(key.encode("utf-8", "surrogateescape"), digest_size=8).digest()
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+class _FilesDigest:
+    """
+    The digest of a set of files, updated with their keys in sorted order.
+    """
+
+    def __init__(self):
+        self._hash = hashlib.sha256()
+        self.count = 0
+
+    def update(self, key: str) -> None:
+        self._hash.update(key.encode("utf-8", "surrogateescape") + b"\0")
+        self.count += 1
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+def files_digest(paths: Iterable[str]) -> str:
+    """
+    Args:
+        paths (Iterable[str]): The paths of the files.
+
+    Returns:
+        str: A digest of the set of files, that does not depend on their order.
+    """
+    digest = _FilesDigest()
+    for key in sorted(path_key(path) for path in paths):
+        digest.update(key)
+    return digest.hexdigest()
+
+
+def partition(paths: Sequence[str], count: int, size_of: Callable[[str], int] = _file_size) -> List[List[str]]:
+    """
+    Partition the given files into shards of about the same total size.
+
+    The files are assigned from the largest to the smallest, each to the shard with the smallest total size so far.
+    Files of the same size are ordered by the hash of their path, and shards of the same total size by their index,
+    so every runner that sees the same files computes the same partition - regardless of the order the files were
+    found in.
+
+    Args:
+        paths (Sequence[str]): The files to partition.
+        count (int): The number of shards.
+        size_of (Callable[[str], int]): The weight of each file.
+
+    Returns:
+        List[List[str]]: The files of each shard, sorted by their path key.
+    """
+    keyed_paths = [(path_key(path), path) for path in paths]
+    weighted = sorted(
+        ((-size_of(path), _path_hash(key), key, path) for key, path in keyed_paths),
+        key=lambda item: item[:3],
+    )
+    shards = [[] for _ in range(count)]
+    loads = [(0, index) for index in range(count)]
+    for negative_size, _, key, path in weighted:
+        load, index = heapq.heappop(loads)
+        shards[index].append((key, path))
+        heapq.heappush(loads, (load - negative_size, index))
+    return [[path for _, path in sorted(shard)] for shard in shards]
+
+
+def shard_paths(paths: Sequence[str], shard: Shard) -> List[str]:
+    """
+    Args:
+        paths (Sequence[str]): All of the files to check.
+        shard (Shard): The shard to check.
+
+    Returns:
+        List[str]: The files of the given shard, sorted by their path key.
+    """
+    return partition(paths, shard.count)[shard.index - 1]
+
+
+class ShardResultWriter:
+    """
+    Writes the errors of each file of a shard into a shard result file, as soon as the file is checked.
+
+    The file is a JSON line of the ShardHeader, followed by a JSON line of [path key, path, errors] for each file of the
+    shard, in the order of their path keys - so shards are merged without loading them. It is written to a temporary file
+    that replaces the result file when the shard is done, so an interrupted run leaves no partial shard behind.
+    """
+
+    def __init__(self, path: str, shard: Shard, all_paths: Sequence[str]):
+        """
+        Args:
+            path (str): The path of the shard result file.
+            shard (Shard): The shard that is checked.
+            all_paths (Sequence[str]): All of the files of all of the shards.
+        """
+        self.path = path
+        file_descriptor, self._temporary_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp"
+        )
+        self._file = os.fdopen(file_descriptor, "w", encoding="utf-8")
+        header = ShardHeader(shard, files_digest(all_paths), len(all_paths))
+        self._write_line({"version": SHARD_FILE_VERSION, **header._asdict()})
+
+    def _write_line(self, data) -> None:
+        self._file.write(json.dumps(data, separators=(",", ":")) + "\n")
+
+    def add(self, path: str, errors: "FileErrors") -> None:
+        """
+        Args:
+            path (str): The path of a checked file. The files must be added in the order of shard_paths.
+            errors (FileErrors): The errors of the file.
+        """
+        self._write_line([path_key(path), path, errors])
+
+    def close(self) -> None:
+        self._file.close()
+        # mkstemp creates files that only their owner can read, while the shards are usually uploaded by CI runners.
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(self._temporary_path, 0o666 & ~umask)
+        os.replace(self._temporary_path, self.path)
+
+    def discard(self) -> None:
+        self._file.close()
+        os.unlink(self._temporary_path)
+
+
+class ShardResult:
+    """
+    A shard result file that is read one file at a time.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): The path of the shard result file.
+
+        Raises:
+            ValueError: If the file is not a shard result file.
+        """
+        self.path = path
+        self._file = open(path, encoding="utf-8")
+        try:
+            header = json.loads(self._file.readline())
+            if header.get("version") != SHARD_FILE_VERSION:
+                raise ValueError(f"{path} is not a version {SHARD_FILE_VERSION} shard result file")
+            self.header = ShardHeader(Shard(*header["shard"]), header["files_digest"], header["files_count"])
+        except (ValueError, AttributeError, KeyError, TypeError) as error:
+            self._file.close()
+            raise ValueError(f"{path} is not a shard result file: {error}") from None
+
+    def files(self) -> Iterator[Tuple[str, str, "FileErrors"]]:
+        """
+        Yields:
+            Tuple[str, str, FileErrors]: The path key, path and errors of each file of the shard, in the order of the
+                path keys.
+        """
+        with self._file:
+            for line in self._file:
+                key, path, errors = json.loads(line)
+                yield key, path, [tuple(error) for error in errors]
+
+
+def merge_shard_results(results: Sequence[ShardResult]) -> Iterator[Tuple[str, "FileErrors"]]:
+    """
+    Merge the files of all of the shards of a run, in the order of their path keys.
+
+    Args:
+        results (Sequence[ShardResult]): The result of each shard.
+
+    Yields:
+        Tuple[str, FileErrors]: The path and errors of each file, as the path was given to the shard that checked it.
+
+    Raises:
+        ValueError: If the shards are not exactly all of the shards of the same set of files, or if any file is
+            missing or was checked by more than one shard. Raised after the last file is yielded, since the files are
+            verified as they are merged.
+    """
+    if not results:
+        raise ValueError("no shard result files were given")
+    header = results[0].header
+    for result in results[1:]:
+        if (result.header.shard.count, result.header.files_digest) != (header.shard.count, header.files_digest):
+            raise ValueError(f"{result.path} and {results[0].path} are shards of different runs")
+    indexes = collections.Counter(result.header.shard.index for result in results)
+    duplicate_indexes = sorted(index for index, count in indexes.items() if count > 1)
+    if duplicate_indexes:
+        raise ValueError(f"shards {duplicate_indexes} were given more than once")
+    missing_indexes = sorted(set(range(1, header.shard.count + 1)) - set(indexes))
+    if missing_indexes:
+        raise ValueError(f"shards {missing_indexes} of {header.shard.count} are missing")
+
+    digest = _FilesDigest()
+    previous_key = None
+    duplicate_keys = []
+    for key, path, errors in heapq.merge(
+        *(result.files() for result in results), key=lambda file_errors: file_errors[0]
+    ):
+        if key == previous_key:
+            duplicate_keys.append(key)
+            continue
+        digest.update(key)
+        previous_key = key
+        yield path, errors
+
+    if duplicate_keys:
+        raise ValueError(f"{len(duplicate_keys)} files were checked by more than one shard, like {duplicate_keys[0]}")
+    if (digest.count, digest.hexdigest()) != (header.files_count, header.files_digest):
+        raise ValueError(
+            f"the shards checked {digest.count} files, while the run had {header.files_count} files - some files "
+            "were missed or checked by a shard of a different file set"
+        )
+
+
+def _parse_arguments(argv: Sequence[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="six-merge",
+        description="Merge the shard result files of six-check --shard into a single sorted report.",
+    )
+    parser.add_argument("shard_files", nargs="+", help="The result file of each shard.")
+    parser.add_argument(
+        "--format",
+        choices=(DEFAULT_FORMAT, *REPORT_FORMATS),
+        default=DEFAULT_FORMAT,
+        help="The output format - path:line:column: lines, a SARIF log, or a JSON object per error. "
+        "(Default: %(default)s)",
+    )
+    parser.add_argument(
+        "--output-file",
+        default=None,
+        help="Write the errors to the given file instead of stdout.",
+    )
+    parser.add_argument(
+        "--rules-file",
+        default=None,
+        help="The rule file the shards were checked with, to describe its rules in the SARIF rule table.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    The six-merge entry point.
+
+    Returns:
+        int: 2 if the shards could not be merged, 1 if any error was found, 0 otherwise.
+    """
+    arguments = _parse_arguments(sys.argv[1:] if argv is None else argv)
+    try:
+        results = [ShardResult(path) for path in arguments.shard_files]
+        rule_set = load_rule_file(arguments.rules_file) if arguments.rules_file else EMPTY_RULE_SET
+    except (OSError, ValueError) as error:
+        print(f"six-merge: {error}", file=sys.stderr)
+        return MERGE_ERROR_EXIT_CODE
+
+    output_file = open(arguments.output_file, "w", encoding="utf-8") if arguments.output_file else sys.stdout
+    report = None
+    if arguments.format != DEFAULT_FORMAT:
+        report = create_report(arguments.format, lambda line: output_file.write(line + "\n"), rule_set.checkers)
+        report.start()
+
+    code_counts: Dict[str, int] = collections.Counter()
+    code_messages: Dict[str, str] = {}
+    files_count = 0
+    try:
+        for path, errors in merge_shard_results(results):
+            files_count += 1
+            for line_number, column, msg in errors:
+                code, text = split_message(msg)
+                code_counts[code] += 1
+                code_messages.setdefault(code, text)
+                if report is None:
+                    error_line = ERROR_FORMAT.format(path=path, line_number=line_number, column=column, msg=msg)
+                    print(error_line, file=output_file)
+                else:
+                    report.add(path, line_number, column, code, text)
+        if report is not None:
+            report.finish()
+    except ValueError as error:
+        print(f"six-merge: {error}", file=sys.stderr)
+        return MERGE_ERROR_EXIT_CODE
+    finally:
+        if output_file is not sys.stdout:
+            output_file.close()
+
+    for code in sorted(code_counts):
+        print(f"{code_counts[code]:<5} {code} {code_messages[code]}", file=sys.stderr)
+    errors_count = sum(code_counts.values())
+    print(f"{len(results)} shards, {files_count} files, {errors_count} errors", file=sys.stderr)
+    return 1 if errors_count else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
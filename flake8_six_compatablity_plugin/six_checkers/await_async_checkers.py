@@ -2,7 +2,7 @@
 import ast
 
 from flake8_six_compatablity_plugin.six_checkers.six_checker import SixChecker
-from flake8_six_compatablity_plugin.flake8_errors_info import SIXErrorInfo
+from flake8_six_compatablity_plugin.six_checkers.six_error_buffer import SixErrorBuffer
 
 
 class AsyncNotAllowedChecker(SixChecker):
@@ -14,18 +14,19 @@ class AsyncNotAllowedChecker(SixChecker):
     """
 
     error_message = "async functions are not allowed! They are not supported in python2"
+    triggers = ("async",)
 
     @classmethod
-    def check(cls, node: ast.AsyncFunctionDef, errors: list[SIXErrorInfo]) -> None:
+    def check(cls, node: ast.AsyncFunctionDef, errors: SixErrorBuffer) -> None:
         """
         Check that the given node is valid.
         If it is not valid, create the relevant error info and update errors.
 
         Args:
             node (ast.AsyncFunctionDef): The ast statement to check
-            errors (list[SIXErrorInfo]): The error to be updated with found errors.
+            errors (SixErrorBuffer): The error to be updated with found errors.
         """
-        errors.append(cls._create_six_error(node))
+        cls._add_six_error(node, errors)
 
 
 class AwaitNotAllowedChecker(SixChecker):
@@ -39,15 +40,16 @@ class AwaitNotAllowedChecker(SixChecker):
     error_message = (
         "await statements are not allowed! They are not supported in python2"
     )
+    triggers = ("await",)
 
     @classmethod
-    def check(cls, node: ast.Await, errors: list[SIXErrorInfo]) -> None:
+    def check(cls, node: ast.Await, errors: SixErrorBuffer) -> None:
         """
         Check that the given node is valid.
         If it is not valid, create the relevant error info and update errors.
 
         Args:
             node (ast.Await): The ast statement to check
-            errors (list[SIXErrorInfo]): The error to be updated with found errors.
+            errors (SixErrorBuffer): The error to be updated with found errors.
         """
-        errors.append(cls._create_six_error(node))
+        cls._add_six_error(node, errors)
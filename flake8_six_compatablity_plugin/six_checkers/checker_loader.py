@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+import importlib
+from typing import AbstractSet, Dict, FrozenSet, Iterable, NamedTuple, Optional, Tuple
+
+from flake8_six_compatablity_plugin.six_checkers.checker_manifest import CHECKERS, NODE_CHECKERS, TOKEN_CHECKERS
+from flake8_six_compatablity_plugin.six_checkers.six_checker import SixChecker, SixCheckerMeta
+
+
+class CheckerManifestEntry(NamedTuple):
+    """
+    The manifest entry of a single checker - everything that is known about the checker without importing it.
+    """
+
+    error_number: int
+    module: str
+    class_name: str
+    triggers: Optional[Tuple[str, ...]]
+    error_message: str
+
+
+MANIFEST_ENTRIES: Dict[int, CheckerManifestEntry] = {
+    entry[0]: CheckerManifestEntry(*entry) for entry in CHECKERS
+}
+# The error numbers of the checkers of each node name, in the order they run.
+MANIFEST_NODE_CHECKERS: Dict[str, Tuple[int, ...]] = dict(NODE_CHECKERS)
+# The error numbers of the token checkers, in the order they run.
+MANIFEST_TOKEN_CHECKERS: Tuple[int, ...] = TOKEN_CHECKERS
+ALL_ERROR_NUMBERS = frozenset(MANIFEST_ENTRIES)
+
+
+def load_checker(error_number: int) -> SixChecker:
+    """
+    Get the checker of the given error number, importing its module if it was not imported yet.
+
+    Args:
+        error_number (int): The error number of the checker.
+
+    Returns:
+        SixChecker: The checker class.
+    """
+    checker = SixCheckerMeta.registered_checkers.get(error_number)
+    if checker is None:
+        importlib.import_module(MANIFEST_ENTRIES[error_number].module)
+        checker = SixCheckerMeta.registered_checkers[error_number]
+    return checker
+
+
+def select_node_checkers(
+    node_checkers: Dict[str, Tuple[SixChecker, ...]], error_numbers: Optional[AbstractSet[int]]
+) -> Dict[str, Tuple[SixChecker, ...]]:
+    """
+    Args:
+        node_checkers (Dict[str, Tuple[SixChecker, ...]]): A dictionary that maps between the node name and the
+            checkers to run.
+        error_numbers (Optional[AbstractSet[int]]): The error numbers of the enabled checkers, or None if all of the
+            checkers are enabled.
+
+    Returns:
+        Dict[str, Tuple[SixChecker, ...]]: The given node_checkers with only the enabled checkers, and without the
+            nodes that have no enabled checkers.
+    """
+    if error_numbers is None:
+        return node_checkers
+    selected_node_checkers = {}
+    for node_name, checkers in node_checkers.items():
+        checkers = tuple(checker for checker in checkers if checker.error_number in error_numbers)
+        if checkers:
+            selected_node_checkers[node_name] = checkers
+    return selected_node_checkers
+
+
+def load_checkers(error_numbers: Iterable[int]) -> FrozenSet[SixChecker]:
+    """
+    Args:
+        error_numbers (Iterable[int]): The error numbers of the checkers.
+
+    Returns:
+        FrozenSet[SixChecker]: The checker classes, importing only the modules they are defined in.
+    """
+    return frozenset(load_checker(error_number) for error_number in error_numbers)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# Generated by manifest_generator.py - do not edit by hand.
+# Run `python -m flake8_six_compatablity_plugin.six_checkers.manifest_generator` after adding or changing a checker.
+# Existing checkers always keep their error number, and new checkers get the next free error numbers.
+
+# (error_number, module, class name, triggers, error_message) of each checker.
+CHECKERS = (
+    (1, 'flake8_six_compatablity_plugin.six_checkers.enforcements_checkers', 'OpenEncodingChecker', ('open',), 'all open calls must specify the encoding, or open in byte mode'),
+    (2, 'flake8_six_compatablity_plugin.six_checkers.enforcements_checkers', 'OpenCallValidChecker', ('open',), 'open call is invalid - mode should be unicode and encoding must be used when byte mode is not present'),
+    (3, 'flake8_six_compatablity_plugin.six_checkers.enforcements_checkers', 'ClassInheritanceChecker', ('class',), 'all classes must inherit from at least one base (use object for default)'),
+    (4, 'flake8_six_compatablity_plugin.six_checkers.enforcements_checkers', 'DivisionSpecialMethodsChecker', ('__div__', '__floordiv__', '__truediv__'), 'when implementing division special method, all three should be implemented (__div__, __floordiv__, __truediv__)'),
+    (5, 'flake8_six_compatablity_plugin.six_checkers.unallowed_name_checkers', 'InternNotAllowedChecker', ('intern',), 'intern is not python3 compatible - use six.moves.intern'),
+    (6, 'flake8_six_compatablity_plugin.six_checkers.unallowed_name_checkers', 'ReloadNotAllowedChecker', ('reload',), 'reload is not python3 compatible - use six.moves.reload_module'),
+    (7, 'flake8_six_compatablity_plugin.six_checkers.unallowed_name_checkers', 'CoerceNotAllowedChecker', ('coerce',), 'coerce was removed in python3! Do not use it'),
+    (8, 'flake8_six_compatablity_plugin.six_checkers.unallowed_name_checkers', 'CoerceMethodNotAllowedChecker', ('__coerce__',), '__coerce__ special method was removed in python3! Do not use it'),
+    (9, 'flake8_six_compatablity_plugin.six_checkers.constant_checkers', 'UnspecifiedStringPrefix', ("'", '"'), 'all strings must be prefixed with b or u (bytes or unicode respectively)'),
+    (10, 'flake8_six_compatablity_plugin.six_checkers.constant_checkers', 'FStringsNotAllowedChecker', ("f'", 'f"', "F'", 'F"', "fr'", 'fr"', "fR'", 'fR"', "Fr'", 'Fr"', "FR'", 'FR"'), 'f-strings are not allowed! They are not supported in python2'),
+    (11, 'flake8_six_compatablity_plugin.six_checkers.constant_checkers', 'EllipsisNotAllowedChecker', ('...',), 'Ellipses are not allowed - they are not python2 compatible'),
+    (12, 'flake8_six_compatablity_plugin.six_checkers.deprecated_import_checkers', 'UnallowedAttributesStringImportChecker', ('string',), 'Deprecated attribute import from the string module - use str instead'),
+    (13, 'flake8_six_compatablity_plugin.six_checkers.deprecated_import_checkers', 'UnallowedAttributesStringAccessChecker', ('string',), 'Deprecated attribute access from the string module - use str instead'),
+    (14, 'flake8_six_compatablity_plugin.six_checkers.deprecated_import_checkers', 'UnallowedStringImportRenameChecker', ('string',), 'Import string under a different name is not allowed'),
+    (15, 'flake8_six_compatablity_plugin.six_checkers.deprecated_import_checkers', 'UnallowedAttributesSysImportChecker', ('sys',), 'Deprecated attribute import from the sys module - use sys.exc_info() instead'),
+    (16, 'flake8_six_compatablity_plugin.six_checkers.deprecated_import_checkers', 'UnallowedAttributesSysAccessChecker', ('sys',), 'Deprecated attribute access from the sys module - use sys.exc_info() instead'),
+    (17, 'flake8_six_compatablity_plugin.six_checkers.deprecated_import_checkers', 'UnallowedSysImportRenameChecker', ('sys',), 'Import sys under a different name is not allowed'),
+    (18, 'flake8_six_compatablity_plugin.six_checkers.await_async_checkers', 'AsyncNotAllowedChecker', ('async',), 'async functions are not allowed! They are not supported in python2'),
+    (19, 'flake8_six_compatablity_plugin.six_checkers.await_async_checkers', 'AwaitNotAllowedChecker', ('await',), 'await statements are not allowed! They are not supported in python2'),
+    (20, 'flake8_six_compatablity_plugin.six_checkers.unallowed_statements_checker', 'AnnAssignNotAllowed', (':',), 'Annotation Assignment is not allowed - it is not supported in python2'),
+    (21, 'flake8_six_compatablity_plugin.six_checkers.unallowed_statements_checker', 'AsyncForNotAllowed', ('async',), 'Async For is not allowed - it is not supported in python2'),
+    (22, 'flake8_six_compatablity_plugin.six_checkers.unallowed_statements_checker', 'AsyncWithNotAllowed', ('async',), 'Async With is not allowed - it is not supported in python2'),
+    (23, 'flake8_six_compatablity_plugin.six_checkers.unallowed_statements_checker', 'MatchNotAllowed', ('match',), 'Match is not allowed - it is not supported in python2'),
+    (24, 'flake8_six_compatablity_plugin.six_checkers.unallowed_statements_checker', 'NonlocalNotAllowed', ('nonlocal',), 'Nonlocal is not allowed - it is not supported in python2'),
+    (25, 'flake8_six_compatablity_plugin.six_checkers.unallowed_statements_checker', 'NamedExprNotAllowed', (':=',), 'Warlus operator is not allowed - it is not supported in python2'),
+    (26, 'flake8_six_compatablity_plugin.six_checkers.unallowed_statements_checker', 'YieldFromNotAllowed', ('yield',), 'Yield From is not allowed - it is not supported in python2'),
+    (27, 'flake8_six_compatablity_plugin.six_checkers.unallowed_statements_checker', 'MatchValueNotAllowed', ('match',), 'Match Value is not allowed - it is not supported in python2'),
+    (28, 'flake8_six_compatablity_plugin.six_checkers.unallowed_statements_checker', 'MatchSingletonNotAllowed', ('match',), 'Match Singleton is not allowed - it is not supported in python2'),
+    (29, 'flake8_six_compatablity_plugin.six_checkers.unallowed_statements_checker', 'MatchSequenceNotAllowed', ('match',), 'Match Sequence is not allowed - it is not supported in python2'),
+    (30, 'flake8_six_compatablity_plugin.six_checkers.unallowed_statements_checker', 'MatchMappingNotAllowed', ('match',), 'Match Mapping is not allowed - it is not supported in python2'),
+    (31, 'flake8_six_compatablity_plugin.six_checkers.unallowed_statements_checker', 'MatchClassNotAllowed', ('match',), 'Match Class is not allowed - it is not supported in python2'),
+    (32, 'flake8_six_compatablity_plugin.six_checkers.unallowed_statements_checker', 'MatchStarNotAllowed', ('match',), 'Match Star is not allowed - it is not supported in python2'),
+    (33, 'flake8_six_compatablity_plugin.six_checkers.unallowed_statements_checker', 'MatchAsNotAllowed', ('match',), 'Match As is not allowed - it is not supported in python2'),
+    (34, 'flake8_six_compatablity_plugin.six_checkers.unallowed_statements_checker', 'MatchOrNotAllowed', ('match',), 'Match Or is not allowed - it is not supported in python2'),
+    (35, 'flake8_six_compatablity_plugin.six_checkers.unallowed_statements_checker', 'NameConstantNotAllowed', ('match',), 'Match Constant is not allowed - it is not supported in python2'),
+)
+# The error numbers of the checkers of each node, in the order they run.
+NODE_CHECKERS = (
+    ('Call', (5, 6, 7, 1, 2)),
+    ('Import', (14, 17)),
+    ('ImportFrom', (12, 15)),
+    ('Attribute', (13, 16)),
+    ('FunctionDef', (8,)),
+    ('ClassDef', (3, 4)),
+    ('Constant', (11,)),
+    ('JoinedStr', (10,)),
+    ('Await', (19,)),
+    ('AsyncFunctionDef', (18,)),
+    ('AnnAssign', (20,)),
+    ('AsyncFor', (21,)),
+    ('AsyncWith', (22,)),
+    ('Match', (23,)),
+    ('Nonlocal', (24,)),
+    ('NamedExpr', (25,)),
+    ('YieldFrom', (26,)),
+    ('MatchValue', (27,)),
+    ('MatchSingleton', (28,)),
+    ('MatchSequence', (29,)),
+    ('MatchMapping', (30,)),
+    ('MatchClass', (31,)),
+    ('MatchStar', (32,)),
+    ('MatchAs', (33,)),
+    ('MatchOr', (34,)),
+    ('NameConstant', (35,)),
+)
+# The error numbers of the checkers of the tokens of the whole file, in the order they run.
+TOKEN_CHECKERS = (
+    9,
+)
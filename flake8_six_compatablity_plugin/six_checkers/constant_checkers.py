@@ -1,32 +1,184 @@
 #!/usr/bin/env python3
 import ast
+import tokenize
+from typing import FrozenSet, Iterable, Iterator
+
+from flake8_six_compatablity_plugin.six_checkers.six_checker import SixChecker, SixTokenChecker
+from flake8_six_compatablity_plugin.six_checkers.six_error_buffer import SixErrorBuffer
+
+# The f-string prefixes followed by a quote. The r prefix may come before or after the f.
+FSTRING_STARTS = tuple(
+    prefix + quote
+    for prefix in ("f", "F", "fr", "fR", "Fr", "FR")
+    for quote in ("'", '"')
+)
+
+# The strings UnspecifiedStringPrefix can be configured to allow without a prefix.
+DOCSTRINGS_EXEMPTION = "docstrings"
+ALL_EXEMPTION = "__all__"
+DICT_KEYS_EXEMPTION = "dict-keys"
+STRING_PREFIX_EXEMPTIONS = (DOCSTRINGS_EXEMPTION, ALL_EXEMPTION, DICT_KEYS_EXEMPTION)
+
+QUOTES = frozenset("'\"")
+RAW_PREFIXES = frozenset("rR")
+DICT_KEY_PRECEDING_TOKENS = frozenset("{,")
+# The operators that change the state of the string prefix scan.
+SPECIAL_OPERATORS = frozenset(":;{}")
+# The statements whose body may start with a docstring.
+DOCSTRING_OWNER_KEYWORDS = frozenset(("def", "class"))
+# Only exist since python3.12, where f-strings are tokenized into their parts.
+FSTRING_START = getattr(tokenize, "FSTRING_START", None)
+FSTRING_END = getattr(tokenize, "FSTRING_END", None)
+# Returned instead of the token after the last group of strings, when the strings end the tokens.
+END_TOKEN = tokenize.TokenInfo(tokenize.ENDMARKER, "", (0, 0), (0, 0), "")
+
+
+def _skip_fstring(tokens: Iterator[tokenize.TokenInfo]) -> None:
+    """
+    Consume the tokens of an f-string, including its nested f-strings, after its FSTRING_START token.
 
-from flake8_six_compatablity_plugin.six_checkers.six_checker import SixChecker
-from flake8_six_compatablity_plugin.flake8_errors_info import SIXErrorInfo
+    Args:
+        tokens (Iterator[tokenize.TokenInfo]): The tokens after the FSTRING_START token.
+    """
+    fstring_depth = 1
+    for token_type, _, _, _, _ in tokens:
+        if token_type == FSTRING_START:
+            fstring_depth += 1
+        elif token_type == FSTRING_END:
+            fstring_depth -= 1
+            if not fstring_depth:
+                return
 
 
-class UnspecifiedStringPrefix(SixChecker):
+class UnspecifiedStringPrefix(SixTokenChecker):
     """
     Six Checker that checks that all the strings are explicitly unicode or bytes.
+    Example: 'text' or r'text', instead of u'text' or b'text'.
+
+    The ast can not tell the prefixes of implicitly concatenated strings apart, so this is checked on the tokens.
+    Implicitly concatenated strings are a single string - it is enough that one of them is prefixed, and the error is
+    reported on the first of them. F-strings are reported by FStringsNotAllowedChecker.
+    Docstrings, the strings in __all__ statements and dict keys are allowed without a prefix, unless they are
+    removed from the exemptions - errors.string_prefix_exemptions, or exemptions when it is not set.
     """
 
     error_message = (
         "all strings must be prefixed with b or u (bytes or unicode respectively)"
     )
+    triggers = ("'", '"')
+    exemptions: FrozenSet[str] = frozenset(STRING_PREFIX_EXEMPTIONS)
 
     @classmethod
-    def check(cls, node: ast.Constant, errors: list[SIXErrorInfo]) -> None:
+    def check(cls, tokens: Iterable[tokenize.TokenInfo], errors: SixErrorBuffer) -> None:
         """
-        Check that the given node is valid.
-        If it is not valid, create the relevant error info and update errors.
+        Check that the given tokens are valid, in a single pass over them.
+        If they are not valid, create the relevant error info and update errors.
 
         Args:
-            node (ast.Constant): The ast statement to check
-            errors (list[SIXErrorInfo]): The error to be updated with found errors.
+            tokens (Iterable[tokenize.TokenInfo]): The tokens of the whole file.
+            errors (SixErrorBuffer): The error to be updated with found errors.
         """
-        return # Currently disabled
-        if isinstance(node.value, str) and node.kind is None:
-            errors.append(cls._create_six_error(node))
+        exemptions = cls.exemptions if errors.string_prefix_exemptions is None else errors.string_prefix_exemptions
+        exempt_docstrings = DOCSTRINGS_EXEMPTION in exemptions
+        exempt_all = ALL_EXEMPTION in exemptions
+        exempt_dict_keys = DICT_KEYS_EXEMPTION in exemptions
+        error_number = cls.error_number
+        # The token types and the sets are local names, since they are used for every token.
+        STRING, OP, NAME, NEWLINE, NL, COMMENT = (
+            tokenize.STRING, tokenize.OP, tokenize.NAME, tokenize.NEWLINE, tokenize.NL, tokenize.COMMENT
+        )
+        SKIPPED = (tokenize.NL, tokenize.COMMENT, tokenize.INDENT, tokenize.DEDENT, tokenize.ENCODING)
+        fstring_start = FSTRING_START
+        # The types of the tokens that start a string, and of the tokens that may be in a group of strings.
+        string_start_types = {STRING, fstring_start}
+        group_types = {STRING, fstring_start, NL, COMMENT}
+        quotes, raw_prefixes, dict_key_preceding_tokens = QUOTES, RAW_PREFIXES, DICT_KEY_PRECEDING_TOKENS
+        special_operators = SPECIAL_OPERATORS
+
+        # Whether the current token starts a logical line, and what the logical line is.
+        line_start = True
+        docstring_owner_line = False
+        all_line = False
+        # Whether a string at the current token is the first statement of a module, class or function.
+        docstring_position = True
+        # The last token that is not a string, a comment or a line break, and the number of open braces.
+        previous = ""
+        braces_depth = 0
+
+        tokens = iter(tokens)
+        for token_type, string, start, _, _ in tokens:
+            if token_type in string_start_types:
+                # Consume the whole group of implicitly concatenated strings, until the token after it.
+                group_start = start
+                group_prefixed = False
+                while True:
+                    if token_type == STRING:
+                        if not group_prefixed:
+                            first_character = string[0]
+                            group_prefixed = not (
+                                first_character in quotes
+                                or (first_character in raw_prefixes and string[1] in quotes)
+                            )
+                    elif token_type not in group_types:
+                        break
+                    elif token_type == fstring_start:
+                        # F-strings are reported by FStringsNotAllowedChecker, and so are the strings concatenated
+                        # to them.
+                        group_prefixed = True
+                        _skip_fstring(tokens)
+                    token_type, string, _, _, _ = next(tokens, END_TOKEN)
+
+                # The tokens around the group decide if it is exempted. Inside braces, a dict key is the only string
+                # that follows an opening brace or a comma, and is followed by a colon.
+                if not (
+                    group_prefixed
+                    or (exempt_all and all_line)
+                    or (exempt_docstrings and docstring_position and (token_type == NEWLINE or string == ";"))
+                    or (
+                        exempt_dict_keys
+                        and string == ":"
+                        and braces_depth
+                        and previous in dict_key_preceding_tokens
+                    )
+                ):
+                    errors.add(group_start[0], group_start[1], error_number)
+                line_start = docstring_position = False
+
+            if token_type == OP:
+                if string in special_operators:
+                    if string == ":":
+                        if docstring_owner_line:
+                            # The body of a function or class may start after any colon of its header, since a
+                            # string after the colons of annotations and lambdas is followed by more of the header.
+                            previous = string
+                            line_start = False
+                            docstring_position = True
+                            continue
+                    elif string == ";":
+                        previous = string
+                        line_start = True
+                        docstring_owner_line = all_line = docstring_position = False
+                        continue
+                    elif string == "{":
+                        braces_depth += 1
+                    else:
+                        braces_depth -= 1
+            elif token_type == NAME:
+                if line_start:
+                    if string in DOCSTRING_OWNER_KEYWORDS:
+                        docstring_owner_line = True
+                    elif string == "async":
+                        continue
+                    elif string == ALL_EXEMPTION:
+                        all_line = True
+            elif token_type == NEWLINE:
+                line_start = True
+                docstring_owner_line = all_line = False
+                continue
+            elif token_type in SKIPPED:
+                continue
+            previous = string
+            line_start = docstring_position = False
 
 
 class FStringsNotAllowedChecker(SixChecker):
@@ -38,18 +190,19 @@ class FStringsNotAllowedChecker(SixChecker):
     """
 
     error_message = "f-strings are not allowed! They are not supported in python2"
+    triggers = FSTRING_STARTS
 
     @classmethod
-    def check(cls, node: ast.JoinedStr, errors: list[SIXErrorInfo]) -> None:
+    def check(cls, node: ast.JoinedStr, errors: SixErrorBuffer) -> None:
         """
         Check that the given node is valid.
         If it is not valid, create the relevant error info and update errors.
 
         Args:
             node (ast.JoinedStr): The ast statement to check
-            errors (list[SIXErrorInfo]): The error to be updated with found errors.
+            errors (SixErrorBuffer): The error to be updated with found errors.
         """
-        errors.append(cls._create_six_error(node))
+        cls._add_six_error(node, errors)
 
 
 class EllipsisNotAllowedChecker(SixChecker):
@@ -58,16 +211,17 @@ class EllipsisNotAllowedChecker(SixChecker):
     """
 
     error_message = "Ellipses are not allowed - they are not python2 compatible"
+    triggers = ("...",)
 
     @classmethod
-    def check(cls, node: ast.Constant, errors: list[SIXErrorInfo]) -> None:
+    def check(cls, node: ast.Constant, errors: SixErrorBuffer) -> None:
         """
         Check that the given node is valid.
         If it is not valid, create the relevant error info and update errors.
 
         Args:
             node (ast.Constant): The ast statement to check
-            errors (list[SIXErrorInfo]): The error to be updated with found errors.
+            errors (SixErrorBuffer): The error to be updated with found errors.
         """
         if node.value is Ellipsis:
-            errors.append(cls._create_six_error(node))
+            cls._add_six_error(node, errors)
@@ -1,9 +1,11 @@
 #!/usr/bin/env python3
 import ast
 import abc
+from typing import FrozenSet, Iterable
 
-from flake8_six_compatablity_plugin.flake8_errors_info import SIXErrorInfo
+from flake8_six_compatablity_plugin.six_checkers.rule_table import attribute_name, imported_module, imported_names
 from flake8_six_compatablity_plugin.six_checkers.six_checker import SixChecker
+from flake8_six_compatablity_plugin.six_checkers.six_error_buffer import SixErrorBuffer
 
 STRING_MODULE_NAME = "string"
 # found using common values betweem vars(str).keys() and vars(string).keys() in python2
@@ -35,6 +37,29 @@ SYS_MODULE_NAME = "sys"
 SYS_DEPRECATED_ATTRIBUTES = ("exc_type", "exc_value", "exc_traceback")
 
 
+def _qualified_attributes(module_name: str, module_attributes: Iterable[str]) -> FrozenSet[str]:
+    """
+    Args:
+        module_name (str): The name of the module.
+        module_attributes (Iterable[str]): The names of the attributes.
+
+    Returns:
+        FrozenSet[str]: The qualified names of the attributes, as resolved by the symbol index.
+    """
+    return frozenset(f"{module_name}.{attribute}" for attribute in module_attributes)
+
+
+def _top_level_package(module_name: str) -> str:
+    """
+    Args:
+        module_name (str): The qualified name of a module, like "os.path".
+
+    Returns:
+        str: The name of the top level package of the module, which any import or access of the module contains.
+    """
+    return module_name.partition(".")[0]
+
+
 class UnallowedAttributesModuleImportChecker(abc.ABC, SixChecker):
     """
     Six Checker that checks that a given attributes are not imported from the give module nmae.
@@ -44,21 +69,30 @@ class UnallowedAttributesModuleImportChecker(abc.ABC, SixChecker):
 
     module_name = ""
     module_attributes = tuple()
+    qualified_attributes: FrozenSet[str] = frozenset()
+    uses_symbol_index = True
+    rule_key_of = staticmethod(imported_module)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.triggers = (_top_level_package(cls.module_name),)
+        cls.rule_keys = (cls.module_name,)
+        cls.qualified_attributes = _qualified_attributes(cls.module_name, cls.module_attributes)
 
     @classmethod
-    def check(cls, node: ast.ImportFrom, errors: list[SIXErrorInfo]) -> None:
+    def check(cls, node: ast.ImportFrom, errors: SixErrorBuffer) -> None:
         """
         Check that the given node is valid.
         If it is not valid, create the relevant error info and update errors.
 
         Args:
             node (ast.ImportFrom): The ast statement to check
-            errors (list[SIXErrorInfo]): The error to be updated with found errors.
+            errors (SixErrorBuffer): The error to be updated with found errors.
         """
-        if node.module == cls.module_name and node.level == 0:
-            for alias in node.names:
-                if alias.name in cls.module_attributes:
-                    errors.append(cls._create_six_error(alias))
+        for qualified_name, aliases in errors.symbols.imports(node).items():
+            if qualified_name in cls.qualified_attributes:
+                for alias in aliases:
+                    cls._add_six_error(alias, errors)
 
 
 class UnallowedAttributesModuleAccessChecker(abc.ABC, SixChecker):
@@ -66,24 +100,37 @@ class UnallowedAttributesModuleAccessChecker(abc.ABC, SixChecker):
     Six Checker that checks that a given attributes are not accessed from the given module name.
 
     Any inherting class needs to define the module_name, module_attributes, as well as the error_message.
+    The module may be accessed by any name it is imported as, and not when its name is shadowed.
     """
 
     module_name = ""
     module_attributes = tuple()
+    attribute_names: FrozenSet[str] = frozenset()
+    qualified_attributes: FrozenSet[str] = frozenset()
+    uses_symbol_index = True
+    rule_key_of = staticmethod(attribute_name)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.triggers = (_top_level_package(cls.module_name),)
+        cls.rule_keys = tuple(cls.module_attributes)
+        cls.attribute_names = frozenset(cls.module_attributes)
+        cls.qualified_attributes = _qualified_attributes(cls.module_name, cls.module_attributes)
 
     @classmethod
-    def check(cls, node: ast.Attribute, errors: list[SIXErrorInfo]) -> None:
+    def check(cls, node: ast.Attribute, errors: SixErrorBuffer) -> None:
         """
         Check that the given node is valid.
         If it is not valid, create the relevant error info and update errors.
 
         Args:
             node (ast.Attribute): The ast statement to check
-            errors (list[SIXErrorInfo]): The error to be updated with found errors.
+            errors (SixErrorBuffer): The error to be updated with found errors.
         """
-        if isinstance(node.value, ast.Name):
-            if node.value.id == cls.module_name and node.attr in cls.module_attributes:
-                errors.append(cls._create_six_error(node.value))
+        # Most attributes are rejected by their name, without resolving them.
+        if node.attr in cls.attribute_names:
+            if errors.symbols.resolve_attribute(node) in cls.qualified_attributes:
+                cls._add_six_error(node.value, errors)
 
 
 class UnallowedModuleImportRenameChecker(abc.ABC, SixChecker):
@@ -94,20 +141,69 @@ class UnallowedModuleImportRenameChecker(abc.ABC, SixChecker):
     """
 
     module_name = ""
+    uses_symbol_index = True
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.triggers = (_top_level_package(cls.module_name),)
 
     @classmethod
-    def check(cls, node: ast.Import, errors: list[SIXErrorInfo]) -> None:
+    def check(cls, node: ast.Import, errors: SixErrorBuffer) -> None:
         """
         Check that the given node is valid.
         If it is not valid, create the relevant error info and update errors.
 
         Args:
             node (ast.Import): The ast statement to check
-            errors (list[SIXErrorInfo]): The error to be updated with found errors.
+            errors (SixErrorBuffer): The error to be updated with found errors.
         """
+        for alias in errors.symbols.imports(node).get(cls.module_name, ()):
+            if alias.asname is not None:
+                cls._add_six_error(alias, errors)
+
+
+class UnallowedModuleImportChecker(abc.ABC, SixChecker):
+    """
+    Six Checker that checks that a given module, or a given attribute of a module, is not imported.
+
+    Any inherting class needs to define the module_name, as well as the error_message. The module_name may be the
+    qualified name of a module attribute, like "os.getcwdu", which is checked in the names imported from the module.
+    Importing anything from a package of a banned module is allowed, while importing a submodule of it is not.
+    """
+
+    module_name = ""
+    rule_key_of = staticmethod(imported_names)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.triggers = (_top_level_package(cls.module_name),)
+        cls.rule_keys = (cls.module_name,)
+
+    @classmethod
+    def check(cls, node: ast.stmt, errors: SixErrorBuffer) -> None:
+        """
+        Check that the given node is valid.
+        If it is not valid, create the relevant error info and update errors.
+
+        Args:
+            node (ast.stmt): The ast.Import or ast.ImportFrom to check
+            errors (SixErrorBuffer): The error to be updated with found errors.
+        """
+        submodule_prefix = cls.module_name + "."
+        if isinstance(node, ast.ImportFrom):
+            if node.level != 0 or not node.module:
+                return
+            if node.module == cls.module_name or node.module.startswith(submodule_prefix):
+                cls._add_six_error(node, errors)
+                return
+            for alias in node.names:
+                if f"{node.module}.{alias.name}" == cls.module_name:
+                    cls._add_six_error(alias, errors)
+            return
+
         for alias in node.names:
-            if alias.name == cls.module_name and alias.asname is not None:
-                errors.append(cls._create_six_error(alias))
+            if alias.name == cls.module_name or alias.name.startswith(submodule_prefix):
+                cls._add_six_error(alias, errors)
 
 
 class UnallowedAttributesStringImportChecker(UnallowedAttributesModuleImportChecker):
@@ -1,9 +1,25 @@
 #!/usr/bin/env python3
 import ast
-from typing import Iterable
+import re
+from typing import Iterable, List
 
+from flake8_six_compatablity_plugin.six_checkers.rule_table import called_name
 from flake8_six_compatablity_plugin.six_checkers.six_checker import SixChecker
-from flake8_six_compatablity_plugin.flake8_errors_info import SIXErrorInfo
+from flake8_six_compatablity_plugin.six_checkers.six_error_buffer import SixErrorBuffer
+from flake8_six_compatablity_plugin.six_checkers.source_edits import FixSource, SourceEdit
+
+# The encoding the fix of OpenEncodingChecker adds, prefixed like SIX009 requires.
+FIX_ENCODING_ARGUMENT = 'encoding=u"utf-8"'
+# open(file, mode, buffering, encoding) - a call with more positional arguments passes the encoding positionally.
+MAX_OPEN_POSITIONAL_ARGUMENTS = 3
+CLASS_NAME_PATTERN = re.compile(r"class\s+(\w+)\s*(\(?)")
+DIVISION_METHOD_NAMES = ("__div__", "__floordiv__", "__truediv__")
+# The method each missing division method can be an alias of - the / operator of python2 and python3. __floordiv__
+# is the // operator, which no other method can stand for.
+DIVISION_METHOD_ALIASES = {
+    "__div__": "__truediv__",
+    "__truediv__": "__div__",
+}
 
 
 class OpenEncodingChecker(SixChecker):
@@ -13,16 +29,20 @@ class OpenEncodingChecker(SixChecker):
     """
 
     error_message = "all open calls must specify the encoding, or open in byte mode"
+    triggers = ("open",)
+    rule_key_of = staticmethod(called_name)
+    rule_keys = ("open",)
+    fixable = True
 
     @classmethod
-    def check(cls, node: ast.Call, errors: list[SIXErrorInfo]) -> None:
+    def check(cls, node: ast.Call, errors: SixErrorBuffer) -> None:
         """
         Check that the given node is valid.
         If it is not valid, create the relevant error info and update errors.
 
         Args:
             node (ast.Call): The ast statement to check
-            errors (list[SIXErrorInfo]): The error to be updated with found errors.
+            errors (SixErrorBuffer): The error to be updated with found errors.
         """
         if isinstance(node.func, ast.Name) and node.func.id == "open":
             if len(node.args) > 1 and isinstance(node.args[1], ast.Constant):
@@ -32,7 +52,35 @@ class OpenEncodingChecker(SixChecker):
 
             keyword_names = [keyword.arg for keyword in node.keywords]
             if "encoding" not in keyword_names:
-                errors.append(cls._create_six_error(node.func))
+                cls._add_six_error(node.func, errors)
+
+    @classmethod
+    def fix(cls, node: ast.Call, source: FixSource) -> List[SourceEdit]:
+        """
+        Add the utf-8 encoding after the last argument of the call, so a trailing comma or a comment stay in place.
+        Calls that may already pass the encoding - through unpacked arguments or positionally - are not fixed.
+
+        Args:
+            node (ast.Call): The call the error was found in.
+            source (FixSource): The source of the node.
+
+        Returns:
+            List[SourceEdit]: The edits that fix the error.
+        """
+        if len(node.args) > MAX_OPEN_POSITIONAL_ARGUMENTS or any(
+            isinstance(argument, ast.Starred) for argument in node.args
+        ):
+            return []
+        if any(keyword.arg is None for keyword in node.keywords):
+            return []
+
+        arguments = node.args + node.keywords
+        if not arguments:
+            position = source.text.index("(", source.node_end(node.func)) + 1
+            return [SourceEdit(position, position, FIX_ENCODING_ARGUMENT)]
+        last_argument = max(arguments, key=lambda argument: (argument.end_lineno, argument.end_col_offset))
+        position = source.node_end(last_argument)
+        return [SourceEdit(position, position, f", {FIX_ENCODING_ARGUMENT}")]
 
 
 class OpenCallValidChecker(SixChecker):
@@ -42,16 +90,19 @@ class OpenCallValidChecker(SixChecker):
     """
 
     error_message = "open call is invalid - mode should be unicode and encoding must be used when byte mode is not present"
+    triggers = ("open",)
+    rule_key_of = staticmethod(called_name)
+    rule_keys = ("open",)
 
     @classmethod
-    def check(cls, node: ast.Call, errors: list[SIXErrorInfo]) -> None:
+    def check(cls, node: ast.Call, errors: SixErrorBuffer) -> None:
         """
         Check that the given node is valid.
         If it is not valid, create the relevant error info and update errors.
 
         Args:
             node (ast.Call): The ast statement to check
-            errors (list[SIXErrorInfo]): The error to be updated with found errors.
+            errors (SixErrorBuffer): The error to be updated with found errors.
         """
         if isinstance(node.func, ast.Name) and node.func.id == "open":
             keyword_names = {keyword.arg: keyword for keyword in node.keywords}
@@ -59,38 +110,83 @@ class OpenCallValidChecker(SixChecker):
             if len(node.args) > 1 and isinstance(node.args[1], ast.Constant):
                 encoding = node.args[1].value
                 if not isinstance(encoding, str):
-                    errors.append(cls._create_six_error(node.args[1]))
+                    cls._add_six_error(node.args[1], errors)
 
                 if (
                     isinstance(encoding, str)
                     and "b" in encoding
                     and "encoding" in keyword_names
                 ):
-                    errors.append(cls._create_six_error(keyword_names["encoding"]))
+                    cls._add_six_error(keyword_names["encoding"], errors)
+
+
+def _class_facts(node: ast.ClassDef, errors: SixErrorBuffer):
+    """
+    Args:
+        node (ast.ClassDef): A class of the walked file.
+        errors (SixErrorBuffer): The errors of the walk.
+
+    Returns:
+        Optional[ClassFacts]: The facts of the class that depend on the other files of the project, or None if they
+            are not known.
+    """
+    if errors.class_hierarchy is None:
+        return None
+    return errors.class_hierarchy.get((node.lineno, node.col_offset))
 
 
 class ClassInheritanceChecker(SixChecker):
     """
     Six Checker that checks that all of the defined classes inherit from at least one thing.
     This is to ensure the parent is the object class.
+    In project mode, a class whose bases are all old-style classes of the project is an old-style class as well.
     """
 
     error_message = (
         "all classes must inherit from at least one base (use object for default)"
     )
+    triggers = ("class",)
+    fixable = True
 
     @classmethod
-    def check(cls, node: ast.ClassDef, errors: list[SIXErrorInfo]) -> None:
+    def check(cls, node: ast.ClassDef, errors: SixErrorBuffer) -> None:
         """
         Check that the given node is valid.
         If it is not valid, create the relevant error info and update errors.
 
         Args:
             node (ast.ClassDef): The ast statement to check
-            errors (list[SIXErrorInfo]): The error to be updated with found errors.
+            errors (SixErrorBuffer): The error to be updated with found errors.
         """
         if not node.bases:
-            errors.append(cls._create_six_error(node))
+            cls._add_six_error(node, errors)
+        else:
+            class_facts = _class_facts(node, errors)
+            if class_facts is not None and class_facts.old_style:
+                cls._add_six_error(node, errors)
+
+    @classmethod
+    def fix(cls, node: ast.ClassDef, source: FixSource) -> List[SourceEdit]:
+        """
+        Add object as the first base of the class.
+
+        Args:
+            node (ast.ClassDef): The class the error was found in.
+            source (FixSource): The source of the node.
+
+        Returns:
+            List[SourceEdit]: The edits that fix the error.
+        """
+        if node.bases:
+            # Adding object to the bases of a class whose bases are old-style classes breaks its method resolution
+            # order in python3 - the fix is to make its ancestor a new-style class.
+            return []
+        match = CLASS_NAME_PATTERN.match(source.text, source.node_start(node))
+        if match is None:
+            return []
+        if not match.group(2):
+            return [SourceEdit(match.end(1), match.end(1), "(object)")]
+        return [SourceEdit(match.end(), match.end(), "object, " if node.keywords else "object")]
 
 
 def _find_functiondefs_with_name(body: Iterable[ast.stmt], name: str):
@@ -101,32 +197,89 @@ def _find_functiondefs_with_name(body: Iterable[ast.stmt], name: str):
     return methods
 
 
+def _is_assigned(body: Iterable[ast.stmt], name: str) -> bool:
+    """
+    Args:
+        body (Iterable[ast.stmt]): The statements of a class body.
+        name (str): The name of a method.
+
+    Returns:
+        bool: True if the method is assigned in the class body, like the alias __truediv__ = __div__.
+    """
+    for statement in body:
+        if isinstance(statement, ast.Assign) and any(
+            isinstance(target, ast.Name) and target.id == name for target in statement.targets
+        ):
+            return True
+    return False
+
+
 class DivisionSpecialMethodsChecker(SixChecker):
     """
     Six Checker that checks that when implementing division special methods, all off them are implemented.
     For example, make sure that when __div__ is defined, __floordiv__ and __truediv__ are defined as well.
+    A method may also be implemented by assigning it in the class body, like __truediv__ = __div__, or in project
+    mode, by inheriting it from a class of the project.
     """
 
     error_message = "when implementing division special method, all three should be implemented (__div__, __floordiv__, __truediv__)"
+    triggers = ("__div__", "__floordiv__", "__truediv__")
+    fixable = True
 
     @classmethod
-    def check(cls, node: ast.ClassDef, errors: list[SIXErrorInfo]) -> None:
+    def check(cls, node: ast.ClassDef, errors: SixErrorBuffer) -> None:
         """
         Check that the given node is valid.
         If it is not valid, create the relevant error info and update errors.
 
         Args:
             node (ast.ClassDef): The ast statement to check
-            errors (list[SIXErrorInfo]): The error to be updated with found errors.
+            errors (SixErrorBuffer): The error to be updated with found errors.
         """
         div_defs = _find_functiondefs_with_name(node.body, "__div__")
         floordiv_defs = _find_functiondefs_with_name(node.body, "__floordiv__")
         truediv_defs = _find_functiondefs_with_name(node.body, "__truediv__")
+        class_facts = _class_facts(node, errors)
+        inherited_names = class_facts.inherited_names if class_facts is not None else ()
 
-        if not div_defs or not floordiv_defs or not truediv_defs:
+        if not all(
+            defs or _is_assigned(node.body, name) or name in inherited_names
+            for name, defs in zip(DIVISION_METHOD_NAMES, (div_defs, floordiv_defs, truediv_defs))
+        ):
             for function_def in div_defs:
-                errors.append(cls._create_six_error(function_def))
+                cls._add_six_error(function_def, errors)
             for function_def in floordiv_defs:
-                errors.append(cls._create_six_error(function_def))
+                cls._add_six_error(function_def, errors)
             for function_def in truediv_defs:
-                errors.append(cls._create_six_error(function_def))
+                cls._add_six_error(function_def, errors)
+
+    @classmethod
+    def fix(cls, node: ast.ClassDef, source: FixSource) -> List[SourceEdit]:
+        """
+        Add the missing __div__ or __truediv__ as an alias of the other one, after the last division method.
+        A class without __floordiv__ is left as is, since no other method can stand for it.
+
+        Args:
+            node (ast.ClassDef): The class the error was found in.
+            source (FixSource): The source of the node.
+
+        Returns:
+            List[SourceEdit]: The edits that fix the error.
+        """
+        defined_methods = {name: _find_functiondefs_with_name(node.body, name) for name in DIVISION_METHOD_NAMES}
+        if not (defined_methods["__floordiv__"] or _is_assigned(node.body, "__floordiv__")):
+            return []
+        aliases = [
+            f"{name} = {alias_name}"
+            for name, alias_name in DIVISION_METHOD_ALIASES.items()
+            if not (defined_methods[name] or _is_assigned(node.body, name)) and defined_methods[alias_name]
+        ]
+
+        last_method = max(
+            (methods[-1] for methods in defined_methods.values() if methods), key=lambda method: method.end_lineno
+        )
+        if not aliases or last_method.lineno == node.lineno:
+            # A class defined on a single line has no line to add the aliases in.
+            return []
+        indentation = source.indentation(last_method.lineno)
+        return [source.insert_lines(last_method.end_lineno + 1, [indentation + alias for alias in aliases])]
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import sys
+from typing import Sequence
+
+MANIFEST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "checker_manifest.py")
+MANIFEST_HEADER = """#!/usr/bin/env python3
+# Generated by manifest_generator.py - do not edit by hand.
+# Run `python -m flake8_six_compatablity_plugin.six_checkers.manifest_generator` after adding or changing a checker.
+# Existing checkers always keep their error number, and new checkers get the next free error numbers.
+
+"""
+
+
+def _format_tuple(items: tuple) -> str:
+    return "(\n" + "".join(f"    {item!r},\n" for item in items) + ")"
+
+
+def generate_manifest() -> str:
+    """
+    Import all of the checkers, and generate the manifest source from them.
+
+    Returns:
+        str: The source of the manifest module.
+    """
+    from flake8_six_compatablity_plugin.six_checkers.six_compatibility_node_visitor import (
+        TOKEN_CHECKERS,
+        SixCompatibilityNodeVisitor,
+    )
+
+    checkers = {checker.error_number: checker for checker in TOKEN_CHECKERS}
+    for node_checkers in SixCompatibilityNodeVisitor.node_checkers.values():
+        for checker in node_checkers:
+            checkers[checker.error_number] = checker
+
+    manifest_checkers = tuple(
+        (
+            error_number,
+            checker.__module__,
+            checker.__qualname__,
+            checker.triggers,
+            checker.error_message,
+        )
+        for error_number, checker in sorted(checkers.items())
+    )
+    manifest_node_checkers = tuple(
+        (node_name, tuple(checker.error_number for checker in node_checkers))
+        for node_name, node_checkers in SixCompatibilityNodeVisitor.node_checkers.items()
+    )
+
+    return (
+        MANIFEST_HEADER
+        + "# (error_number, module, class name, triggers, error_message) of each checker.\n"
+        + f"CHECKERS = {_format_tuple(manifest_checkers)}\n"
+        + "# The error numbers of the checkers of each node, in the order they run.\n"
+        + f"NODE_CHECKERS = {_format_tuple(manifest_node_checkers)}\n"
+        + "# The error numbers of the checkers of the tokens of the whole file, in the order they run.\n"
+        + f"TOKEN_CHECKERS = {_format_tuple(tuple(checker.error_number for checker in TOKEN_CHECKERS))}\n"
+    )
+
+
+def main(argv: Sequence[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate the frozen manifest of the SIX checkers.")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Only check that the manifest is up to date, and fail if it is not.",
+    )
+    arguments = parser.parse_args(argv)
+
+    manifest = generate_manifest()
+    try:
+        with open(MANIFEST_PATH, encoding="utf-8") as manifest_file:
+            current_manifest = manifest_file.read()
+    except OSError:
+        current_manifest = None
+
+    if arguments.check:
+        if manifest != current_manifest:
+            print(f"{MANIFEST_PATH} is out of date - regenerate it", file=sys.stderr)
+            return 1
+        return 0
+
+    with open(MANIFEST_PATH, "w", encoding="utf-8") as manifest_file:
+        manifest_file.write(manifest)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+import functools
+import hashlib
+import os
+import re
+import threading
+from typing import Dict, FrozenSet, Iterable, NamedTuple
+
+from flake8_six_compatablity_plugin.flake8_errors_info import SIXErrorInfo
+from flake8_six_compatablity_plugin.six_checkers.checker_loader import ALL_ERROR_NUMBERS
+from flake8_six_compatablity_plugin.six_checkers.six_checker import SixChecker
+
+# The error numbers below this one are reserved for the built-in checkers, so a new built-in checker never takes the
+# code of a rule.
+MIN_RULE_ERROR_NUMBER = 100
+RULE_CODE_PATTERN = re.compile(rf"{SIXErrorInfo.error_prefix}(\d{{3,}})")
+TOML_SUFFIX = ".toml"
+RULE_FIELDS = ("kind", "name", "message")
+# The names of the nodes the checkers of each kind of rule run on.
+RULE_KIND_NODE_NAMES = {
+    "call": ("Call",),
+    "attribute": ("Attribute",),
+    "import": ("Import", "ImportFrom"),
+    "function": ("FunctionDef", "AsyncFunctionDef"),
+}
+RULE_FILES_CACHE_SIZE = 16
+# Threads that load the same rule file at once compile it once, so they share the same checkers.
+RULE_FILES_LOCK = threading.Lock()
+
+
+class RuleSet(NamedTuple):
+    """
+    The checkers compiled from a rule file.
+    """
+
+    checkers: FrozenSet[SixChecker]
+    # The digest of the rule file - the errors of the checkers depend only on it.
+    signature: str
+
+
+EMPTY_RULE_SET = RuleSet(frozenset(), "")
+
+
+def read_tables(path: str, content: str, file_kind: str = "rule file", table_kind: str = "rule") -> Dict[str, dict]:
+    """
+    Args:
+        path (str): The path of the file. Files that end with .toml are read as TOML, and any other file as INI.
+        content (str): The content of the file.
+        file_kind (str): What the file is, for the error messages.
+        table_kind (str): What each table of the file is, for the error messages.
+
+    Returns:
+        Dict[str, dict]: The fields of each TOML table or INI section, by its name.
+    """
+    if not path.endswith(TOML_SUFFIX):
+        # configparser is imported only when an INI rule file is used.
+        import configparser
+
+        parser = configparser.ConfigParser(interpolation=None)
+        try:
+            parser.read_string(content, path)
+        except configparser.Error as error:
+            raise ValueError(f"Invalid {file_kind} {path}: {error}") from error
+        return {name: dict(parser[name]) for name in parser.sections()}
+
+    try:
+        import tomllib
+    except ImportError:
+        # tomllib was added in python 3.11, and tomli is the same parser for older versions.
+        try:
+            import tomli as tomllib
+        except ImportError:
+            raise ValueError(f"Reading the TOML {file_kind} {path} requires python 3.11 or the tomli package") from None
+
+    try:
+        tables = tomllib.loads(content)
+    except tomllib.TOMLDecodeError as error:
+        raise ValueError(f"Invalid {file_kind} {path}: {error}") from error
+    for name, fields in tables.items():
+        if not isinstance(fields, dict):
+            raise ValueError(f"Invalid {table_kind} {name} in {path}: each {table_kind} must be a table")
+    return tables
+
+
+def _is_qualified_name(name: str, min_parts: int = 1) -> bool:
+    parts = name.split(".")
+    return len(parts) >= min_parts and all(part.isidentifier() for part in parts)
+
+
+def _validate_rule(path: str, code: str, fields: Dict[str, str]) -> int:
+    """
+    Args:
+        path (str): The path of the rule file.
+        code (str): The code of the rule, like SIX101.
+        fields (Dict[str, str]): The fields of the rule.
+
+    Returns:
+        int: The error number of the rule.
+
+    Raises:
+        ValueError: If the rule is invalid.
+    """
+    match = RULE_CODE_PATTERN.fullmatch(code)
+    if match is None:
+        raise ValueError(f"Invalid rule code {code} in {path}: codes must look like {SIXErrorInfo.error_prefix}101")
+    error_number = int(match.group(1))
+    if error_number < MIN_RULE_ERROR_NUMBER or error_number in ALL_ERROR_NUMBERS:
+        raise ValueError(
+            f"Invalid rule code {code} in {path}: the codes below "
+            f"{SIXErrorInfo.error_prefix}{MIN_RULE_ERROR_NUMBER} are reserved for the built-in checkers"
+        )
+
+    unknown_fields = set(fields) - set(RULE_FIELDS)
+    missing_fields = [field for field in RULE_FIELDS if not isinstance(fields.get(field), str)]
+    if unknown_fields or missing_fields:
+        raise ValueError(
+            f"Invalid rule {code} in {path}: each rule must have exactly the string fields {', '.join(RULE_FIELDS)}"
+        )
+
+    kind, name = fields["kind"], fields["name"]
+    if kind not in RULE_KIND_NODE_NAMES:
+        raise ValueError(f"Invalid rule {code} in {path}: kind must be one of {', '.join(RULE_KIND_NODE_NAMES)}")
+    if kind in ("call", "function"):
+        valid_name = name.isidentifier()
+    else:
+        valid_name = _is_qualified_name(name, min_parts=2 if kind == "attribute" else 1)
+    if not valid_name:
+        raise ValueError(f"Invalid rule {code} in {path}: {name!r} is not a valid {kind} name")
+    return error_number
+
+
+def _create_rule_checker(code: str, error_number: int, kind: str, name: str, message: str) -> SixChecker:
+    """
+    Create the checker of a single rule, as a subclass of the checker family of its kind - so it is compiled into the
+    same rule tables as the built-in checkers of the family.
+
+    Args:
+        code (str): The code of the rule.
+        error_number (int): The error number of the rule.
+        kind (str): The kind of the rule.
+        name (str): The banned name.
+        message (str): The message of the reported errors.
+
+    Returns:
+        SixChecker: The checker class, registered under the error number of the rule.
+    """
+    # The checker families are imported only when a rule file is compiled.
+    from flake8_six_compatablity_plugin.six_checkers.deprecated_import_checkers import (
+        UnallowedAttributesModuleAccessChecker,
+        UnallowedModuleImportChecker,
+    )
+    from flake8_six_compatablity_plugin.six_checkers.unallowed_name_checkers import (
+        CallFuncionNameNotAllowedChecker,
+        FuncionDefNameNotAllowedChecker,
+    )
+
+    if kind == "call":
+        base, dct = CallFuncionNameNotAllowedChecker, {"unallowed_name": name}
+    elif kind == "function":
+        base, dct = FuncionDefNameNotAllowedChecker, {"unallowed_name": name}
+    elif kind == "attribute":
+        module_name, _, attribute = name.rpartition(".")
+        base = UnallowedAttributesModuleAccessChecker
+        dct = {"module_name": module_name, "module_attributes": (attribute,)}
+    else:
+        base, dct = UnallowedModuleImportChecker, {"module_name": name}
+
+    class_name = f"{kind.capitalize()}Rule{code}"
+    dct.update(
+        __module__=__name__,
+        __qualname__=class_name,
+        error_number=error_number,
+        error_message=message,
+        node_names=RULE_KIND_NODE_NAMES[kind],
+    )
+    return type(base)(class_name, (base,), dct)
+
+
+@functools.lru_cache(maxsize=RULE_FILES_CACHE_SIZE)
+def _compile_rule_file(path: str, modification_time: int, size: int) -> RuleSet:
+    with open(path, "rb") as rule_file:
+        content = rule_file.read()
+
+    checkers = []
+    for code, fields in read_tables(path, content.decode("utf-8")).items():
+        error_number = _validate_rule(path, code, fields)
+        checkers.append(
+            _create_rule_checker(code, error_number, fields["kind"], fields["name"], fields["message"])
+        )
+    return RuleSet(frozenset(checkers), hashlib.sha256(content).hexdigest())
+
+
+def load_rule_file(path: str) -> RuleSet:
+    """
+    Compile the rules of the given file into checkers.
+
+    Each rule is a TOML table or an INI section named by its stable code (SIX100 and up), with the fields:
+    - kind: call, attribute, import or function.
+    - name: the banned name - a called name, a module attribute like "os.getcwdu", a module or module attribute
+      like "cPickle" or "urllib.urlencode", or a function or method name.
+    - message: the message of the reported errors.
+    The file is compiled once for each modification, so repeated loads - like those of flake8 -j workers - reuse it.
+
+    Args:
+        path (str): The path of the rule file.
+
+    Returns:
+        RuleSet: The checkers of the rules, and the signature of the file.
+
+    Raises:
+        ValueError: If the file has an invalid rule.
+    """
+    path = os.path.realpath(path)
+    stat = os.stat(path)
+    with RULE_FILES_LOCK:
+        return _compile_rule_file(path, stat.st_mtime_ns, stat.st_size)
+
+
+def add_rule_checkers(node_checkers: Dict[str, tuple], checkers: Iterable[SixChecker]) -> Dict[str, tuple]:
+    """
+    Args:
+        node_checkers (Dict[str, tuple]): A dictionary that maps between the node name and the checkers to run.
+        checkers (Iterable[SixChecker]): Checkers, out of which those that set node_names are added.
+
+    Returns:
+        Dict[str, tuple]: The given node_checkers, where the added checkers run after the checkers of each of their
+            node_names, by the order of their error numbers.
+    """
+    rule_checkers = sorted(
+        (checker for checker in checkers if checker.node_names), key=lambda checker: checker.error_number
+    )
+    if not rule_checkers:
+        return node_checkers
+
+    node_checkers = dict(node_checkers)
+    for checker in rule_checkers:
+        for node_name in checker.node_names:
+            node_checkers[node_name] = tuple(node_checkers.get(node_name, ())) + (checker,)
+    return node_checkers
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+import ast
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from flake8_six_compatablity_plugin.six_checkers.six_error_buffer import SixErrorBuffer
+
+CheckMethod = Callable[[ast.AST, SixErrorBuffer], None]
+RuleKeyFunction = Callable[[ast.AST], Hashable]
+
+
+def called_name(node: ast.Call) -> Optional[str]:
+    """
+    Args:
+        node (ast.Call): The call.
+
+    Returns:
+        Optional[str]: The name of the called function, or None if it is not called by its name.
+    """
+    func = node.func
+    return func.id if type(func) is ast.Name else None
+
+
+def defined_name(node: ast.AST) -> str:
+    """
+    Args:
+        node (ast.AST): A function or class definition.
+
+    Returns:
+        str: The defined name.
+    """
+    return node.name
+
+
+def attribute_name(node: ast.Attribute) -> str:
+    """
+    Args:
+        node (ast.Attribute): The attribute.
+
+    Returns:
+        str: The name of the accessed attribute.
+    """
+    return node.attr
+
+
+def imported_module(node: ast.ImportFrom) -> Optional[str]:
+    """
+    Args:
+        node (ast.ImportFrom): The import.
+
+    Returns:
+        Optional[str]: The name of the module the names are imported from, or None for relative imports.
+    """
+    return node.module if node.level == 0 else None
+
+
+def multiple_rule_keys(rule_key_of: RuleKeyFunction) -> RuleKeyFunction:
+    """
+    Mark the given rule key function as returning a tuple of all of the keys of a node, instead of a single key.
+
+    Args:
+        rule_key_of (RuleKeyFunction): A function that returns the distinct keys of a node, in a stable order.
+
+    Returns:
+        RuleKeyFunction: The given function.
+    """
+    rule_key_of.multiple_rule_keys = True
+    return rule_key_of
+
+
+@multiple_rule_keys
+def imported_names(node: ast.stmt) -> Tuple[str, ...]:
+    """
+    Args:
+        node (ast.stmt): An ast.Import or ast.ImportFrom.
+
+    Returns:
+        Tuple[str, ...]: The qualified names of the imported modules and attributes, and of the packages they are in.
+            Relative imports have no names.
+    """
+    if isinstance(node, ast.ImportFrom):
+        if node.level != 0 or not node.module:
+            return ()
+        qualified_names = [node.module]
+        qualified_names.extend(f"{node.module}.{alias.name}" for alias in node.names if alias.name != "*")
+    else:
+        qualified_names = [alias.name for alias in node.names]
+
+    names = {}
+    for qualified_name in qualified_names:
+        parts = qualified_name.split(".")
+        for index in range(1, len(parts) + 1):
+            names[".".join(parts[:index])] = None
+    return tuple(names)
+
+
+def _create_keyed_check(rule_key_of: RuleKeyFunction, rule_table: Dict[Hashable, Tuple[CheckMethod]]) -> CheckMethod:
+    """
+    Args:
+        rule_key_of (RuleKeyFunction): The function that returns the key of a node, or all of its keys if it was
+            marked with multiple_rule_keys.
+        rule_table (Dict[Hashable, Tuple[CheckMethod]]): The check methods to run on the nodes of each key.
+
+    Returns:
+        CheckMethod: A check method that runs only the check methods of the keys of the checked node.
+    """
+    if getattr(rule_key_of, "multiple_rule_keys", False):
+
+        def check(node: ast.AST, errors: SixErrorBuffer) -> None:
+            for rule_key in rule_key_of(node):
+                checks = rule_table.get(rule_key)
+                if checks is not None:
+                    for check in checks:
+                        check(node, errors)
+
+        return check
+
+    def check(node: ast.AST, errors: SixErrorBuffer) -> None:
+        checks = rule_table.get(rule_key_of(node))
+        if checks is not None:
+            for check in checks:
+                check(node, errors)
+
+    return check
+
+
+def compile_checks(checkers: Sequence) -> Tuple[CheckMethod, ...]:
+    """
+    Compile the checkers of a single node type into the check methods to run on each node.
+
+    The checkers that share a rule_key_of are compiled into a single check, that looks up the key of the node in a
+    table of their rule_keys - so a node runs only the checkers of its key, no matter how many keys there are.
+    The compiled check runs where the first of its checkers would, and the checkers of each key keep their order.
+    When rule_key_of is marked with multiple_rule_keys, the checkers of each key of the node run, once per key.
+
+    Args:
+        checkers (Sequence): The checkers of the node type, in the order they run.
+
+    Returns:
+        Tuple[CheckMethod, ...]: The check methods to run on each node of the type.
+    """
+    checks = []
+    rule_tables: Dict[RuleKeyFunction, Dict[Hashable, List[CheckMethod]]] = {}
+    for checker in checkers:
+        rule_key_of = getattr(checker, "rule_key_of", None)
+        if rule_key_of is None:
+            checks.append(checker.check)
+            continue
+
+        rule_table = rule_tables.get(rule_key_of)
+        if rule_table is None:
+            rule_table = rule_tables[rule_key_of] = {}
+            checks.append(_create_keyed_check(rule_key_of, rule_table))
+        for rule_key in checker.rule_keys:
+            rule_table.setdefault(rule_key, []).append(checker.check)
+
+    for rule_table in rule_tables.values():
+        for rule_key, rule_checks in rule_table.items():
+            rule_table[rule_key] = tuple(rule_checks)
+    return tuple(checks)
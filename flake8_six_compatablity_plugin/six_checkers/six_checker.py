@@ -1,9 +1,18 @@
 #!/usr/bin/env python3
 import ast
 import abc
-from typing import Iterable
+import threading
+import tokenize
+from typing import TYPE_CHECKING, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
 
 from flake8_six_compatablity_plugin.flake8_errors_info import SIXErrorInfo
+from flake8_six_compatablity_plugin.six_checkers.checker_manifest import CHECKERS as MANIFEST_CHECKERS
+
+if TYPE_CHECKING:
+    from flake8_six_compatablity_plugin.six_checkers.six_error_buffer import SixErrorBuffer
+    from flake8_six_compatablity_plugin.six_checkers.source_edits import FixSource, SourceEdit
+
+READ_ONLY_CHECKER_MESSAGE = "{}.{} is read only - checkers can not be changed once they are created"
 
 
 def _should_update_error_counter(bases: Iterable[type]) -> bool:
@@ -27,22 +36,57 @@ class SixCheckerMeta(abc.ABCMeta):
     This metaclass gives each checker that inherits it a unique error_number
     The given error_number will shown when an error occured.
 
+    The error_number of a checker that is listed in the checker manifest is taken from the manifest, so it does not
+    depend on the order the checker modules are imported in. A checker that defines its own error_number, like the
+    checkers compiled from rule files, keeps it. Any other checker gets the next free error_number.
+
     Any class that will be the first to use this metaclass will not get an error_number.
     Any class that inherits abc.ABC will not get an error_number.
+    Every class that gets an error_number is registered in registered_checkers under it.
+
+    The error numbers are given and registered under a lock, since rule files may be compiled by several threads.
+    The attributes of a checker can only be set while it is created - including in __init_subclass__ - and are
+    read only after that, so the checkers can be shared by threads that check files in parallel.
     """
 
-    _error_number_counter = 1
+    _manifest_error_numbers: Dict[Tuple[str, str], int] = {
+        (module, class_name): error_number
+        for error_number, module, class_name, _, _ in MANIFEST_CHECKERS
+    }
+    _error_number_counter = max(_manifest_error_numbers.values(), default=0) + 1
+    registered_checkers: Dict[int, type] = {}
+    _registration_lock = threading.RLock()
 
     def __new__(cls, name, bases, dct):
-        if _should_update_error_counter(bases):
-            error_number = cls._error_number_counter
-            cls._error_number_counter += 1
-        else:
-            error_number = 0
-
-        self = type.__new__(cls, name, bases, dct)
-        self.error_number = error_number
-        return self
+        with cls._registration_lock:
+            if not _should_update_error_counter(bases):
+                error_number = 0
+            elif (dct.get("__module__"), dct.get("__qualname__", name)) in cls._manifest_error_numbers:
+                error_number = cls._manifest_error_numbers[dct.get("__module__"), dct.get("__qualname__", name)]
+            elif "error_number" in dct:
+                error_number = dct["error_number"]
+            else:
+                while SixCheckerMeta._error_number_counter in cls.registered_checkers:
+                    SixCheckerMeta._error_number_counter += 1
+                error_number = SixCheckerMeta._error_number_counter
+                SixCheckerMeta._error_number_counter += 1
+
+            self = type.__new__(cls, name, bases, dct)
+            self.error_number = error_number
+            type.__setattr__(self, "_sealed", True)
+            if error_number:
+                cls.registered_checkers[error_number] = self
+            return self
+
+    def __setattr__(cls, name, value):
+        if "_sealed" in cls.__dict__:
+            raise AttributeError(READ_ONLY_CHECKER_MESSAGE.format(cls.__name__, name))
+        super().__setattr__(name, value)
+
+    def __delattr__(cls, name):
+        if "_sealed" in cls.__dict__:
+            raise AttributeError(READ_ONLY_CHECKER_MESSAGE.format(cls.__name__, name))
+        super().__delattr__(name)
 
 
 class SixChecker(metaclass=SixCheckerMeta):
@@ -51,21 +95,69 @@ class SixChecker(metaclass=SixCheckerMeta):
 
     Make sure to override error_message with the relevant error_message.
     Make sure *not* to override error_number, unless a specific error number is wanted.
+
+    triggers are the tokens that must appear in the source for the checker to find any error, and are used to skip
+    checkers without walking the tree. Identifiers are matched as whole words, and any other token as a substring.
+    Leave it as None if the checker can find errors in any source.
+
+    Set uses_symbol_index if the checker resolves names using errors.symbols, so the SymbolIndexer runs in the
+    walks the checker runs in.
+
+    If the checker can only find errors in nodes with given keys - like the name of a called function - set
+    rule_key_of to the function that returns the key of a node, and rule_keys to those keys. The checkers of a node
+    type that share a rule_key_of are compiled into a single lookup, so only the checkers of the node key run.
+
+    Checkers that are not listed in the checker manifest, like the ones compiled from rule files, set node_names to
+    the names of the nodes they run on. They run after the manifest checkers of each node.
+
+    Checkers whose errors have a mechanical fix set fixable, and implement fix - which is called with each node the
+    checker found errors in.
     """
 
     error_message = ""
-
-    def check(cls, node: ast.stmt, errors: list[SIXErrorInfo]) -> None:
+    triggers: Optional[Tuple[str, ...]] = None
+    uses_symbol_index = False
+    rule_key_of: Optional[Callable[[ast.AST], Hashable]] = None
+    rule_keys: Tuple[Hashable, ...] = ()
+    node_names: Tuple[str, ...] = ()
+    fixable = False
+
+    def check(cls, node: ast.stmt, errors: "SixErrorBuffer") -> None:
         """
         Check that the given node is valid.
         If it is not valid, create the relevant error info and update errors.
 
         Args:
             node (ast.stmt): The ast statement to check
-            errors (list[SIXErrorInfo]): The error to be updated with found errors.
+            errors (SixErrorBuffer): The error to be updated with found errors.
         """
         raise NotImplementedError("Subclass Checker must implement the check method!")
 
+    @classmethod
+    def fix(cls, node: ast.AST, source: "FixSource") -> List["SourceEdit"]:
+        """
+        Create the edits that fix the errors the checker found in the given node.
+
+        Args:
+            node (ast.AST): The node the checker found errors in.
+            source (FixSource): The source of the node.
+
+        Returns:
+            List[SourceEdit]: The edits that fix the errors, or no edits if they can not be fixed mechanically.
+        """
+        raise NotImplementedError("Fixable Checker must implement the fix method!")
+
+    @classmethod
+    def _add_six_error(cls, node: ast.AST, errors: "SixErrorBuffer") -> None:
+        """add an error for the given node to the given errors, without creating its error info.
+        The error info is created only when the errors are reported, with the defined error_message.
+
+        Args:
+            node (ast.AST): the ast node that caused the error.
+            errors (SixErrorBuffer): The errors to be updated.
+        """
+        errors.add(node.lineno, node.col_offset, cls.error_number)
+
     @classmethod
     def _create_six_error(cls, node: ast.stmt) -> SIXErrorInfo:
         """create the given error info based on the given node.
@@ -81,3 +173,23 @@ class SixChecker(metaclass=SixCheckerMeta):
         return SIXErrorInfo(
             node.lineno, node.col_offset, cls.error_number, cls.error_message, cls
         )
+
+
+class SixTokenChecker(SixChecker, abc.ABC):
+    """
+    The base class for six checkers that check the tokens of the whole file, instead of a single ast node.
+
+    The tokens are the ones flake8 already produced for the file, so the file is not tokenized again.
+    Token checkers are not run by the node visitors - they are listed in TOKEN_CHECKERS, and run by the plugin.
+    """
+
+    def check(cls, tokens: Iterable[tokenize.TokenInfo], errors: "SixErrorBuffer") -> None:
+        """
+        Check that the given tokens are valid.
+        If they are not valid, create the relevant error info and update errors.
+
+        Args:
+            tokens (Iterable[tokenize.TokenInfo]): The tokens of the whole file.
+            errors (SixErrorBuffer): The error to be updated with found errors.
+        """
+        raise NotImplementedError("Subclass Checker must implement the check method!")
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+import ast
+import functools
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+from flake8_six_compatablity_plugin.six_checkers.checker_loader import (
+    ALL_ERROR_NUMBERS,
+    MANIFEST_NODE_CHECKERS,
+    load_checker,
+    load_checkers,
+)
+from flake8_six_compatablity_plugin.six_checkers.rule_file import add_rule_checkers
+from flake8_six_compatablity_plugin.six_checkers.rule_table import CheckMethod, compile_checks
+from flake8_six_compatablity_plugin.six_checkers.six_checker import SixChecker
+from flake8_six_compatablity_plugin.six_checkers.six_error_buffer import SixErrorBuffer
+from flake8_six_compatablity_plugin.six_checkers.symbol_index import add_symbol_indexer
+
+
+def _ast_node_types() -> Dict[str, type]:
+    """
+    Returns:
+        Dict[str, type]: A dictionary that maps between the ast node names and the ast node types.
+    """
+    return {
+        name: node_type
+        for name, node_type in vars(ast).items()
+        if isinstance(node_type, type) and issubclass(node_type, ast.AST)
+    }
+
+
+def create_dispatch_table(
+    node_checkers: Dict[str, Tuple[SixChecker]]
+) -> Dict[type, Tuple[CheckMethod]]:
+    """
+    Create the dispatch table from the given node_checkers.
+    The checkers of each node are compiled with compile_checks, so checkers that are keyed by the same property of the
+    node cost a single lookup.
+    Node names that do not exist in the running python version are skipped, since no such node can be parsed.
+
+    Args:
+        node_checkers (Dict[str, Tuple[SixChecker]]): A dictionary that maps between the node name and the checkers to run.
+
+    Returns:
+        Dict[type, Tuple[CheckMethod]]: A dictionary that maps between the node type and the check methods to run.
+    """
+    node_types = _ast_node_types()
+    return {
+        node_types[node_name]: compile_checks(checkers)
+        for node_name, checkers in node_checkers.items()
+        if node_name in node_types
+    }
+
+
+DISPATCH_TABLES_CACHE_SIZE = 256
+
+# The categories of the nodes that may appear in the tree of an expression - the tree of any of them has only nodes of
+# these categories. Type parameters were added in python 3.12, and only have expressions in them.
+EXPRESSION_NODE_CATEGORIES = tuple(
+    getattr(ast, category_name)
+    for category_name in (
+        "expr",
+        "expr_context",
+        "boolop",
+        "operator",
+        "unaryop",
+        "cmpop",
+        "comprehension",
+        "keyword",
+        "arguments",
+        "arg",
+        "withitem",
+        "type_param",
+    )
+    if hasattr(ast, category_name)
+)
+# The categories of the patterns of match statements, which have only patterns and expressions in them.
+PATTERN_NODE_CATEGORIES = (ast.pattern,) if hasattr(ast, "pattern") else ()
+# The categories of the nodes that contain statements, or are a part of a statement without expressions in them.
+STATEMENT_NODE_CATEGORIES = tuple(
+    getattr(ast, category_name)
+    for category_name in ("mod", "stmt", "excepthandler", "alias", "match_case", "type_ignore")
+    if hasattr(ast, category_name)
+)
+
+
+@functools.lru_cache(maxsize=1)
+def all_checkers() -> FrozenSet[SixChecker]:
+    """
+    Returns:
+        FrozenSet[SixChecker]: All of the checkers in the manifest. This imports all of the checker modules.
+    """
+    return load_checkers(ALL_ERROR_NUMBERS)
+
+
+@functools.lru_cache(maxsize=DISPATCH_TABLES_CACHE_SIZE)
+def node_checkers_for(checkers: FrozenSet[SixChecker]) -> Dict[str, Tuple[SixChecker]]:
+    """
+    Find the checkers to run on each node, out of the given checkers.
+    The checkers of each node keep their order in the checker manifest, which is the order of
+    SixCompatibilityNodeVisitor.node_checkers. Only the modules of the given checkers are imported.
+    The checkers that are not in the manifest, like the checkers of a rule file, run after them on their node_names.
+    If any of the checkers uses the symbol index, the SymbolIndexer runs first on the nodes it indexes.
+
+    Args:
+        checkers (FrozenSet[SixChecker]): The checkers to run.
+
+    Returns:
+        Dict[str, Tuple[SixChecker]]: A dictionary that maps between the node name and the checkers to run.
+    """
+    error_numbers = {checker.error_number for checker in checkers}
+    node_checkers = {}
+    for node_name, node_error_numbers in MANIFEST_NODE_CHECKERS.items():
+        enabled_checkers = tuple(
+            load_checker(error_number)
+            for error_number in node_error_numbers
+            if error_number in error_numbers
+        )
+        if enabled_checkers:
+            node_checkers[node_name] = enabled_checkers
+    return add_symbol_indexer(add_rule_checkers(node_checkers, checkers))
+
+
+def descended_node_types(node_types: Iterable[type]) -> Tuple[type, ...]:
+    """
+    Find the categories of the nodes that the walk must descend into, so it finds every node of the given types.
+
+    Args:
+        node_types (Iterable[type]): The types of the nodes that have checkers.
+
+    Returns:
+        Tuple[type, ...]: The statements only, when all of the node types are statements. The statements and the
+            patterns, when none of them is a part of an expression. Any node otherwise.
+    """
+    node_types = tuple(node_types)
+    if all(issubclass(node_type, STATEMENT_NODE_CATEGORIES) for node_type in node_types):
+        return STATEMENT_NODE_CATEGORIES
+    if all(issubclass(node_type, STATEMENT_NODE_CATEGORIES + PATTERN_NODE_CATEGORIES) for node_type in node_types):
+        return STATEMENT_NODE_CATEGORIES + PATTERN_NODE_CATEGORIES
+    return (ast.AST,)
+
+
+@functools.lru_cache(maxsize=DISPATCH_TABLES_CACHE_SIZE)
+def descended_node_types_for(checkers: FrozenSet[SixChecker]) -> Tuple[type, ...]:
+    """
+    Args:
+        checkers (FrozenSet[SixChecker]): The checkers to run.
+
+    Returns:
+        Tuple[type, ...]: The categories of the nodes the walk of the given checkers must descend into.
+    """
+    return descended_node_types(dispatch_table_for(checkers))
+
+
+@functools.lru_cache(maxsize=DISPATCH_TABLES_CACHE_SIZE)
+def dispatch_table_for(checkers: FrozenSet[SixChecker]) -> Dict[type, Tuple[CheckMethod]]:
+    """
+    Create the dispatch table that runs only the given checkers.
+
+    Args:
+        checkers (FrozenSet[SixChecker]): The checkers to run.
+
+    Returns:
+        Dict[type, Tuple[CheckMethod]]: A dictionary that maps between the node type and the check methods to run.
+    """
+    return create_dispatch_table(node_checkers_for(checkers))
+
+
+class SixCompatibilityDispatcher:
+    """
+    An iterative, type indexed alternative to the SixCompatibilityNodeVisitor.
+
+    The checkers of each node are found with a single lookup of the node type in the dispatch table, which is
+    computed once from the checker manifest.
+    The tree is walked using an explicit stack instead of recursion, so deep trees are not limited by the recursion
+    limit. The nodes are visited in the same order as ast.NodeVisitor, so the errors are identical to the visitor's.
+    The walk does not descend into expressions - or into the patterns of match statements - when none of the checkers
+    runs on a node that can be in them, like when only the statement checkers are enabled.
+    """
+
+    def __init__(
+        self,
+        checkers: Optional[FrozenSet[SixChecker]] = None,
+        dispatch_table: Optional[Dict[type, Tuple[CheckMethod]]] = None,
+        max_errors: int = 0,
+    ):
+        """
+        Args:
+            checkers (FrozenSet[SixChecker]): The checkers to run. Defaults to all of the checkers.
+            dispatch_table (Optional[Dict[type, Tuple[CheckMethod]]]): A dispatch table to use instead of the one
+                of the given checkers, for example one with instrumented check methods.
+            max_errors (int): The number of errors after which the walk is stopped. 0 for no limit.
+        """
+        self.errors = SixErrorBuffer(max_errors)
+        if dispatch_table is None:
+            checkers = all_checkers() if checkers is None else checkers
+            dispatch_table = dispatch_table_for(checkers)
+            self._descended_node_types = descended_node_types_for(checkers)
+        else:
+            self._descended_node_types = descended_node_types(dispatch_table)
+        self._dispatch_table = dispatch_table
+
+    def visit(self, tree: ast.AST) -> None:
+        """
+        Walk the given tree and run the checkers of each node.
+
+        Args:
+            tree (ast.AST): The tree to check.
+        """
+        dispatch_table = self._dispatch_table
+        descended_node_types = self._descended_node_types
+        errors = self.errors
+        reversed_fields = {}
+        stack = [tree]
+        pop = stack.pop
+        push = stack.append
+
+        while stack:
+            node = pop()
+            node_type = type(node)
+
+            checks = dispatch_table.get(node_type)
+            if checks:
+                for check in checks:
+                    check(node, errors)
+
+            # The children are pushed in reverse, so they are popped in the order generic_visit visits them.
+            fields = reversed_fields.get(node_type)
+            if fields is None:
+                fields = reversed_fields[node_type] = tuple(reversed(node_type._fields))
+
+            for field in fields:
+                value = getattr(node, field, None)
+                if isinstance(value, list):
+                    for item in reversed(value):
+                        if isinstance(item, descended_node_types):
+                            push(item)
+                elif isinstance(value, descended_node_types):
+                    push(value)
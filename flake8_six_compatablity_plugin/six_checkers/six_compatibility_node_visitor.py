@@ -1,9 +1,15 @@
 #!/usr/bin/env python3
 import ast
-from typing import Dict, Tuple, Iterable
-
-from flake8_six_compatablity_plugin.flake8_errors_info import SIXErrorInfo
-from flake8_six_compatablity_plugin.six_checkers.six_checker import SixChecker
+import functools
+from typing import Dict, FrozenSet, Optional, Tuple, Iterable
+
+from flake8_six_compatablity_plugin.six_checkers.checker_loader import select_node_checkers
+from flake8_six_compatablity_plugin.six_checkers.rule_file import add_rule_checkers
+from flake8_six_compatablity_plugin.six_checkers.rule_table import compile_checks
+from flake8_six_compatablity_plugin.six_checkers.six_checker import SixChecker, SixTokenChecker
+from flake8_six_compatablity_plugin.six_checkers.six_compatibility_dispatcher import descended_node_types
+from flake8_six_compatablity_plugin.six_checkers.six_error_buffer import SixErrorBuffer
+from flake8_six_compatablity_plugin.six_checkers.symbol_index import add_symbol_indexer
 from flake8_six_compatablity_plugin.six_checkers.enforcements_checkers import (
     OpenEncodingChecker,
     OpenCallValidChecker,
@@ -54,6 +60,8 @@ from flake8_six_compatablity_plugin.six_checkers.unallowed_statements_checker im
 
 
 NODE_VISITOR_VISIT_METHOD_FORMAT = "visit_{}"
+# The checkers that check the tokens of the whole file. They are run by the plugin, after the tree is walked.
+TOKEN_CHECKERS: Tuple[SixTokenChecker] = (UnspecifiedStringPrefix,)
 
 
 def _create_visit_method(checkers: Iterable[SixChecker]) -> callable:
@@ -65,10 +73,11 @@ def _create_visit_method(checkers: Iterable[SixChecker]) -> callable:
     Returns:
         callable: A visit method that runs the check function on all the given checkers and calls generic_visit at the end.
     """
+    checks = compile_checks(checkers)
 
     def visit(self: ast.NodeVisitor, node: ast.stmt) -> None:
-        for checker in checkers:
-            checker.check(node, self.errors)
+        for check in checks:
+            check(node, self.errors)
 
         self.generic_visit(node)
 
@@ -93,11 +102,12 @@ def _add_node_checkers_to_methods(
 class NodeCheckerAdderMeta(type):
     """
     A metaclass that populates all of the ast Node Visitor visit functions from the defined node_checkers.
+    The visit functions also run the SymbolIndexer, if any of the checkers uses the symbol index.
     """
 
     def __new__(cls, name, bases, dct):
         node_checkers = dct.get("node_checkers", {})
-        _add_node_checkers_to_methods(node_checkers, dct)
+        _add_node_checkers_to_methods(add_symbol_indexer(node_checkers), dct)
 
         return super().__new__(cls, name, bases, dct)
 
@@ -132,7 +142,7 @@ class SixCompatibilityNodeVisitor(ast.NodeVisitor, metaclass=NodeCheckerAdderMet
         ),
         "FunctionDef": (CoerceMethodNotAllowedChecker,),
         "ClassDef": (ClassInheritanceChecker, DivisionSpecialMethodsChecker),
-        "Constant": (UnspecifiedStringPrefix, EllipsisNotAllowedChecker),
+        "Constant": (EllipsisNotAllowedChecker,),
         "JoinedStr": (FStringsNotAllowedChecker,),
         "Await": (AwaitNotAllowedChecker,),
         "AsyncFunctionDef": (AsyncNotAllowedChecker,),
@@ -154,5 +164,79 @@ class SixCompatibilityNodeVisitor(ast.NodeVisitor, metaclass=NodeCheckerAdderMet
         "NameConstant": (NameConstantNotAllowed,),
     }
 
-    def __init__(self):
-        self.errors: list[SIXErrorInfo] = []
+    def __init__(self, max_errors: int = 0):
+        """
+        Args:
+            max_errors (int): The number of errors after which the walk is stopped. 0 for no limit.
+        """
+        self.errors = SixErrorBuffer(max_errors)
+
+
+def _create_generic_visit(descended_node_types: Tuple[type, ...]) -> callable:
+    """
+    Args:
+        descended_node_types (Tuple[type, ...]): The categories of the nodes to walk into.
+
+    Returns:
+        callable: A generic_visit method that visits only the children of the given categories.
+    """
+
+    def generic_visit(self: ast.NodeVisitor, node: ast.AST) -> None:
+        for _, value in ast.iter_fields(node):
+            if isinstance(value, list):
+                for item in value:
+                    if isinstance(item, descended_node_types):
+                        self.visit(item)
+            elif isinstance(value, descended_node_types):
+                self.visit(value)
+
+    return generic_visit
+
+
+def create_visitor_class(name: str, node_checkers: Dict[str, Tuple[SixChecker, ...]]) -> type:
+    """
+    Args:
+        name (str): The name of the class.
+        node_checkers (Dict[str, Tuple[SixChecker, ...]]): A dictionary that maps between the node name and the
+            checkers to run, instead of SixCompatibilityNodeVisitor.node_checkers.
+
+    Returns:
+        type: A SixCompatibilityNodeVisitor subclass that runs only the given checkers. The nodes that have no checkers
+            are only walked into, and the expressions and patterns are not walked into when none of the given checkers
+            runs on them.
+    """
+    node_types = [
+        getattr(ast, node_name) for node_name in add_symbol_indexer(node_checkers) if hasattr(ast, node_name)
+    ]
+    descended = descended_node_types(node_types)
+    generic_visit = ast.NodeVisitor.generic_visit if descended == (ast.AST,) else _create_generic_visit(descended)
+    dct = {
+        NODE_VISITOR_VISIT_METHOD_FORMAT.format(node_name): generic_visit
+        for node_name in SixCompatibilityNodeVisitor.node_checkers
+        if node_name not in node_checkers
+    }
+    dct["generic_visit"] = generic_visit
+    dct["node_checkers"] = node_checkers
+    return type(SixCompatibilityNodeVisitor)(name, (SixCompatibilityNodeVisitor,), dct)
+
+
+@functools.lru_cache(maxsize=None)
+def visitor_class_for(
+    rule_checkers: FrozenSet[SixChecker], enabled_error_numbers: Optional[FrozenSet[int]] = None
+) -> type:
+    """
+    Args:
+        rule_checkers (FrozenSet[SixChecker]): The checkers of a rule file, to run along with all of the checkers.
+        enabled_error_numbers (Optional[FrozenSet[int]]): The error numbers of the enabled checkers, or None if all
+            of the checkers are enabled.
+
+    Returns:
+        type: A SixCompatibilityNodeVisitor subclass that runs the rule checkers as well, and has visit methods only
+            for the nodes of the enabled checkers.
+    """
+    if not rule_checkers and enabled_error_numbers is None:
+        return SixCompatibilityNodeVisitor
+    node_checkers = add_rule_checkers(SixCompatibilityNodeVisitor.node_checkers, rule_checkers)
+    return create_visitor_class(
+        "SelectedSixCompatibilityNodeVisitor", select_node_checkers(node_checkers, enabled_error_numbers)
+    )
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+from array import array
+from typing import Dict, FrozenSet, Iterator, Optional, Tuple
+
+from flake8_six_compatablity_plugin.flake8_errors_info import SIXErrorInfo
+from flake8_six_compatablity_plugin.six_checkers.checker_loader import load_checker
+from flake8_six_compatablity_plugin.six_checkers.six_checker import SixCheckerMeta
+from flake8_six_compatablity_plugin.six_checkers.symbol_index import SymbolIndex
+
+# Each error is packed as (line_number, offset, error_number).
+RECORD_SIZE = 3
+# Large enough for any line number, offset and error number.
+RECORD_TYPECODE = "q"
+
+
+class SixErrorLimitReached(Exception):
+    """
+    Raised by SixErrorBuffer when the maximal number of errors was added, to stop the walk early.
+    """
+
+
+class SixErrorBuffer:
+    """
+    A compact buffer of the errors found while walking a single tree.
+
+    Each error is packed into an array as (line_number, offset, error_number), and is only turned into a SIXErrorInfo
+    when the buffer is iterated. The message of each checker is formatted once, and shared by all of its errors - it is
+    kept by the checker and not by its error number, since the checkers of a rule file may be compiled again.
+    When max_errors is set, adding the last allowed error raises SixErrorLimitReached - the errors added until then
+    are kept.
+
+    Since the buffer is passed to every check of the walk, it also holds the symbol index of the walked tree, the
+    facts of its classes that depend on the other files of the project, when they are known, and the options of the
+    checkers - so the checkers themselves are never changed, and can be shared by threads.
+    """
+
+    __slots__ = ("_records", "_max_records", "symbols", "class_hierarchy", "string_prefix_exemptions")
+
+    _messages: Dict[type, str] = {}
+
+    def __init__(self, max_errors: int = 0):
+        """
+        Args:
+            max_errors (int): The number of errors after which the walk is stopped. 0 for no limit.
+        """
+        self._records = array(RECORD_TYPECODE)
+        self._max_records = max_errors * RECORD_SIZE
+        self.symbols = SymbolIndex()
+        # The ClassFacts of each class of the walked file by its (line number, offset), set in project mode.
+        self.class_hierarchy: Optional[Dict[Tuple[int, int], tuple]] = None
+        # The strings SIX009 allows without a prefix, or None for the default exemptions of the checker.
+        self.string_prefix_exemptions: Optional[FrozenSet[str]] = None
+
+    def add(self, line_number: int, offset: int, error_number: int) -> None:
+        """
+        Add an error.
+
+        Args:
+            line_number (int): The line number the error was detected on.
+            offset (int): The column the error was detected on.
+            error_number (int): The error number of the checker that detected the error.
+
+        Raises:
+            SixErrorLimitReached: If max_errors errors were added.
+        """
+        records = self._records
+        records.extend((line_number, offset, error_number))
+        if len(records) == self._max_records:
+            raise SixErrorLimitReached()
+
+    def append(self, error: SIXErrorInfo) -> None:
+        """
+        Add an already created error.
+
+        Args:
+            error (SIXErrorInfo): The error to add.
+        """
+        self.add(error.line_number, error.offset, error.flake_cls.error_number)
+
+    def __len__(self) -> int:
+        return len(self._records) // RECORD_SIZE
+
+    def records(self, start: int = 0) -> Iterator[Tuple[int, int, int]]:
+        """
+        Args:
+            start (int): The index of the first error to return.
+
+        Yields:
+            Tuple[int, int, int]: The (line_number, offset, error_number) of each error.
+        """
+        records = self._records
+        for index in range(start * RECORD_SIZE, len(records), RECORD_SIZE):
+            yield records[index], records[index + 1], records[index + 2]
+
+    def __iter__(self) -> Iterator[SIXErrorInfo]:
+        checkers = SixCheckerMeta.registered_checkers
+        # The messages are shared by all of the buffers. Threads that format the same message store equal strings.
+        messages = self._messages
+        for line_number, offset, error_number in self.records():
+            checker = checkers.get(error_number) or load_checker(error_number)
+            msg = messages.get(checker)
+            if msg is None:
+                msg = messages[checker] = SIXErrorInfo(
+                    line_number, offset, error_number, checker.error_message, checker
+                ).msg
+            yield SIXErrorInfo._make((line_number, offset, msg, checker))
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+import ast
+import re
+from typing import List, NamedTuple, Optional
+
+# The line breaks the parser counts lines by.
+NEWLINE_PATTERN = re.compile(r"\r\n|\r|\n")
+
+
+class SourceEdit(NamedTuple):
+    """
+    A replacement of the text between two offsets of a source. An insertion starts and ends at the same offset.
+    """
+
+    start: int
+    end: int
+    text: str
+
+
+class FixSource:
+    """
+    The text and tree of a source that is being fixed.
+
+    The ast positions - line numbers and utf-8 byte offsets within the line, the same positions the errors are
+    reported at - are converted to offsets in the text, so an edit changes only the text it replaces.
+    Inserted lines use the line break of the source.
+    """
+
+    def __init__(self, text: str, tree: ast.Module):
+        """
+        Args:
+            text (str): The text of the source.
+            tree (ast.Module): The tree parsed from the text.
+        """
+        self.text = text
+        self.tree = tree
+        self._line_starts = [0] + [match.end() for match in NEWLINE_PATTERN.finditer(text)]
+        first_newline = NEWLINE_PATTERN.search(text)
+        self.newline = first_newline.group() if first_newline else "\n"
+
+    def line_start(self, line_number: int) -> int:
+        """
+        Args:
+            line_number (int): The line number. The line after the last line starts at the end of the text.
+
+        Returns:
+            int: The offset of the start of the line in the text.
+        """
+        if line_number > len(self._line_starts):
+            return len(self.text)
+        return self._line_starts[line_number - 1]
+
+    def offset(self, line_number: int, byte_offset: int) -> int:
+        """
+        Args:
+            line_number (int): The line number of an ast position.
+            byte_offset (int): The utf-8 byte offset of an ast position within its line.
+
+        Returns:
+            int: The offset of the position in the text.
+        """
+        line_start = self.line_start(line_number)
+        line = self.text[line_start : self.line_start(line_number + 1)]
+        if line.isascii():
+            return line_start + byte_offset
+        return line_start + len(line.encode("utf-8")[:byte_offset].decode("utf-8", "ignore"))
+
+    def node_start(self, node: ast.AST) -> int:
+        return self.offset(node.lineno, node.col_offset)
+
+    def node_end(self, node: ast.AST) -> int:
+        return self.offset(node.end_lineno, node.end_col_offset)
+
+    def indentation(self, line_number: int) -> str:
+        """
+        Args:
+            line_number (int): The line number.
+
+        Returns:
+            str: The whitespace the line starts with.
+        """
+        line_start = self.line_start(line_number)
+        line = self.text[line_start : self.line_start(line_number + 1)]
+        return line[: len(line) - len(line.lstrip(" \t"))]
+
+    def insert_lines(self, line_number: int, lines: List[str]) -> SourceEdit:
+        """
+        Args:
+            line_number (int): The line number the lines are inserted before.
+            lines (List[str]): The lines to insert, without line breaks.
+
+        Returns:
+            SourceEdit: The insertion of the given lines.
+        """
+        position = self.line_start(line_number)
+        text = "".join(line + self.newline for line in lines)
+        if position == len(self.text) and self.text and not NEWLINE_PATTERN.match(self.text[-1]):
+            # The last line of the source does not end with a line break.
+            text = self.newline + text
+        return SourceEdit(position, position, text)
+
+    def import_edit(self, module_name: str) -> Optional[SourceEdit]:
+        """
+        Args:
+            module_name (str): The name of the module to import.
+
+        Returns:
+            Optional[SourceEdit]: The insertion of an import of the module, after the docstring and the __future__
+                imports of the source, or None if the source already imports it.
+        """
+        body = self.tree.body
+        for statement in body:
+            if isinstance(statement, ast.Import) and any(
+                alias.asname is None and alias.name.partition(".")[0] == module_name for alias in statement.names
+            ):
+                return None
+
+        index = 0
+        if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant):
+            if isinstance(body[0].value.value, str):
+                index = 1
+        while index < len(body) and isinstance(body[index], ast.ImportFrom) and body[index].module == "__future__":
+            index += 1
+
+        if index:
+            line_number = body[index - 1].end_lineno + 1
+        elif body:
+            # The first line of a decorated definition is the line of its first decorator.
+            line_number = min(
+                [body[0].lineno] + [decorator.lineno for decorator in getattr(body[0], "decorator_list", ())]
+            )
+        else:
+            line_number = len(self._line_starts) + 1
+        return self.insert_lines(line_number, [f"import {module_name}"])
@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+import ast
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# The kinds of the scopes. A block is a statement whose body may not run, like an if, which is not a scope of its own
+# but makes the bindings in it conditional.
+FUNCTION_SCOPE = 0
+CLASS_SCOPE = 1
+BLOCK = 2
+# The (start line, start column, end line, end column, kind) of a function, lambda, comprehension or class. None for
+# the module.
+Scope = Optional[Tuple[int, int, int, int, int]]
+# A change of the index: (name, qualified name, scope). The qualified name is None for a name that was rebound to
+# something that is not an imported module or attribute.
+SymbolChange = Tuple[str, Optional[str], Scope]
+
+SCOPE_NODE_TYPES = (
+    ast.FunctionDef,
+    ast.AsyncFunctionDef,
+    ast.Lambda,
+    ast.ListComp,
+    ast.SetComp,
+    ast.DictComp,
+    ast.GeneratorExp,
+    ast.ClassDef,
+)
+FUNCTION_NODE_TYPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)
+COMPREHENSION_NODE_TYPES = (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+BINDING_DEFINITION_TYPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+LOOP_NODE_TYPES = (ast.For, ast.AsyncFor)
+BLOCK_NODE_TYPES = LOOP_NODE_TYPES + tuple(
+    getattr(ast, type_name) for type_name in ("If", "While", "Try", "TryStar", "Match") if hasattr(ast, type_name)
+)
+
+
+class SymbolIndex:
+    """
+    The names bound by the imports of a single file, and the qualified names of the modules and attributes they
+    refer to. It is populated while the file is walked, by the SymbolIndexer, before the checkers of each node run.
+
+    Only names bound by an import are tracked - assigning to them, defining a function or class with their name or
+    using them as an argument shadows them in the scope of the binding. Functions, lambdas, comprehensions and classes
+    are scopes, and are told apart by their position. As in python, the bindings of a class body are not seen by the
+    functions, comprehensions and classes in it. Bindings in the module or a class body that may not run, like those
+    in an if or a loop, do not shadow the name, so the uses after them are still checked. Any name that is not tracked
+    refers to the module of the same name.
+    For example, after "from os import path as p", p.join resolves to "os.path.join".
+    """
+
+    __slots__ = (
+        "changes",
+        "_bindings",
+        "_scopes",
+        "_state",
+        "_attribute",
+        "_attribute_name",
+        "_imports_node",
+        "_imports",
+    )
+
+    def __init__(self):
+        # Every change of the index, in the order it was made.
+        self.changes: List[SymbolChange] = []
+        self._bindings: Dict[str, List[Tuple[Scope, Optional[str]]]] = {}
+        # The scopes and blocks that were entered, outermost first. They are only removed once a later node is outside
+        # of them.
+        self._scopes: List[Tuple[int, int, int, int, int]] = []
+        self._state: Optional[tuple] = None
+        self._attribute = None
+        self._attribute_name: Optional[str] = None
+        self._imports_node = None
+        self._imports: Dict[str, List[ast.alias]] = {}
+
+    def bind(self, name: str, qualified_name: Optional[str], scope: Scope) -> None:
+        """
+        Bind the given name in the given scope.
+
+        Args:
+            name (str): The bound name.
+            qualified_name (Optional[str]): The module or module attribute the name refers to. None for anything else.
+            scope (Scope): The scope of the binding.
+        """
+        bindings = self._bindings.setdefault(name, [])
+        if scope is None:
+            bindings[:] = [binding for binding in bindings if binding[0] is not None]
+        bindings.append((scope, qualified_name))
+        self.changes.append((name, qualified_name, scope))
+        if scope is None or len(bindings) == 1:
+            self._state = None
+
+    def state(self) -> tuple:
+        """
+        Returns:
+            tuple: The tracked names and their module level bindings, which decide how the names of any later
+                module level statement resolve.
+        """
+        if self._state is None:
+            self._state = tuple(
+                sorted(
+                    (name, [qualified_name for scope, qualified_name in bindings if scope is None])
+                    for name, bindings in self._bindings.items()
+                )
+            )
+        return self._state
+
+    def _enclosing(self, line_number: int, offset: int) -> Iterator[Tuple[int, int, int, int, int]]:
+        """
+        Yields:
+            Tuple[int, int, int, int, int]: The scopes and blocks the given position is in, innermost first.
+        """
+        position = (line_number, offset)
+        scopes = self._scopes
+        while scopes and scopes[-1][2:4] < position:
+            scopes.pop()
+        for scope in reversed(scopes):
+            if scope[:2] <= position <= scope[2:4]:
+                yield scope
+
+    def _scope_of(self, line_number: int, offset: int) -> Scope:
+        for scope in self._enclosing(line_number, offset):
+            if scope[4] != BLOCK:
+                return scope
+        return None
+
+    def resolve(self, name: str, line_number: int, offset: int) -> Optional[str]:
+        """
+        Args:
+            name (str): The name to resolve.
+            line_number (int): The line number of the name.
+            offset (int): The column of the name.
+
+        Returns:
+            Optional[str]: The qualified name of the module or attribute the name refers to, or None if it does not
+                refer to an imported module or attribute.
+        """
+        bindings = self._bindings.get(name)
+        if bindings is None:
+            return name
+
+        position = (line_number, offset)
+        resolved_scope = None
+        resolved = name
+        innermost_scope = None
+        for scope, qualified_name in bindings:
+            if scope is None:
+                if resolved_scope is None:
+                    resolved = qualified_name
+            elif scope[:2] <= position <= scope[2:4] and (resolved_scope is None or scope >= resolved_scope):
+                if scope[4] == CLASS_SCOPE:
+                    # The bindings of a class body are only seen by the class body itself.
+                    if innermost_scope is None:
+                        innermost_scope = self._scope_of(line_number, offset)
+                    if scope != innermost_scope:
+                        continue
+                resolved_scope = scope
+                resolved = qualified_name
+        return resolved
+
+    def resolve_attribute(self, node: ast.Attribute) -> Optional[str]:
+        """
+        The result of the last given node is kept, so all of the checkers of an attribute share a single resolution.
+
+        Args:
+            node (ast.Attribute): The attribute to resolve.
+
+        Returns:
+            Optional[str]: The qualified name of the attribute, like "sys.exc_type", or None if it is not an
+                attribute of an imported module.
+        """
+        if node is self._attribute:
+            return self._attribute_name
+
+        attributes = [node.attr]
+        value = node.value
+        while isinstance(value, ast.Attribute):
+            attributes.append(value.attr)
+            value = value.value
+
+        qualified_name = None
+        if isinstance(value, ast.Name):
+            qualified_name = self.resolve(value.id, value.lineno, value.col_offset)
+            if qualified_name is not None:
+                qualified_name = ".".join([qualified_name] + attributes[::-1])
+
+        self._attribute = node
+        self._attribute_name = qualified_name
+        return qualified_name
+
+    def imports(self, node: ast.stmt) -> Dict[str, List[ast.alias]]:
+        """
+        Index the names bound by the given import, once for each import.
+
+        Args:
+            node (ast.stmt): An ast.Import or ast.ImportFrom.
+
+        Returns:
+            Dict[str, List[ast.alias]]: The aliases of the import, by the qualified name of the module or attribute
+                they import. The aliases of relative imports are not included.
+        """
+        if node is self._imports_node:
+            return self._imports
+
+        imports = {}
+        scope = self._scope_of(node.lineno, node.col_offset)
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                imports.setdefault(alias.name, []).append(alias)
+                if alias.asname is None:
+                    name = qualified_name = alias.name.partition(".")[0]
+                else:
+                    name, qualified_name = alias.asname, alias.name
+                self.bind(name, qualified_name, scope)
+        else:
+            for alias in node.names:
+                if alias.name == "*":
+                    continue
+                qualified_name = None
+                if node.level == 0 and node.module:
+                    qualified_name = f"{node.module}.{alias.name}"
+                    imports.setdefault(qualified_name, []).append(alias)
+                self.bind(alias.asname or alias.name, qualified_name, scope)
+
+        self._imports_node = node
+        self._imports = imports
+        return imports
+
+    def shadow(self, name: str, line_number: int, offset: int) -> None:
+        """
+        Rebind the given name, if it is tracked, to something that is not an imported module or attribute.
+        A binding in a function is local to the whole function, but a binding in the module or a class body that may
+        not run keeps the name bound as it was.
+
+        Args:
+            name (str): The bound name.
+            line_number (int): The line number of the binding.
+            offset (int): The column of the binding.
+        """
+        if name not in self._bindings:
+            return
+        conditional = False
+        for scope in self._enclosing(line_number, offset):
+            if scope[4] == BLOCK:
+                conditional = True
+            elif scope[4] == FUNCTION_SCOPE or not conditional:
+                self.bind(name, None, scope)
+                return
+            else:
+                return
+        if not conditional:
+            self.bind(name, None, None)
+
+    def scope_state(self, scope: Scope) -> tuple:
+        """
+        Args:
+            scope (Scope): A scope that was entered.
+
+        Returns:
+            tuple: The tracked names and their bindings in the given scope.
+        """
+        return tuple(
+            sorted(
+                (name, [qualified_name for binding_scope, qualified_name in bindings if binding_scope == scope])
+                for name, bindings in self._bindings.items()
+            )
+        )
+
+    def enter_scope(self, node: ast.AST) -> None:
+        """
+        Args:
+            node (ast.AST): A function, lambda, comprehension or class, whose bindings are local to it, or a block.
+        """
+        self._scope_of(node.lineno, node.col_offset)
+        self._scopes.append(node_scope(node))
+
+
+def node_scope(node: ast.AST) -> Tuple[int, int, int, int, int]:
+    """
+    Args:
+        node (ast.AST): A function, lambda, comprehension, class or block.
+
+    Returns:
+        Tuple[int, int, int, int, int]: The scope or block of the node.
+    """
+    if isinstance(node, ast.ClassDef):
+        kind = CLASS_SCOPE
+    elif isinstance(node, BLOCK_NODE_TYPES):
+        kind = BLOCK
+    else:
+        kind = FUNCTION_SCOPE
+    return (node.lineno, node.col_offset, node.end_lineno, node.end_col_offset, kind)
+
+
+def _target_names(target: ast.expr) -> Iterator[ast.Name]:
+    """
+    Args:
+        target (ast.expr): The target of an assignment.
+
+    Yields:
+        ast.Name: The names the target binds.
+    """
+    targets = [target]
+    while targets:
+        target = targets.pop()
+        target_type = type(target)
+        if target_type is ast.Name:
+            yield target
+        elif target_type is ast.Tuple or target_type is ast.List:
+            targets.extend(target.elts)
+        elif target_type is ast.Starred:
+            targets.append(target.value)
+
+
+class SymbolIndexer:
+    """
+    Populates the symbol index of the walked file. It runs before the checkers of the nodes it indexes, whenever any
+    of the checkers has uses_symbol_index set.
+
+    Names are bound by the statements and expressions that bind them, and not by each ast.Name, since names are by
+    far the most common nodes.
+    """
+
+    node_names = (
+        "Import",
+        "ImportFrom",
+        "Assign",
+        "AugAssign",
+        "AnnAssign",
+        "For",
+        "AsyncFor",
+        "If",
+        "While",
+        "Try",
+        "TryStar",
+        "Match",
+        "withitem",
+        "NamedExpr",
+        "ExceptHandler",
+        "FunctionDef",
+        "AsyncFunctionDef",
+        "ClassDef",
+        "Lambda",
+        "ListComp",
+        "SetComp",
+        "DictComp",
+        "GeneratorExp",
+    )
+
+    @classmethod
+    def check(cls, node: ast.AST, errors) -> None:
+        """
+        Index the given node.
+
+        Args:
+            node (ast.AST): The ast node to index.
+            errors (SixErrorBuffer): The errors of the walk, that hold its symbol index.
+        """
+        symbols = errors.symbols
+        node_type = type(node)
+        if node_type is ast.Import or node_type is ast.ImportFrom:
+            symbols.imports(node)
+        elif node_type is ast.Assign:
+            for target in node.targets:
+                if type(target) is ast.Name:
+                    symbols.shadow(target.id, target.lineno, target.col_offset)
+                else:
+                    cls._shadow_target(target, symbols)
+        elif node_type is ast.withitem:
+            if node.optional_vars is not None:
+                cls._shadow_target(node.optional_vars, symbols)
+        elif node_type is ast.ExceptHandler:
+            if node.name is not None:
+                symbols.shadow(node.name, node.lineno, node.col_offset)
+        elif hasattr(node, "target"):
+            # AugAssign, AnnAssign, For, AsyncFor and NamedExpr. The target of a loop is bound in its block.
+            if isinstance(node, LOOP_NODE_TYPES):
+                symbols.enter_scope(node)
+            cls._shadow_target(node.target, symbols)
+        elif isinstance(node, BLOCK_NODE_TYPES):
+            symbols.enter_scope(node)
+        else:
+            if isinstance(node, BINDING_DEFINITION_TYPES):
+                symbols.shadow(node.name, node.lineno, node.col_offset)
+            if isinstance(node, SCOPE_NODE_TYPES):
+                symbols.enter_scope(node)
+            if isinstance(node, FUNCTION_NODE_TYPES):
+                arguments = node.args
+                for argument in (
+                    arguments.posonlyargs
+                    + arguments.args
+                    + arguments.kwonlyargs
+                    + [arguments.vararg, arguments.kwarg]
+                ):
+                    if argument is not None:
+                        symbols.shadow(argument.arg, argument.lineno, argument.col_offset)
+            elif isinstance(node, COMPREHENSION_NODE_TYPES):
+                # The targets of a comprehension are bound before its element, which is walked first.
+                for generator in node.generators:
+                    cls._shadow_target(generator.target, symbols)
+
+    @staticmethod
+    def _shadow_target(target: ast.expr, symbols: SymbolIndex) -> None:
+        for name in _target_names(target):
+            symbols.shadow(name.id, name.lineno, name.col_offset)
+
+
+def add_symbol_indexer(node_checkers: Dict[str, tuple]) -> Dict[str, tuple]:
+    """
+    Args:
+        node_checkers (Dict[str, tuple]): A dictionary that maps between the node name and the checkers to run.
+
+    Returns:
+        Dict[str, tuple]: The given node_checkers, where the SymbolIndexer runs first on the nodes it indexes if any
+            of the checkers uses the symbol index.
+    """
+    if not any(
+        getattr(checker, "uses_symbol_index", False)
+        for checkers in node_checkers.values()
+        for checker in checkers
+    ):
+        return node_checkers
+
+    node_checkers = dict(node_checkers)
+    for node_name in SymbolIndexer.node_names:
+        node_checkers[node_name] = (SymbolIndexer,) + tuple(node_checkers.get(node_name, ()))
+    return node_checkers
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+import unicodedata
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+from flake8_six_compatablity_plugin.six_checkers.six_checker import SixChecker
+
+# From this number of identifier triggers, the words of a source are collected in a single pass, instead of
+# searching the source once for each trigger.
+WORD_SET_MIN_TRIGGERS = 48
+
+
+def _is_identifier_character(character: str) -> bool:
+    return character.isalnum() or character == "_"
+
+
+# Maps every ascii character that is not a letter or an underscore - including the digits - to a space.
+_WORD_SEPARATORS = bytes(
+    ord(" ") if index < 128 and not (chr(index).isalpha() or chr(index) == "_") else index
+    for index in range(256)
+)
+
+
+def _contains_word(source: str, word: str) -> bool:
+    """
+    Check if the given word appears in the source, and is not a part of a longer identifier.
+    A digit may precede the word, since "1if x else 2" is tokenized as a number followed by a keyword.
+
+    Args:
+        source (str): The source to search in.
+        word (str): The identifier to search for.
+
+    Returns:
+        bool: True if the word appears in the source, False otherwise.
+    """
+    index = source.find(word)
+    while index != -1:
+        end = index + len(word)
+        previous_character = source[index - 1] if index else " "
+        next_character = source[end] if end < len(source) else " "
+        if (
+            not (previous_character.isalpha() or previous_character == "_")
+            and not _is_identifier_character(next_character)
+        ):
+            return True
+        index = source.find(word, index + 1)
+    return False
+
+
+def _word_parts(word: str) -> Tuple[bytes, ...]:
+    """
+    Args:
+        word (str): An ascii identifier.
+
+    Returns:
+        Tuple[bytes, ...]: The parts of the word between its digits, which all appear in the words of any source the
+            word appears in.
+    """
+    return tuple(word.encode("ascii").translate(_WORD_SEPARATORS).split())
+
+
+class TriggerScanner:
+    """
+    A textual pre-filter that finds which checkers may find errors in a source, without parsing it.
+
+    The triggers of all the given checkers are collected once, so each distinct trigger is searched only once per
+    source, no matter how many checkers share it. Checkers without triggers are always considered triggered.
+    Only the triggers of the checkers are used, so the checker manifest entries can be scanned instead of the checkers,
+    without importing them.
+
+    When there are many identifier triggers, like the banned names of a large rule file, the words of each source are
+    split out once and intersected with the identifier triggers - so the scan takes about the same time no matter how
+    many identifier triggers there are. Digits split the words as well, so a word that follows a digit is found, and
+    the triggers that contain digits are matched by their parts. This may trigger a checker that would not have been
+    triggered otherwise, but never misses one. Non ascii characters are kept in the words, since outside of strings
+    and comments they can only be a part of an identifier.
+    """
+
+    def __init__(self, checkers: Iterable[SixChecker]):
+        checkers = tuple(checkers)
+        self._untriggered_checkers = frozenset(
+            checker for checker in checkers if checker.triggers is None
+        )
+        self._trigger_checkers: Dict[str, List[SixChecker]] = {}
+        for checker in checkers:
+            for trigger in checker.triggers or ():
+                self._trigger_checkers.setdefault(trigger, []).append(checker)
+
+        # The triggers that are searched in the source when its words are split out, by the parts of the identifier
+        # triggers: the checkers of single words, of words that contain digits, and of any other trigger.
+        self._word_checkers: Dict[bytes, List[SixChecker]] = {}
+        self._parts_checkers: Dict[Tuple[bytes, ...], List[SixChecker]] = {}
+        self._source_checkers: Dict[str, List[SixChecker]] = {}
+        word_triggers = [
+            trigger for trigger in self._trigger_checkers if trigger.isidentifier() and trigger.isascii()
+        ]
+        if len(word_triggers) >= WORD_SET_MIN_TRIGGERS:
+            for trigger, trigger_checkers in self._trigger_checkers.items():
+                if trigger not in word_triggers:
+                    self._source_checkers[trigger] = trigger_checkers
+                    continue
+                parts = _word_parts(trigger)
+                if len(parts) == 1:
+                    self._word_checkers.setdefault(parts[0], []).extend(trigger_checkers)
+                else:
+                    self._parts_checkers.setdefault(parts, []).extend(trigger_checkers)
+
+    def triggered_checkers(self, lines: Iterable[str]) -> FrozenSet[SixChecker]:
+        """
+        Args:
+            lines (Iterable[str]): The physical lines of the source.
+
+        Returns:
+            FrozenSet[SixChecker]: The checkers that may find errors in the source.
+        """
+        source = "".join(lines)
+        triggered_checkers = set(self._untriggered_checkers)
+        trigger_checkers = self._trigger_checkers
+        if not source.isascii():
+            # Identifiers are NFKC normalized by the parser, so their triggers must be matched after normalization.
+            source = unicodedata.normalize("NFKC", source)
+        if self._word_checkers or self._parts_checkers:
+            words = source.encode("utf-8", "surrogatepass").translate(_WORD_SEPARATORS).split()
+            for word in self._word_checkers.keys() & words:
+                triggered_checkers.update(self._word_checkers[word])
+            if self._parts_checkers:
+                words = set(words)
+                for parts, checkers in self._parts_checkers.items():
+                    if words.issuperset(parts):
+                        triggered_checkers.update(checkers)
+            trigger_checkers = self._source_checkers
+
+        for trigger, checkers in trigger_checkers.items():
+            if triggered_checkers.issuperset(checkers):
+                continue
+            if trigger in source and (
+                not trigger.isidentifier() or _contains_word(source, trigger)
+            ):
+                triggered_checkers.update(checkers)
+        return frozenset(triggered_checkers)
@@ -1,9 +1,12 @@
 #!/usr/bin/env python3
 import ast
 import abc
+from typing import List, Optional
 
-from flake8_six_compatablity_plugin.flake8_errors_info import SIXErrorInfo
+from flake8_six_compatablity_plugin.six_checkers.rule_table import called_name, defined_name
 from flake8_six_compatablity_plugin.six_checkers.six_checker import SixChecker
+from flake8_six_compatablity_plugin.six_checkers.six_error_buffer import SixErrorBuffer
+from flake8_six_compatablity_plugin.six_checkers.source_edits import FixSource, SourceEdit
 
 
 class CallFuncionNameNotAllowedChecker(abc.ABC, SixChecker):
@@ -11,22 +14,49 @@ class CallFuncionNameNotAllowedChecker(abc.ABC, SixChecker):
     Six Checker that checks that a given name is not called as a function.
 
     Any inherting class needs to define the unallowed_name, as well as the error_message.
+    An inheriting class that defines the replacement_name - the qualified name to call instead - is fixable.
     """
 
     unallowed_name = ""
+    replacement_name: Optional[str] = None
+    rule_key_of = staticmethod(called_name)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.triggers = (cls.unallowed_name,)
+        cls.rule_keys = (cls.unallowed_name,)
+        cls.fixable = cls.replacement_name is not None
 
     @classmethod
-    def check(cls, node: ast.Call, errors: list[SIXErrorInfo]) -> None:
+    def check(cls, node: ast.Call, errors: SixErrorBuffer) -> None:
         """
         Check that the given node is valid.
         If it is not valid, create the relevant error info and update errors.
 
         Args:
             node (ast.Call): The ast statement to check
-            errors (list[SIXErrorInfo]): The error to be updated with found errors.
+            errors (SixErrorBuffer): The error to be updated with found errors.
         """
         if isinstance(node.func, ast.Name) and node.func.id == cls.unallowed_name:
-            errors.append(cls._create_six_error(node.func))
+            cls._add_six_error(node.func, errors)
+
+    @classmethod
+    def fix(cls, node: ast.Call, source: FixSource) -> List[SourceEdit]:
+        """
+        Call the replacement name instead, and import its module if the source does not import it.
+
+        Args:
+            node (ast.Call): The call the error was found in.
+            source (FixSource): The source of the node.
+
+        Returns:
+            List[SourceEdit]: The edits that fix the error.
+        """
+        edits = [SourceEdit(source.node_start(node.func), source.node_end(node.func), cls.replacement_name)]
+        import_edit = source.import_edit(cls.replacement_name.partition(".")[0])
+        if import_edit is not None:
+            edits.append(import_edit)
+        return edits
 
 
 class FuncionDefNameNotAllowedChecker(abc.ABC, SixChecker):
@@ -37,28 +67,36 @@ class FuncionDefNameNotAllowedChecker(abc.ABC, SixChecker):
     """
 
     unallowed_name = ""
+    rule_key_of = staticmethod(defined_name)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.triggers = (cls.unallowed_name,)
+        cls.rule_keys = (cls.unallowed_name,)
 
     @classmethod
-    def check(cls, node: ast.FunctionDef, errors: list[SIXErrorInfo]) -> None:
+    def check(cls, node: ast.FunctionDef, errors: SixErrorBuffer) -> None:
         """
         Check that the given node is valid.
         If it is not valid, create the relevant error info and update errors.
 
         Args:
             node (ast.FunctionDef): The ast statement to check
-            errors (list[SIXErrorInfo]): The error to be updated with found errors.
+            errors (SixErrorBuffer): The error to be updated with found errors.
         """
         if node.name == cls.unallowed_name:
-            errors.append(cls._create_six_error(node))
+            cls._add_six_error(node, errors)
 
 
 class InternNotAllowedChecker(CallFuncionNameNotAllowedChecker):
     unallowed_name = "intern"
+    replacement_name = "six.moves.intern"
     error_message = "intern is not python3 compatible - use six.moves.intern"
 
 
 class ReloadNotAllowedChecker(CallFuncionNameNotAllowedChecker):
     unallowed_name = "reload"
+    replacement_name = "six.moves.reload_module"
     error_message = "reload is not python3 compatible - use six.moves.reload_module"
 
 
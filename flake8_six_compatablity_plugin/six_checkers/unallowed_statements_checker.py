@@ -2,8 +2,8 @@
 import ast
 import abc
 
-from flake8_six_compatablity_plugin.flake8_errors_info import SIXErrorInfo
 from flake8_six_compatablity_plugin.six_checkers.six_checker import SixChecker
+from flake8_six_compatablity_plugin.six_checkers.six_error_buffer import SixErrorBuffer
 
 
 class StatementNotAllowed(abc.ABC, SixChecker):
@@ -12,91 +12,107 @@ class StatementNotAllowed(abc.ABC, SixChecker):
     """
 
     @classmethod
-    def check(cls, node: ast.stmt, errors: list[SIXErrorInfo]) -> None:
+    def check(cls, node: ast.stmt, errors: SixErrorBuffer) -> None:
         """
         Check that the given node is valid.
         If it is not valid, create the relevant error info and update errors.
 
         Args:
             node (ast.stmt): The ast statement to check
-            errors (list[SIXErrorInfo]): The error to be updated with found errors.
+            errors (SixErrorBuffer): The error to be updated with found errors.
         """
-        errors.append(cls._create_six_error(node))
+        cls._add_six_error(node, errors)
 
 
 class AnnAssignNotAllowed(StatementNotAllowed):
     error_message = (
         "Annotation Assignment is not allowed - it is not supported in python2"
     )
+    triggers = (":",)
 
     @classmethod
-    def check(cls, node: ast.AnnAssign, errors: list[SIXErrorInfo]) -> None:
+    def check(cls, node: ast.AnnAssign, errors: SixErrorBuffer) -> None:
         """
         Check that the given node is valid.
         If it is not valid, create the relevant error info and update errors.
 
         Args:
             node (ast.AnnAssign): The ast statement to check
-            errors (list[SIXErrorInfo]): The error to be updated with found errors.
+            errors (SixErrorBuffer): The error to be updated with found errors.
         """
-        errors.append(cls._create_six_error(node.annotation))
+        cls._add_six_error(node.annotation, errors)
 
 
 class AsyncForNotAllowed(StatementNotAllowed):
     error_message = "Async For is not allowed - it is not supported in python2"
+    triggers = ("async",)
 
 
 class AsyncWithNotAllowed(StatementNotAllowed):
     error_message = "Async With is not allowed - it is not supported in python2"
+    triggers = ("async",)
 
 
 class MatchNotAllowed(StatementNotAllowed):
     error_message = "Match is not allowed - it is not supported in python2"
+    triggers = ("match",)
 
 
 class NonlocalNotAllowed(StatementNotAllowed):
     error_message = "Nonlocal is not allowed - it is not supported in python2"
+    triggers = ("nonlocal",)
 
 
 class NamedExprNotAllowed(StatementNotAllowed):
     error_message = "Warlus operator is not allowed - it is not supported in python2"
+    triggers = (":=",)
 
 
 class YieldFromNotAllowed(StatementNotAllowed):
     error_message = "Yield From is not allowed - it is not supported in python2"
+    triggers = ("yield",)
 
 
 class MatchValueNotAllowed(StatementNotAllowed):
     error_message = "Match Value is not allowed - it is not supported in python2"
+    triggers = ("match",)
 
 
 class MatchSingletonNotAllowed(StatementNotAllowed):
     error_message = "Match Singleton is not allowed - it is not supported in python2"
+    triggers = ("match",)
 
 
 class MatchSequenceNotAllowed(StatementNotAllowed):
     error_message = "Match Sequence is not allowed - it is not supported in python2"
+    triggers = ("match",)
 
 
 class MatchMappingNotAllowed(StatementNotAllowed):
     error_message = "Match Mapping is not allowed - it is not supported in python2"
+    triggers = ("match",)
 
 
 class MatchClassNotAllowed(StatementNotAllowed):
     error_message = "Match Class is not allowed - it is not supported in python2"
+    triggers = ("match",)
 
 
 class MatchStarNotAllowed(StatementNotAllowed):
     error_message = "Match Star is not allowed - it is not supported in python2"
+    triggers = ("match",)
 
 
 class MatchAsNotAllowed(StatementNotAllowed):
     error_message = "Match As is not allowed - it is not supported in python2"
+    triggers = ("match",)
 
 
 class MatchOrNotAllowed(StatementNotAllowed):
     error_message = "Match Or is not allowed - it is not supported in python2"
+    triggers = ("match",)
 
 
 class NameConstantNotAllowed(StatementNotAllowed):
     error_message = "Match Constant is not allowed - it is not supported in python2"
+    triggers = ("match",)
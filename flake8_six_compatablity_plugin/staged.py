@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+import argparse
+import fnmatch
+import os
+import re
+import subprocess
+import sys
+import threading
+from typing import FrozenSet, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from flake8_six_compatablity_plugin.cli import DEFAULT_EXCLUDE, DEFAULT_FILENAME_PATTERN, FileErrors, check_content
+from flake8_six_compatablity_plugin.flake8_plugin import SixCompatibilityPlugin
+from flake8_six_compatablity_plugin.reporters import (
+    DEFAULT_FORMAT,
+    ERROR_FORMAT,
+    REPORT_FORMATS,
+    create_report,
+    split_message,
+)
+
+# Non-ASCII paths are written as is, and only paths with quotes, backslashes or control characters are escaped.
+GIT_OPTIONS = ("-c", "core.quotePath=false")
+# The diff is written the same way regardless of the configuration of the user.
+STAGED_DIFF_OPTIONS = (
+    "diff",
+    "--cached",
+    "--unified=0",
+    "--full-index",
+    "--find-renames",
+    # Added, copied, modified and renamed files - deleted files have no staged content.
+    "--diff-filter=ACMR",
+    "--no-relative",
+    "--no-color",
+    "--no-ext-diff",
+    "--no-textconv",
+    "--ignore-submodules",
+    # Files that git considers binary, like ones with a -diff attribute, still get their changed lines.
+    "--text",
+    "--src-prefix=a/",
+    "--dst-prefix=b/",
+)
+NEW_FILE_PREFIX = b"b/"
+# Regular and executable files - symbolic links are not python sources.
+FILE_MODES = (b"100644", b"100755")
+HUNK_HEADER_PATTERN = re.compile(rb"@@ -\d+(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+C_ESCAPE_PATTERN = re.compile(rb"\\([0-7]{3}|.)", re.DOTALL)
+C_ESCAPES = {b"a": b"\a", b"b": b"\b", b"t": b"\t", b"n": b"\n", b"v": b"\v", b"f": b"\f", b"r": b"\r"}
+# A file that can not be read or parsed is not checked at all, so these errors are reported on any line.
+FILE_ERROR_CODES = ("E902", "E999")
+# Errors of git itself, like running outside of a repository, as opposed to SIX errors.
+GIT_ERROR_EXIT_CODE = 2
+
+
+class GitError(Exception):
+    """
+    Raised when a git command fails, or the object store does not have a staged blob.
+    """
+
+
+class StagedFile(NamedTuple):
+    """
+    A file of the index that differs from HEAD, with the lines of its staged content that were added or changed.
+    """
+
+    path: str
+    object_id: str
+    changed_lines: FrozenSet[int]
+
+
+def _run_git(*arguments: str) -> bytes:
+    try:
+        process = subprocess.run(("git", *GIT_OPTIONS, *arguments), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except OSError as error:
+        raise GitError(f"git could not be run: {error}") from None
+    if process.returncode:
+        raise GitError(process.stderr.decode("utf-8", "replace").strip() or f"git {arguments[0]} failed")
+    return process.stdout
+
+
+def _unescape(match: "re.Match") -> bytes:
+    escape = match.group(1)
+    if len(escape) == 3:
+        return bytes((int(escape, 8),))
+    return C_ESCAPES.get(escape, escape)
+
+
+def _header_path(value: bytes) -> bytes:
+    """
+    Args:
+        value (bytes): The path of a ---/+++ line of a diff.
+
+    Returns:
+        bytes: The path, without the quotes and escapes git adds to unusual paths and the tab it adds to paths with
+            spaces.
+    """
+    if value.endswith(b"\t"):
+        value = value[:-1]
+    if value.startswith(b'"') and value.endswith(b'"'):
+        return C_ESCAPE_PATTERN.sub(_unescape, value[1:-1])
+    return value
+
+
+def parse_staged_diff(diff: bytes) -> Iterator[Tuple[bytes, bytes, bytes, FrozenSet[int]]]:
+    """
+    Parse the output of git diff --cached --unified=0 --full-index.
+
+    Args:
+        diff (bytes): The diff between HEAD and the index.
+
+    Yields:
+        Tuple[bytes, bytes, bytes, FrozenSet[int]]: The path, mode, blob id and changed lines of each file with
+            staged content. Files whose content did not change, like pure renames, are not yielded.
+    """
+    path = mode = object_id = None
+    changed_lines = set()
+    hunk_lines_left = 0
+    for line in diff.split(b"\n"):
+        if hunk_lines_left:
+            # The lines of a hunk are skipped by their count, since an added line may look like a header.
+            if line[:1] in (b"+", b"-"):
+                hunk_lines_left -= 1
+            continue
+
+        if line.startswith(b"diff --git "):
+            if path is not None and object_id is not None:
+                yield path, mode, object_id, frozenset(changed_lines)
+            path = mode = object_id = None
+            changed_lines = set()
+        elif line.startswith((b"new file mode ", b"new mode ")):
+            mode = line.rsplit(b" ", 1)[1]
+        elif line.startswith(b"index "):
+            object_ids, _, index_mode = line[len(b"index "):].partition(b" ")
+            object_id = object_ids.partition(b"..")[2]
+            mode = index_mode or mode
+        elif line.startswith(b"+++ "):
+            new_path = _header_path(line[len(b"+++ "):])
+            if new_path.startswith(NEW_FILE_PREFIX):
+                path = new_path[len(NEW_FILE_PREFIX):]
+        elif line.startswith(b"@@ "):
+            match = HUNK_HEADER_PATTERN.match(line)
+            if match is None:
+                raise GitError(f"invalid hunk header {line!r}")
+            old_count, new_start, new_count = match.groups()
+            old_count = 1 if old_count is None else int(old_count)
+            new_count = 1 if new_count is None else int(new_count)
+            changed_lines.update(range(int(new_start), int(new_start) + new_count))
+            hunk_lines_left = old_count + new_count
+
+    if path is not None and object_id is not None:
+        yield path, mode, object_id, frozenset(changed_lines)
+
+
+def _is_checked(path: str, exclude: Sequence[str], filename_pattern: str) -> bool:
+    # Like six-check, a file is skipped if its name, the path of any of its directories, or its own path is excluded.
+    parts = path.split("/")
+    for index in range(1, len(parts) + 1):
+        sub_path = "/".join(parts[:index])
+        if any(fnmatch.fnmatch(parts[index - 1], pattern) or fnmatch.fnmatch(sub_path, pattern) for pattern in exclude):
+            return False
+    return fnmatch.fnmatch(parts[-1], filename_pattern)
+
+
+def staged_files(
+    pathspecs: Sequence[str] = (),
+    exclude: Sequence[str] = DEFAULT_EXCLUDE,
+    filename_pattern: str = DEFAULT_FILENAME_PATTERN,
+) -> List[StagedFile]:
+    """
+    Args:
+        pathspecs (Sequence[str]): Limit the files to the given paths. (Default: every staged file)
+        exclude (Sequence[str]): Glob patterns of the files and directories to skip.
+        filename_pattern (str): Glob pattern of the files to check.
+
+    Returns:
+        List[StagedFile]: The staged python files, with paths relative to the root of the repository.
+
+    Raises:
+        GitError: If the current directory is not in a git repository.
+    """
+    diff = _run_git(*STAGED_DIFF_OPTIONS, "--", *(f":(literal){pathspec}" for pathspec in pathspecs))
+    files = []
+    for path, mode, object_id, changed_lines in parse_staged_diff(diff):
+        path = os.fsdecode(path)
+        if mode in FILE_MODES and _is_checked(path, exclude, filename_pattern):
+            files.append(StagedFile(path, object_id.decode("ascii"), changed_lines))
+    return files
+
+
+class GitBlobReader:
+    """
+    Reads blobs from the object store of the repository with a single git cat-file --batch process.
+
+    The blob ids are written to the process by a thread while the blobs are read, so the process never waits for the
+    next request, and neither side blocks on a full pipe.
+    """
+
+    def __init__(self):
+        """
+        Raises:
+            GitError: If git could not be run.
+        """
+        try:
+            self._process = subprocess.Popen(
+                ("git", *GIT_OPTIONS, "cat-file", "--batch"), stdin=subprocess.PIPE, stdout=subprocess.PIPE
+            )
+        except OSError as error:
+            raise GitError(f"git could not be run: {error}") from None
+
+    def __enter__(self) -> "GitBlobReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _write_requests(self, object_ids: Sequence[str]) -> None:
+        try:
+            for object_id in object_ids:
+                self._process.stdin.write(object_id.encode("ascii") + b"\n")
+            self._process.stdin.flush()
+        except OSError:
+            # The process exited, which the reader reports.
+            pass
+
+    def _read_blob(self, object_id: str) -> bytes:
+        header = self._process.stdout.readline().split()
+        if len(header) != 3 or header[1] != b"blob":
+            raise GitError(f"the object store has no blob {object_id}")
+        size = int(header[2])
+        content = self._process.stdout.read(size)
+        # Each blob is followed by a line break.
+        if len(content) != size or self._process.stdout.read(1) != b"\n":
+            raise GitError(f"git cat-file exited while reading blob {object_id}")
+        return content
+
+    def read_blobs(self, object_ids: Sequence[str]) -> Iterator[bytes]:
+        """
+        Args:
+            object_ids (Sequence[str]): The ids of the blobs.
+
+        Yields:
+            bytes: The content of each blob, in the order of the given ids.
+
+        Raises:
+            GitError: If a blob is missing from the object store.
+        """
+        writer = threading.Thread(target=self._write_requests, args=(object_ids,), daemon=True)
+        writer.start()
+        try:
+            for object_id in object_ids:
+                yield self._read_blob(object_id)
+        finally:
+            writer.join()
+
+    def close(self) -> None:
+        self._process.stdout.close()
+        try:
+            self._process.stdin.close()
+        except OSError:
+            pass
+        self._process.wait()
+
+
+def check_staged(
+    pathspecs: Sequence[str] = (),
+    exclude: Sequence[str] = DEFAULT_EXCLUDE,
+    filename_pattern: str = DEFAULT_FILENAME_PATTERN,
+    rules_file: Optional[str] = None,
+) -> Iterator[Tuple[str, FileErrors]]:
+    """
+    Check the staged content of the staged python files, and keep only the errors on the lines that were added or
+    changed. The files in the working tree are not read.
+
+    Args:
+        pathspecs (Sequence[str]): Limit the files to the given paths. (Default: every staged file)
+        exclude (Sequence[str]): Glob patterns of the files and directories to skip.
+        filename_pattern (str): Glob pattern of the files to check.
+        rules_file (Optional[str]): A rule file to check along with the built-in checkers.
+
+    Yields:
+        Tuple[str, FileErrors]: The path of each staged file relative to the current directory, and its errors on
+            changed lines - or its E902 or E999 error, if it could not be checked.
+
+    Raises:
+        GitError: If the current directory is not in a git repository, or a staged blob could not be read.
+    """
+    SixCompatibilityPlugin.load_rule_file(rules_file)
+    root = os.fsdecode(_run_git("rev-parse", "--show-toplevel").rstrip(b"\n"))
+    files = staged_files(pathspecs, exclude, filename_pattern)
+    with GitBlobReader() as reader:
+        for staged_file, content in zip(files, reader.read_blobs([file.object_id for file in files])):
+            path = os.path.relpath(os.path.join(root, staged_file.path))
+            errors = check_content(path, content)
+            yield path, [
+                error
+                for error in errors
+                if error[0] in staged_file.changed_lines or error[2].startswith(FILE_ERROR_CODES)
+            ]
+
+
+def _parse_arguments(argv: Sequence[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="six-staged",
+        description="Check the staged content of the staged python files, and report the errors on changed lines.",
+    )
+    parser.add_argument(
+        "pathspecs",
+        nargs="*",
+        help="Check only the staged files under the given paths, like the file names pre-commit passes. "
+        "(Default: every staged file)",
+    )
+    parser.add_argument(
+        "--exclude",
+        type=lambda value: [pattern.strip() for pattern in value.split(",") if pattern.strip()],
+        default=list(DEFAULT_EXCLUDE),
+        help="Comma separated glob patterns of files and directories to skip.",
+    )
+    parser.add_argument(
+        "--filename",
+        default=DEFAULT_FILENAME_PATTERN,
+        help="Glob pattern of the files to check. (Default: %(default)s)",
+    )
+    parser.add_argument(
+        "--rules-file",
+        default=None,
+        help="A TOML (.toml) or INI file of additional banned names, each with its own SIX code and message.",
+    )
+    parser.add_argument(
+        "--format",
+        choices=(DEFAULT_FORMAT, *REPORT_FORMATS),
+        default=DEFAULT_FORMAT,
+        help="The output format - path:line:column: lines, a SARIF log, or a JSON object per error. "
+        "(Default: %(default)s)",
+    )
+    parser.add_argument(
+        "--output-file",
+        default=None,
+        help="Write the errors to the given file instead of stdout.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    The six-staged entry point.
+
+    Returns:
+        int: 2 if the staged files could not be read from git, 1 if any error was found, 0 otherwise.
+    """
+    arguments = _parse_arguments(sys.argv[1:] if argv is None else argv)
+    output_file = open(arguments.output_file, "w", encoding="utf-8") if arguments.output_file else sys.stdout
+    report = None
+    if arguments.format != DEFAULT_FORMAT:
+        SixCompatibilityPlugin.load_rule_file(arguments.rules_file)
+        report = create_report(
+            arguments.format, lambda line: output_file.write(line + "\n"), SixCompatibilityPlugin.rule_set.checkers
+        )
+        report.start()
+
+    errors_count = 0
+    try:
+        results = check_staged(arguments.pathspecs, arguments.exclude, arguments.filename, arguments.rules_file)
+        for path, errors in results:
+            for line_number, column, msg in errors:
+                if report is None:
+                    error_line = ERROR_FORMAT.format(path=path, line_number=line_number, column=column, msg=msg)
+                    print(error_line, file=output_file)
+                else:
+                    report.add(path, line_number, column, *split_message(msg))
+            errors_count += len(errors)
+        if report is not None:
+            report.finish()
+    except GitError as error:
+        print(f"six-staged: {error}", file=sys.stderr)
+        return GIT_ERROR_EXIT_CODE
+    finally:
+        if output_file is not sys.stdout:
+            output_file.close()
+
+    return 1 if errors_count else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
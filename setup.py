@@ -5,6 +5,8 @@ requires = [
 ]
 
 flake8_entry_point = "flake8.extension"
+flake8_report_entry_point = "flake8.report"
+console_scripts_entry_point = "console_scripts"
 
 setuptools.setup(
     name="flake8_six_compatablity_plugin",
@@ -20,6 +22,17 @@ setuptools.setup(
         flake8_entry_point: [
             'SIX = flake8_six_compatablity_plugin.flake8_plugin:SixCompatibilityPlugin',
         ],
+        flake8_report_entry_point: [
+            'six-sarif = flake8_six_compatablity_plugin.reporters:SarifFormatter',
+            'six-jsonl = flake8_six_compatablity_plugin.reporters:JsonLinesFormatter',
+        ],
+        console_scripts_entry_point: [
+            'six-check = flake8_six_compatablity_plugin.cli:main',
+            'six-daemon = flake8_six_compatablity_plugin.daemon:main',
+            'six-audit = flake8_six_compatablity_plugin.audit:main',
+            'six-merge = flake8_six_compatablity_plugin.sharding:main',
+            'six-staged = flake8_six_compatablity_plugin.staged:main',
+        ],
     },
     classifiers=[
         "Framework :: Flake8",